@@ -4,15 +4,29 @@ Pure Flask API for frontend/backend separation
 """
 
 import os
-from datetime import datetime, date
+from contextlib import suppress
+from types import SimpleNamespace
+from datetime import datetime, date, timedelta
+import click
 from flask import Flask, request, jsonify
+from flask.cli import AppGroup
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 from functools import wraps
 import re
 
+from audit_search import AuditSearch, count_matches
+from audit_writer import AuditWriter
+from bulk_decisions import DecisionConflict, decide_leave_requests
+from migrations import upgrade_schema
+from overlaps import busy_team_days, describe_busy_days, describe_overlap, find_overlaps
+from pagination import keyset_page
+from passwords import PasswordPool, PasswordPoolFull, hash_policy, needs_rehash
+from query_budget import init_query_budget
+from stats import leave_stats
+from user_cache import UserCache, UserSnapshot
+
 # Initialize Flask app
 app = Flask(__name__)
 
@@ -21,10 +35,21 @@ app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-i
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///elms_api.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JWT_ALGORITHM'] = 'HS256'
+app.config['QUERY_BUDGET_DEFAULT'] = 15
+app.config['QUERY_BUDGET_STRICT'] = os.environ.get('QUERY_BUDGET_STRICT', 'false').lower() in ['true', 'on', '1']
+app.config['AUDIT_SYNC'] = os.environ.get('AUDIT_SYNC', 'false').lower() in ['true', 'on', '1']
+app.config['USER_CACHE_TTL'] = float(os.environ.get('USER_CACHE_TTL', 30))
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+app.config['PASSWORD_HASH_ITERATIONS'] = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 600000))
+app.config['PASSWORD_POOL_WORKERS'] = int(os.environ.get('PASSWORD_POOL_WORKERS', 2))
+app.config['PASSWORD_POOL_QUEUE'] = int(os.environ.get('PASSWORD_POOL_QUEUE', 8))
+app.config['LEAVE_TEAM_CONCURRENCY_THRESHOLD'] = int(os.environ.get('LEAVE_TEAM_CONCURRENCY_THRESHOLD', 3))
 
 # Initialize extensions
 db = SQLAlchemy(app)
 CORS(app, origins=['*'])  # Configure for your Vercel domain in production
+init_query_budget(app)
+password_pool = PasswordPool(app)
 
 # Database Models
 class User(db.Model):
@@ -38,22 +63,23 @@ class User(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     last_login = db.Column(db.DateTime)
     
+    __table_args__ = (
+        db.Index('ix_user_team_role', 'team', 'role'),
+    )
+    
+    # Hashing runs on the bounded password pool (see passwords.PasswordPool)
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = password_pool.hash(password, hash_policy(app.config))
     
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return password_pool.verify(self.password, password)
+    
+    def password_needs_rehash(self):
+        return needs_rehash(self.password, hash_policy(app.config))
     
     def get_leave_balance(self):
-        current_year = datetime.now().year
-        approved_leaves = LeaveRequest.query.filter_by(
-            user_id=self.id, 
-            status='approved'
-        ).filter(
-            db.extract('year', LeaveRequest.start_date) == current_year
-        ).all()
-        
-        used_days = sum([(req.end_date - req.start_date).days + 1 for req in approved_leaves])
+        balance = db.session.get(LeaveBalance, (self.id, datetime.now().year))
+        used_days = balance.used_days if balance else 0
         return max(0, 30 - used_days)
     
     def to_dict(self):
@@ -81,6 +107,17 @@ class LeaveRequest(db.Model):
     applied_on = db.Column(db.DateTime, default=datetime.utcnow)
     decided_at = db.Column(db.DateTime, nullable=True)
     
+    __table_args__ = (
+        # Own requests by status/date (balances, overlap checks) and per-user listings
+        db.Index('ix_leave_request_user_status_start', 'user_id', 'status', 'start_date'),
+        # Overlap checks: the user's requests still running on or after a date (see overlaps.py)
+        db.Index('ix_leave_request_user_status_end', 'user_id', 'status', 'end_date'),
+        # Status-filtered listings, newest first
+        db.Index('ix_leave_request_status_applied', 'status', 'applied_on'),
+        # Keyset pagination over all requests, newest first
+        db.Index('ix_leave_request_applied_id', 'applied_on', 'id'),
+    )
+    
     # Relationships
     employee = db.relationship('User', foreign_keys=[user_id], backref='leave_requests')
     manager = db.relationship('User', foreign_keys=[manager_id], backref='managed_requests')
@@ -107,6 +144,66 @@ class LeaveRequest(db.Model):
             'days_count': self.days_count
         }
 
+class LeaveBalance(db.Model):
+    """Per-user, per-year ledger of approved leave days"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    used_days = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @classmethod
+    def record_approval(cls, leave_request):
+        """Add an approved request's days to the ledger; committed with the caller's transaction"""
+        year = leave_request.start_date.year
+        balance = db.session.get(cls, (leave_request.user_id, year))
+        if balance is None:
+            db.session.add(cls(user_id=leave_request.user_id, year=year, used_days=leave_request.days_count))
+        else:
+            balance.used_days = cls.used_days + leave_request.days_count
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute the whole ledger from approved leave history"""
+        totals = {}
+        approved = db.session.query(
+            LeaveRequest.user_id, LeaveRequest.start_date, LeaveRequest.end_date
+        ).filter(LeaveRequest.status == 'approved').yield_per(1000)
+        for user_id, start_date, end_date in approved:
+            key = (user_id, start_date.year)
+            totals[key] = totals.get(key, 0) + (end_date - start_date).days + 1
+        
+        cls.query.delete()
+        if totals:
+            db.session.execute(db.insert(cls), [
+                {'user_id': user_id, 'year': year, 'used_days': used_days, 'updated_at': datetime.utcnow()}
+                for (user_id, year), used_days in totals.items()
+            ])
+        db.session.commit()
+        return len(totals)
+
+class TeamAbsence(db.Model):
+    """One row per team member per day of approved leave (see elms.models.TeamAbsence)"""
+    team = db.Column(db.String(50), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    leave_request_id = db.Column(db.Integer, db.ForeignKey('leave_request.id'), primary_key=True, autoincrement=False)
+    
+    __table_args__ = (
+        db.Index('ix_team_absence_leave_request_id', 'leave_request_id'),
+    )
+    
+    @classmethod
+    def record_approval(cls, leave_request):
+        """Add a day row per day of an approved request; committed with the caller's transaction"""
+        team = leave_request.employee.team
+        if team is None:
+            return
+        db.session.execute(db.insert(cls), [
+            {'team': team, 'date': leave_request.start_date + timedelta(days=offset),
+             'user_id': leave_request.user_id, 'leave_request_id': leave_request.id}
+            for offset in range(leave_request.days_count)
+        ])
+
 class AuditLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -115,6 +212,11 @@ class AuditLog(db.Model):
     ip_address = db.Column(db.String(50), nullable=False)
     details = db.Column(db.Text, nullable=True)
     
+    __table_args__ = (
+        db.Index('ix_audit_log_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_audit_log_user_timestamp', 'user_id', 'timestamp', 'id'),
+    )
+    
     user = db.relationship('User', backref='audit_logs')
     
     def to_dict(self):
@@ -128,6 +230,18 @@ class AuditLog(db.Model):
             'details': self.details
         }
 
+audit_writer = AuditWriter(db, AuditLog, app)
+
+# Model classes for the helpers shared with the web app (see bulk_decisions.py)
+MODELS = SimpleNamespace(User=User, LeaveRequest=LeaveRequest, LeaveBalance=LeaveBalance,
+                         TeamAbsence=TeamAbsence, AuditLog=AuditLog)
+
+class ApiUser(UserSnapshot):
+    """Cached snapshot of the token's user, passed to views as current_user"""
+    get_leave_balance = User.get_leave_balance
+
+user_cache = UserCache(db, User, ApiUser, app)
+
 # Helper functions
 def generate_token(user_id):
     """Generate JWT token for user"""
@@ -138,11 +252,11 @@ def generate_token(user_id):
     return jwt.encode(payload, app.config['SECRET_KEY'], algorithm=app.config['JWT_ALGORITHM'])
 
 def verify_token(token):
-    """Verify JWT token and return user"""
+    """Verify JWT token and return the (cached) active user"""
     try:
         payload = jwt.decode(token, app.config['SECRET_KEY'], algorithms=[app.config['JWT_ALGORITHM']])
-        user = User.query.get(payload['user_id'])
-        return user
+        user = user_cache.get(payload['user_id'])
+        return user if user is not None and user.is_active else None
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
         return None
 
@@ -180,15 +294,13 @@ def role_required(roles):
     return decorator
 
 def log_action(user_id, action, details=None):
-    """Log user actions"""
-    audit = AuditLog(
+    """Log user actions (queued and written in batches, see audit_writer.py)"""
+    audit_writer.write(
         user_id=user_id,
         action=action,
         ip_address=request.remote_addr or '127.0.0.1',
         details=details
     )
-    db.session.add(audit)
-    db.session.commit()
 
 # Validation helpers
 def validate_email(email):
@@ -262,6 +374,9 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except PasswordPoolFull as e:
+        db.session.rollback()
+        return password_pool_full(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Registration failed: {str(e)}'}), 500
@@ -283,8 +398,12 @@ def login():
         if not user or not user.check_password(password) or not user.is_active:
             return jsonify({'error': 'Invalid credentials'}), 401
         
-        # Update last login
+        # Update last login, upgrading hashes made under an older cost policy
         user.last_login = datetime.utcnow()
+        if user.password_needs_rehash():
+            # If the hashing pool is busy, the upgrade waits for a later login
+            with suppress(PasswordPoolFull):
+                user.set_password(password)
         db.session.commit()
         
         # Generate token
@@ -298,6 +417,8 @@ def login():
             'user': user.to_dict()
         }), 200
         
+    except PasswordPoolFull as e:
+        return password_pool_full(e)
     except Exception as e:
         return jsonify({'error': f'Login failed: {str(e)}'}), 500
 
@@ -305,29 +426,100 @@ def login():
 @token_required
 def get_profile(current_user):
     """Get user profile"""
-    return jsonify({'user': current_user.to_dict()})
+    # current_user is a cached snapshot; the full profile includes timestamps
+    user = db.session.get(User, current_user.id)
+    return jsonify({'user': user.to_dict()})
+
+# Fields of LeaveRequest.to_dict() that GET /api/leaves can return, as SQL columns
+ManagerUser = db.aliased(User, name='manager_user')
+LEAVE_FIELDS = {
+    'id': LeaveRequest.id,
+    'user_id': LeaveRequest.user_id,
+    'employee_name': User.username.label('employee_name'),
+    'employee_team': User.team.label('employee_team'),
+    'start_date': LeaveRequest.start_date,
+    'end_date': LeaveRequest.end_date,
+    'reason': LeaveRequest.reason,
+    'status': LeaveRequest.status,
+    'manager_id': LeaveRequest.manager_id,
+    'manager_name': ManagerUser.username.label('manager_name'),
+    'decision_reason': LeaveRequest.decision_reason,
+    'applied_on': LeaveRequest.applied_on,
+    'decided_at': LeaveRequest.decided_at,
+    'days_count': None,  # computed from start_date and end_date
+}
+
+def leave_rows_query(current_user, fields):
+    """Column-only query for the requested fields within the user's scope (no ORM objects)"""
+    # id and applied_on are the keyset cursor; days_count is derived from the dates
+    selected = set(fields) | {'id', 'applied_on'}
+    if 'days_count' in selected:
+        selected |= {'start_date', 'end_date'}
+    columns = [column for name, column in LEAVE_FIELDS.items() if name in selected and column is not None]
+    query = db.session.query(*columns).select_from(LeaveRequest)
+    
+    if current_user.role == 'manager' or selected & {'employee_name', 'employee_team'}:
+        query = query.join(User, LeaveRequest.user_id == User.id)
+    if 'manager_name' in selected:
+        query = query.outerjoin(ManagerUser, LeaveRequest.manager_id == ManagerUser.id)
+    
+    if current_user.role == 'employee':
+        # Employee sees only their requests
+        query = query.filter(LeaveRequest.user_id == current_user.id)
+    elif current_user.role == 'manager':
+        # Manager sees team requests, scoped by the join rather than a list of ids
+        query = query.filter(User.team == current_user.team, User.role == 'employee')
+    return query
+
+def leave_row_dict(row, fields):
+    item = {}
+    for name in fields:
+        if name == 'days_count':
+            item[name] = (row.end_date - row.start_date).days + 1
+        else:
+            value = getattr(row, name)
+            item[name] = value.isoformat() if isinstance(value, (date, datetime)) else value
+    return item
 
 @app.route('/api/leaves', methods=['GET'])
 @token_required
 def get_leaves(current_user):
-    """Get leave requests based on user role"""
+    """Get leave requests based on user role, newest first, one page at a time
+    
+    Query parameters: limit (1-200, default 50), cursor (next_cursor of the previous page),
+    fields (comma-separated subset of the request fields), status, since (YYYY-MM-DD, applied on or after)
+    """
     try:
-        if current_user.role == 'employee':
-            # Employee sees only their requests
-            requests = LeaveRequest.query.filter_by(user_id=current_user.id).order_by(LeaveRequest.applied_on.desc()).all()
-        elif current_user.role == 'admin':
-            # Admin sees all requests
-            requests = LeaveRequest.query.order_by(LeaveRequest.applied_on.desc()).all()
-        else:  # manager
-            # Manager sees team requests
-            team_users = User.query.filter_by(team=current_user.team, role='employee').all()
-            user_ids = [u.id for u in team_users]
-            requests = LeaveRequest.query.filter(LeaveRequest.user_id.in_(user_ids)).order_by(LeaveRequest.applied_on.desc()).all()
+        fields = [name for name in request.args.get('fields', '').split(',') if name] or list(LEAVE_FIELDS)
+        unknown = [name for name in fields if name not in LEAVE_FIELDS]
+        if unknown:
+            return jsonify({'error': f'Unknown fields: {", ".join(unknown)}'}), 400
+        
+        query = leave_rows_query(current_user, fields)
+        
+        status = request.args.get('status')
+        if status:
+            if status not in ['pending', 'approved', 'rejected']:
+                return jsonify({'error': 'Status must be pending, approved or rejected'}), 400
+            query = query.filter(LeaveRequest.status == status)
+        
+        since = request.args.get('since')
+        if since:
+            query = query.filter(LeaveRequest.applied_on >= datetime.strptime(since, '%Y-%m-%d'))
+        
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        rows, next_cursor = keyset_page(
+            query, LeaveRequest.applied_on, LeaveRequest.id,
+            cursor=request.args.get('cursor'), per_page=limit
+        )
         
         return jsonify({
-            'requests': [req.to_dict() for req in requests]
+            'requests': [leave_row_dict(row, fields) for row in rows],
+            'next_cursor': next_cursor
         }), 200
         
+    except ValueError:
+        return jsonify({'error': 'Invalid since date. Use YYYY-MM-DD'}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch requests: {str(e)}'}), 500
 
@@ -360,11 +552,22 @@ def create_leave_request(current_user):
         
         # Check leave balance
         days_requested = (end_date - start_date).days + 1
-        if current_user.get_leave_balance() < days_requested:
+        leave_balance = current_user.get_leave_balance()
+        if leave_balance < days_requested:
             return jsonify({
-                'error': f'Insufficient leave balance. You have {current_user.get_leave_balance()} days remaining.'
+                'error': f'Insufficient leave balance. You have {leave_balance} days remaining.'
             }), 400
         
+        overlapping = find_overlaps(db.session, LeaveRequest, current_user.id, start_date, end_date)
+        if overlapping:
+            return jsonify({
+                'error': describe_overlap(overlapping[0]),
+                'conflicts': [leave.to_dict() for leave in overlapping]
+            }), 409
+        
+        busy_days = busy_team_days(db.session, TeamAbsence, current_user.team, start_date, end_date,
+                                   app.config['LEAVE_TEAM_CONCURRENCY_THRESHOLD'], current_user.id)
+        
         # Create request
         leave_request = LeaveRequest(
             user_id=current_user.id,
@@ -378,10 +581,14 @@ def create_leave_request(current_user):
         
         log_action(current_user.id, f'Applied for leave: {start_date} to {end_date}', f'Days: {days_requested}')
         
-        return jsonify({
+        response = {
             'message': 'Leave request created successfully',
             'request': leave_request.to_dict()
-        }), 201
+        }
+        if busy_days:
+            response['warning'] = describe_busy_days(busy_days)
+            response['busy_days'] = [{'date': day.isoformat(), 'absent': count} for day, count in busy_days]
+        return jsonify(response), 201
         
     except ValueError as e:
         return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
@@ -417,6 +624,9 @@ def decide_leave_request(current_user, leave_id):
         leave_request.manager_id = current_user.id
         leave_request.decision_reason = decision_reason
         leave_request.decided_at = datetime.utcnow()
+        if decision == 'approved':
+            LeaveBalance.record_approval(leave_request)
+            TeamAbsence.record_approval(leave_request)
         
         db.session.commit()
         
@@ -431,6 +641,38 @@ def decide_leave_request(current_user, leave_id):
         db.session.rollback()
         return jsonify({'error': f'Failed to update request: {str(e)}'}), 500
 
+@app.route('/api/leaves/decide', methods=['POST'])
+@token_required
+@role_required(['manager', 'admin'])
+def decide_leave_requests_bulk(current_user):
+    """Approve or reject many leave requests in one transaction (see bulk_decisions.py)
+
+    Body: {"ids": [...], "decision": "approved" | "rejected", "decision_reason": "..."}.
+    Requests outside the caller's team or no longer pending are reported under "skipped".
+    """
+    data = request.get_json(silent=True) or {}
+    leave_ids = data.get('ids')
+    if not isinstance(leave_ids, list) or not leave_ids or not all(isinstance(i, int) for i in leave_ids):
+        return jsonify({'error': 'ids must be a non-empty list of request IDs'}), 400
+    
+    try:
+        result = decide_leave_requests(
+            db.session, MODELS, current_user, leave_ids, data.get('decision'),
+            (data.get('decision_reason') or '').strip(), request.remote_addr or '127.0.0.1'
+        )
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except DecisionConflict as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to update requests: {str(e)}'}), 500
+    
+    return jsonify(result.to_dict()), 200
+
 @app.route('/api/admin/users', methods=['GET'])
 @token_required
 @role_required(['admin'])
@@ -450,19 +692,7 @@ def get_users(current_user):
 def get_admin_stats(current_user):
     """Get admin dashboard statistics"""
     try:
-        stats = {
-            'total_users': User.query.count(),
-            'total_employees': User.query.filter_by(role='employee').count(),
-            'total_managers': User.query.filter_by(role='manager').count(),
-            'total_requests': LeaveRequest.query.count(),
-            'pending_requests': LeaveRequest.query.filter_by(status='pending').count(),
-            'approved_requests': LeaveRequest.query.filter_by(status='approved').count(),
-            'rejected_requests': LeaveRequest.query.filter_by(status='rejected').count()
-        }
-        
-        # Calculate approval rate
-        total_requests = stats['total_requests']
-        stats['approval_rate'] = round((stats['approved_requests'] / total_requests * 100) if total_requests > 0 else 0, 1)
+        stats = leave_stats(db.session, User, LeaveRequest)
         
         return jsonify({'stats': stats}), 200
         
@@ -478,7 +708,7 @@ def get_audit_logs(current_user):
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 50, type=int)
         
-        logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).paginate(
+        logs = AuditLog.query.options(db.joinedload(AuditLog.user)).order_by(AuditLog.timestamp.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
         
@@ -492,7 +722,50 @@ def get_audit_logs(current_user):
     except Exception as e:
         return jsonify({'error': f'Failed to fetch logs: {str(e)}'}), 500
 
+@app.route('/api/admin/audit-logs/search', methods=['GET'])
+@token_required
+@role_required(['admin'])
+def search_audit_logs(current_user):
+    """Search audit logs by user, action/details text, IP prefix and date range (admin only)
+    
+    Query parameters: user, q, ip, since, until (YYYY-MM-DD), limit and the
+    next_cursor of the previous page. Unlike /api/admin/audit-logs, deep pages
+    cost the same as the first one. The total, counted up to COUNT_LIMIT, is
+    only returned with the first page (no cursor); later pages carry null.
+    """
+    try:
+        search = AuditSearch.from_args(request.args)
+    except ValueError:
+        return jsonify({'error': 'since and until must be YYYY-MM-DD'}), 400
+    
+    try:
+        query = search.apply(AuditLog.query, AuditLog, User)
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        logs, next_cursor = keyset_page(
+            query.options(db.joinedload(AuditLog.user)), AuditLog.timestamp, AuditLog.id,
+            cursor=request.args.get('cursor'), per_page=limit
+        )
+        # Counting can cost up to COUNT_LIMIT index lookups; clients keep the first page's total
+        total, total_exact = None, None
+        if not request.args.get('cursor'):
+            total, total_exact = count_matches(query, AuditLog.id)
+        
+        return jsonify({
+            'logs': [log.to_dict() for log in logs],
+            'next_cursor': next_cursor,
+            'total': total,
+            'total_exact': total_exact
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to search logs: {str(e)}'}), 500
+
 # Error handlers
+@app.errorhandler(PasswordPoolFull)
+def password_pool_full(error):
+    # Shed logins quickly when password hashing is saturated rather than queueing them
+    return jsonify({'error': 'Too many sign-in attempts in progress, please retry'}), 503, {'Retry-After': '1'}
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
@@ -502,14 +775,41 @@ def internal_error(error):
     db.session.rollback()
     return jsonify({'error': 'Internal server error'}), 500
 
+# CLI commands
+elms_cli = AppGroup('elms', help='Employee Leave Management API maintenance commands.')
+
+@elms_cli.command('init-db')
+def init_db_command():
+    """Create/upgrade the schema and seed default users (run once per deploy)."""
+    init_database()
+
+@elms_cli.command('rebuild-balances')
+def rebuild_balances_command():
+    """Rebuild the leave balance ledger from approved leave history."""
+    rows = LeaveBalance.rebuild()
+    click.echo(f'✅ Rebuilt leave balance ledger ({rows} rows)')
+
+@elms_cli.command('migrate')
+def migrate_command():
+    """Create missing tables and indexes (safe to run repeatedly)."""
+    created = upgrade_schema(db)
+    click.echo(f'✅ Schema up to date; created indexes: {", ".join(created) or "none"}')
+
+app.cli.add_command(elms_cli)
+
 # Initialize database
 def init_database():
     """Initialize database with tables and default users"""
     with app.app_context():
         try:
-            db.create_all()
+            upgrade_schema(db)
             print("✅ Database tables created successfully!")
             
+            # Backfill the balance ledger the first time it is created on an existing database
+            if LeaveBalance.query.first() is None and LeaveRequest.query.filter_by(status='approved').first():
+                rows = LeaveBalance.rebuild()
+                print(f"📒 Leave balance ledger rebuilt ({rows} rows)")
+            
             # Create default admin user
             admin = User.query.filter_by(username='admin').first()
             if not admin:
@@ -522,8 +522,11 @@ def export_pdf():
     results = query.all()
     
     # Render HTML template for PDF
-    html_content = render_template('reports/pdf_template.html', 
+    html_content = render_template('reports/pdf_template.html',
                                  requests=results,
+                                 total=len(results),
+                                 summary={status: sum(1 for r in results if r.status == status)
+                                          for status in ('pending', 'approved', 'rejected')},
                                  month=month,
                                  team=team,
                                  generated_at=datetime.now())
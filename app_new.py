@@ -1,772 +1,26 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, make_response, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
-from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SelectField, DateField, TextAreaField, SubmitField
-from wtforms.validators import DataRequired, Email, Length, ValidationError, EqualTo
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, date, timedelta
-import csv
-import os
-from functools import wraps
-from io import BytesIO, StringIO
-import secrets
-import re
-
-# Initialize Flask app
-app = Flask(__name__)
-
-# Configuration
-SECRET_KEY = os.environ.get('SECRET_KEY') or secrets.token_hex(16)
-
-# Use instance directory for SQLite database (works in production)
-instance_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
-os.makedirs(instance_path, exist_ok=True)
-db_path = os.path.join(instance_path, 'elms.db')
-
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
-app.config['SECRET_KEY'] = SECRET_KEY
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-print(f"📁 Database path: {db_path}")
-print(f"📁 Instance directory: {instance_path}")
-
-# Production settings
-if os.environ.get('FLASK_ENV') == 'production':
-    app.config['SESSION_COOKIE_SECURE'] = True
-    app.config['SESSION_COOKIE_HTTPONLY'] = True
-    app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
-
-# Initialize extensions
-db = SQLAlchemy(app)
-login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'login'
-login_manager.login_message = 'Please log in to access this page.'
-login_manager.login_message_category = 'info'
-
-# Custom Jinja2 filters
-@app.template_filter('regex_match')
-def regex_match(text, pattern):
-    """Check if text matches the regex pattern"""
-    if text is None:
-        return False
-    return bool(re.search(pattern, str(text), re.IGNORECASE))
-
-# Register the filter as a test as well
-@app.template_test('match')
-def regex_test(text, pattern):
-    """Jinja2 test for regex matching"""
-    if text is None:
-        return False
-    return bool(re.search(pattern, str(text), re.IGNORECASE))
-
-# Database Models
-class User(UserMixin, db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password = db.Column(db.String(200), nullable=False)
-    role = db.Column(db.String(20), nullable=False)  # admin, manager, employee
-    team = db.Column(db.String(50), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    is_active = db.Column(db.Boolean, default=True)
-    last_login = db.Column(db.DateTime)
-    
-    # Relationships
-    leave_requests = db.relationship('LeaveRequest', foreign_keys='LeaveRequest.user_id', backref='employee', lazy='dynamic')
-    managed_requests = db.relationship('LeaveRequest', foreign_keys='LeaveRequest.manager_id', backref='manager', lazy='dynamic')
-    audit_logs = db.relationship('AuditLog', backref='user', lazy='dynamic')
-    
-    def set_password(self, password):
-        self.password = generate_password_hash(password)
-    
-    def check_password(self, password):
-        return check_password_hash(self.password, password)
-    
-    def get_leave_balance(self):
-        # Calculate remaining leave days (assuming 30 days per year)
-        current_year = datetime.now().year
-        approved_leaves = LeaveRequest.query.filter_by(
-            user_id=self.id, 
-            status='approved'
-        ).filter(
-            db.extract('year', LeaveRequest.start_date) == current_year
-        ).all()
-        
-        used_days = sum([(req.end_date - req.start_date).days + 1 for req in approved_leaves])
-        return max(0, 30 - used_days)
-    
-    def __repr__(self):
-        return f'<User {self.username}>'
-
-class LeaveRequest(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    start_date = db.Column(db.Date, nullable=False)
-    end_date = db.Column(db.Date, nullable=False)
-    reason = db.Column(db.Text, nullable=False)
-    status = db.Column(db.String(20), default='pending')  # pending, approved, rejected
-    manager_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
-    decision_reason = db.Column(db.Text, nullable=True)
-    applied_on = db.Column(db.DateTime, default=datetime.utcnow)
-    decided_at = db.Column(db.DateTime, nullable=True)
-    
-    @property
-    def days_count(self):
-        return (self.end_date - self.start_date).days + 1
-    
-    @property
-    def status_class(self):
-        return {
-            'pending': 'warning',
-            'approved': 'success',
-            'rejected': 'danger'
-        }.get(self.status, 'secondary')
-    
-    def __repr__(self):
-        return f'<LeaveRequest {self.id} - {self.status}>'
-
-class AuditLog(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    action = db.Column(db.String(200), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    ip_address = db.Column(db.String(50), nullable=False)
-    details = db.Column(db.Text, nullable=True)
-    
-    def __repr__(self):
-        return f'<AuditLog {self.id} - {self.action}>'
-
-# Initialize database immediately on module import (for production)
-def force_init_database():
-    """Force initialize database on every application start"""
-    try:
-        with app.app_context():
-            print("🔧 Force initializing database...")
-            
-            # Create all tables
-            db.create_all()
-            print("✅ Database tables created!")
-            
-            # Verify tables exist
-            from sqlalchemy import inspect
-            inspector = inspect(db.engine)
-            tables = inspector.get_table_names()
-            print(f"📋 Tables: {tables}")
-            
-            # Create default users if none exist
-            try:
-                user_count = User.query.count()
-                if user_count == 0:
-                    print("👤 Creating default users...")
-                    
-                    # Create admin
-                    admin = User(username='admin', email='admin@elms.com', role='admin', team=None)
-                    admin.set_password('admin123')
-                    db.session.add(admin)
-                    
-                    # Create manager
-                    manager = User(username='manager', email='manager@elms.com', role='manager', team='Engineering')
-                    manager.set_password('manager123')
-                    db.session.add(manager)
-                    
-                    # Create employee
-                    employee = User(username='employee', email='employee@elms.com', role='employee', team='Engineering')
-                    employee.set_password('employee123')
-                    db.session.add(employee)
-                    
-                    db.session.commit()
-                    print("✅ Default users created!")
-                else:
-                    print(f"ℹ️  Found {user_count} existing users")
-                    
-            except Exception as user_error:
-                print(f"⚠️  User creation error: {user_error}")
-                db.session.rollback()
-            
-    except Exception as e:
-        print(f"❌ Database initialization error: {e}")
-        import traceback
-        traceback.print_exc()
-
-# Force initialize database when module is imported
-try:
-    force_init_database()
-except Exception as e:
-    print(f"⚠️  Module-level database init failed: {e}")
-
-# Forms
-class RegistrationForm(FlaskForm):
-    username = StringField('Username', validators=[DataRequired(), Length(min=4, max=20)])
-    email = StringField('Email', validators=[DataRequired(), Email()])
-    password = PasswordField('Password', validators=[DataRequired(), Length(min=6)])
-    confirm_password = PasswordField('Confirm Password', validators=[
-        DataRequired(), EqualTo('password', message='Passwords must match')
-    ])
-    role = SelectField('Role', choices=[
-        ('employee', 'Employee'), 
-        ('manager', 'Manager'), 
-        ('admin', 'Admin')
-    ], validators=[DataRequired()])
-    team = StringField('Team', validators=[Length(max=50)])
-    submit = SubmitField('Register')
-    
-    def validate_username(self, username):
-        user = User.query.filter_by(username=username.data).first()
-        if user:
-            raise ValidationError('Username already exists. Choose a different one.')
-    
-    def validate_email(self, email):
-        user = User.query.filter_by(email=email.data).first()
-        if user:
-            raise ValidationError('Email already registered. Choose a different one.')
-
-class LoginForm(FlaskForm):
-    username = StringField('Username', validators=[DataRequired()])
-    password = PasswordField('Password', validators=[DataRequired()])
-    submit = SubmitField('Login')
-
-class LeaveRequestForm(FlaskForm):
-    start_date = DateField('Start Date', validators=[DataRequired()])
-    end_date = DateField('End Date', validators=[DataRequired()])
-    reason = TextAreaField('Reason', validators=[DataRequired(), Length(min=10, max=500)])
-    submit = SubmitField('Submit Request')
-    
-    def validate_start_date(self, field):
-        if field.data < date.today():
-            raise ValidationError('Start date cannot be in the past.')
-    
-    def validate_end_date(self, field):
-        if hasattr(self, 'start_date') and self.start_date.data and field.data < self.start_date.data:
-            raise ValidationError('End date cannot be before start date.')
-
-class DecisionForm(FlaskForm):
-    decision = SelectField('Decision', choices=[('approved', 'Approve'), ('rejected', 'Reject')], validators=[DataRequired()])
-    decision_reason = TextAreaField('Comment', validators=[Length(max=500)])
-    submit = SubmitField('Submit Decision')
-
-# Helper functions
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
-def log_action(action, details=None):
-    """Log user actions for audit trail"""
-    if current_user.is_authenticated:
-        audit = AuditLog(
-            user_id=current_user.id,
-            action=action,
-            ip_address=get_user_ip(),
-            details=details
-        )
-        db.session.add(audit)
-        db.session.commit()
-
-def role_required(role):
-    """Decorator to restrict access by role"""
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            if not current_user.is_authenticated or current_user.role != role:
-                flash('Access denied. Insufficient permissions.', 'danger')
-                return redirect(url_for('auth.login'))
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
-
-def get_user_ip():
-    """Get user IP address"""
-    return request.environ.get('HTTP_X_REAL_IP', request.remote_addr)
-
-# Authentication Routes
-@app.route('/')
-def index():
-    if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
-    return redirect(url_for('login'))
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
-    
-    form = RegistrationForm()
-    if form.validate_on_submit():
-        user = User(
-            username=form.username.data,
-            email=form.email.data,
-            role=form.role.data,
-            team=form.team.data if form.team.data else None
-        )
-        user.set_password(form.password.data)
-        
-        db.session.add(user)
-        db.session.commit()
-        
-        flash(f'Registration successful! Welcome {user.username}. Please login.', 'success')
-        return redirect(url_for('login'))
-    
-    return render_template('auth/register.html', form=form)
-
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
-    
-    form = LoginForm()
-    if form.validate_on_submit():
-        user = User.query.filter_by(username=form.username.data).first()
-        if user and user.check_password(form.password.data) and user.is_active:
-            login_user(user)
-            user.last_login = datetime.utcnow()
-            db.session.commit()
-            
-            log_action(f'User logged in')
-            flash(f'Welcome back, {user.username}!', 'success')
-            
-            # Redirect based on role
-            if user.role == 'admin':
-                return redirect(url_for('admin_dashboard'))
-            elif user.role == 'manager':
-                return redirect(url_for('manager_dashboard'))
-            else:
-                return redirect(url_for('employee_dashboard'))
-        else:
-            flash('Invalid username or password.', 'danger')
-    
-    return render_template('auth/login_new.html', form=form)
-
-@app.route('/logout')
-@login_required
-def logout():
-    log_action(f'User logged out')
-    logout_user()
-    flash('You have been logged out successfully.', 'info')
-    return redirect(url_for('login'))
-
-# Dashboard Route
-@app.route('/dashboard')
-@login_required
-def dashboard():
-    if current_user.role == 'admin':
-        return redirect(url_for('admin_dashboard'))
-    elif current_user.role == 'manager':
-        return redirect(url_for('manager_dashboard'))
-    else:
-        return redirect(url_for('employee_dashboard'))
-
-# Employee Routes
-@app.route('/employee/dashboard')
-@login_required
-def employee_dashboard():
-    # Get user's leave requests
-    leave_requests = LeaveRequest.query.filter_by(user_id=current_user.id).order_by(LeaveRequest.applied_on.desc()).all()
-    
-    # Calculate statistics
-    total_requests = len(leave_requests)
-    approved_requests = len([r for r in leave_requests if r.status == 'approved'])
-    pending_requests = len([r for r in leave_requests if r.status == 'pending'])
-    rejected_requests = len([r for r in leave_requests if r.status == 'rejected'])
-    leave_balance = current_user.get_leave_balance()
-    
-    return render_template('employee/dashboard_new.html', 
-                         leave_requests=leave_requests,
-                         total_requests=total_requests,
-                         approved_requests=approved_requests,
-                         pending_requests=pending_requests,
-                         rejected_requests=rejected_requests,
-                         leave_balance=leave_balance)
-
-@app.route('/employee/apply-leave', methods=['GET', 'POST'])
-@login_required
-def apply_leave():
-    form = LeaveRequestForm()
-    if form.validate_on_submit():
-        # Check leave balance
-        days_requested = (form.end_date.data - form.start_date.data).days + 1
-        if current_user.get_leave_balance() < days_requested:
-            flash(f'Insufficient leave balance. You have {current_user.get_leave_balance()} days remaining.', 'warning')
-            return render_template('employee/apply_leave.html', form=form)
-        
-        leave_request = LeaveRequest(
-            user_id=current_user.id,
-            start_date=form.start_date.data,
-            end_date=form.end_date.data,
-            reason=form.reason.data
-        )
-        db.session.add(leave_request)
-        db.session.commit()
-        
-        log_action(f'Applied for leave from {form.start_date.data} to {form.end_date.data}', 
-                  f'Days: {days_requested}, Reason: {form.reason.data[:50]}...')
-        flash('Leave request submitted successfully!', 'success')
-        return redirect(url_for('employee_dashboard'))
-    
-    return render_template('employee/apply_leave.html', form=form, leave_balance=current_user.get_leave_balance())
+"""
+Employee Leave Management System (ELMS)
+WSGI entry point: `gunicorn app_new:app`, `flask --app app_new ...`
 
-@app.route('/employee/edit-leave/<int:leave_id>', methods=['GET', 'POST'])
-@login_required
-def edit_leave(leave_id):
-    leave_request = LeaveRequest.query.get_or_404(leave_id)
-    
-    # Check permissions
-    if leave_request.user_id != current_user.id or leave_request.status != 'pending':
-        flash('You can only edit your own pending leave requests.', 'danger')
-        return redirect(url_for('employee_dashboard'))
-    
-    form = LeaveRequestForm(obj=leave_request)
-    if form.validate_on_submit():
-        leave_request.start_date = form.start_date.data
-        leave_request.end_date = form.end_date.data
-        leave_request.reason = form.reason.data
-        db.session.commit()
-        
-        log_action(f'Edited leave request #{leave_id}')
-        flash('Leave request updated successfully!', 'success')
-        return redirect(url_for('employee_dashboard'))
-    
-    return render_template('employee/edit_leave.html', form=form, leave_request=leave_request)
-
-@app.route('/employee/cancel-leave/<int:leave_id>')
-@login_required
-def cancel_leave(leave_id):
-    leave_request = LeaveRequest.query.get_or_404(leave_id)
-    
-    # Check permissions
-    if leave_request.user_id != current_user.id or leave_request.status != 'pending':
-        flash('You can only cancel your own pending leave requests.', 'danger')
-        return redirect(url_for('employee_dashboard'))
-    
-    db.session.delete(leave_request)
-    db.session.commit()
-    
-    log_action(f'Cancelled leave request #{leave_id}')
-    flash('Leave request cancelled successfully!', 'info')
-    return redirect(url_for('employee_dashboard'))
-
-# Manager Routes
-@app.route('/manager/dashboard')
-@login_required
-def manager_dashboard():
-    if current_user.role not in ['manager', 'admin']:
-        flash('Access denied.', 'danger')
-        return redirect(url_for('dashboard'))
-    
-    # Get team leave requests
-    if current_user.role == 'admin':
-        # Admin can see all requests - specify the join condition explicitly
-        leave_requests = LeaveRequest.query.join(User, LeaveRequest.user_id == User.id).order_by(LeaveRequest.applied_on.desc()).all()
-    else:
-        # Manager sees requests from their team - specify the join condition explicitly
-        leave_requests = LeaveRequest.query.join(User, LeaveRequest.user_id == User.id).filter(
-            User.team == current_user.team,
-            User.role == 'employee'
-        ).order_by(LeaveRequest.applied_on.desc()).all()
-    
-    # Apply filters
-    status_filter = request.args.get('status', '')
-    employee_filter = request.args.get('employee', '')
-    start_date_filter = request.args.get('start_date', '')
-    end_date_filter = request.args.get('end_date', '')
-    
-    if status_filter:
-        leave_requests = [r for r in leave_requests if r.status == status_filter]
-    
-    if employee_filter:
-        leave_requests = [r for r in leave_requests if employee_filter.lower() in r.employee.username.lower()]
-    
-    if start_date_filter:
-        start_date = datetime.strptime(start_date_filter, '%Y-%m-%d').date()
-        leave_requests = [r for r in leave_requests if r.start_date >= start_date]
-    
-    if end_date_filter:
-        end_date = datetime.strptime(end_date_filter, '%Y-%m-%d').date()
-        leave_requests = [r for r in leave_requests if r.end_date <= end_date]
-    
-    # Get team employees for filter dropdown
-    if current_user.role == 'admin':
-        team_employees = User.query.filter_by(role='employee').all()
-    else:
-        team_employees = User.query.filter_by(team=current_user.team, role='employee').all()
-    
-    return render_template('manager/dashboard.html', 
-                         leave_requests=leave_requests,
-                         team_employees=team_employees,
-                         filters={
-                             'status': status_filter,
-                             'employee': employee_filter,
-                             'start_date': start_date_filter,
-                             'end_date': end_date_filter
-                         })
+The application itself lives in the elms package and is built by
+elms.create_app(); this module keeps the historical import path working.
+"""
 
-@app.route('/manager/decide-leave/<int:leave_id>', methods=['GET', 'POST'])
-@login_required
-def decide_leave(leave_id):
-    if current_user.role not in ['manager', 'admin']:
-        flash('Access denied.', 'danger')
-        return redirect(url_for('dashboard'))
-    
-    leave_request = LeaveRequest.query.get_or_404(leave_id)
-    
-    # Check if manager can decide on this request
-    if current_user.role == 'manager' and leave_request.employee.team != current_user.team:
-        flash('You can only decide on leave requests from your team.', 'danger')
-        return redirect(url_for('manager_dashboard'))
-    
-    if leave_request.status != 'pending':
-        flash('This leave request has already been decided.', 'warning')
-        return redirect(url_for('manager_dashboard'))
-    
-    form = DecisionForm()
-    if form.validate_on_submit():
-        leave_request.status = form.decision.data
-        leave_request.manager_id = current_user.id
-        leave_request.decision_reason = form.decision_reason.data
-        leave_request.decided_at = datetime.utcnow()
-        db.session.commit()
-        
-        log_action(f'{form.decision.data.title()} leave request #{leave_id} for {leave_request.employee.username}', 
-                  f'Comment: {form.decision_reason.data or "No comment"}')
-        flash(f'Leave request {form.decision.data} successfully!', 'success')
-        return redirect(url_for('manager_dashboard'))
-    
-    return render_template('manager/decide_leave.html', form=form, leave_request=leave_request)
-
-# Admin Routes
-@app.route('/admin/dashboard')
-@login_required
-@role_required('admin')
-def admin_dashboard():
-    # Get statistics
-    total_users = User.query.count()
-    total_employees = User.query.filter_by(role='employee').count()
-    total_managers = User.query.filter_by(role='manager').count()
-    
-    total_requests = LeaveRequest.query.count()
-    pending_requests = LeaveRequest.query.filter_by(status='pending').count()
-    approved_requests = LeaveRequest.query.filter_by(status='approved').count()
-    rejected_requests = LeaveRequest.query.filter_by(status='rejected').count()
-    
-    # Calculate approval rate
-    approval_rate = round((approved_requests / total_requests * 100) if total_requests > 0 else 0, 1)
-    
-    # Get team-wise statistics
-    teams = db.session.query(User.team).filter(User.team.isnot(None)).distinct().all()
-    team_stats = []
-    for team in teams:
-        team_name = team[0]
-        team_requests = LeaveRequest.query.join(User, LeaveRequest.user_id == User.id).filter(User.team == team_name).count()
-        team_stats.append({'name': team_name, 'requests': team_requests})
-    
-    # Get recent activity
-    recent_requests = LeaveRequest.query.order_by(LeaveRequest.applied_on.desc()).limit(5).all()
-    recent_logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).limit(10).all()
-    
-    return render_template('admin/dashboard_new.html',
-                         total_users=total_users,
-                         total_employees=total_employees,
-                         total_managers=total_managers,
-                         total_requests=total_requests,
-                         pending_requests=pending_requests,
-                         approved_requests=approved_requests,
-                         rejected_requests=rejected_requests,
-                         approval_rate=approval_rate,
-                         team_stats=team_stats,
-                         recent_requests=recent_requests,
-                         recent_logs=recent_logs)
-
-@app.route('/admin/users')
-@login_required
-@role_required('admin')
-def admin_users():
-    users = User.query.order_by(User.created_at.desc()).all()
-    return render_template('admin/users.html', users=users)
-
-@app.route('/admin/add-user', methods=['GET', 'POST'])
-@login_required
-@role_required('admin')
-def add_user():
-    form = RegistrationForm()
-    if form.validate_on_submit():
-        user = User(
-            username=form.username.data,
-            email=form.email.data,
-            role=form.role.data,
-            team=form.team.data if form.team.data else None
-        )
-        user.set_password(form.password.data)
-        db.session.add(user)
-        db.session.commit()
-        
-        log_action(f'Added new user: {user.username} ({user.role})')
-        flash(f'User {user.username} added successfully!', 'success')
-        return redirect(url_for('admin_users'))
-    
-    return render_template('admin/add_user.html', form=form)
-
-@app.route('/admin/delete-user/<int:user_id>')
-@login_required
-@role_required('admin')
-def delete_user(user_id):
-    user = User.query.get_or_404(user_id)
-    
-    if user.id == current_user.id:
-        flash('You cannot delete your own account.', 'danger')
-        return redirect(url_for('admin_users'))
-    
-    # Soft delete by deactivating
-    user.is_active = False
-    db.session.commit()
-    
-    log_action(f'Deactivated user: {user.username} ({user.role})')
-    flash(f'User {user.username} deactivated successfully!', 'info')
-    return redirect(url_for('admin_users'))
+import os
 
-@app.route('/admin/audit-logs')
-@login_required
-@role_required('admin')
-def audit_logs():
-    page = request.args.get('page', 1, type=int)
-    logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).paginate(
-        page=page, per_page=50, error_out=False
-    )
-    return render_template('admin/audit_logs.html', logs=logs)
+from elms import create_app
+from elms.cli import init_db as _init_db
+from elms.extensions import db
+from elms.models import User, LeaveRequest, LeaveBalance, AuditLog
 
-# API Routes for real-time updates
-@app.route('/api/dashboard-stats')
-@login_required
-def api_dashboard_stats():
-    """API endpoint for real-time dashboard updates"""
-    if current_user.role == 'employee':
-        leave_requests = LeaveRequest.query.filter_by(user_id=current_user.id).all()
-        stats = {
-            'total_requests': len(leave_requests),
-            'approved_requests': len([r for r in leave_requests if r.status == 'approved']),
-            'pending_requests': len([r for r in leave_requests if r.status == 'pending']),
-            'rejected_requests': len([r for r in leave_requests if r.status == 'rejected']),
-            'leave_balance': current_user.get_leave_balance()
-        }
-    elif current_user.role in ['manager', 'admin']:
-        if current_user.role == 'admin':
-            leave_requests = LeaveRequest.query.all()
-        else:
-            leave_requests = LeaveRequest.query.join(User).filter(User.team == current_user.team).all()
-        
-        stats = {
-            'total_requests': len(leave_requests),
-            'pending_requests': len([r for r in leave_requests if r.status == 'pending']),
-            'approved_requests': len([r for r in leave_requests if r.status == 'approved']),
-            'rejected_requests': len([r for r in leave_requests if r.status == 'rejected'])
-        }
-    
-    return jsonify(stats)
+app = create_app()
 
-@app.route('/api/leave-requests')
-@login_required
-def api_leave_requests():
-    """API endpoint to get leave requests for current user's scope"""
-    if current_user.role == 'employee':
-        requests = LeaveRequest.query.filter_by(user_id=current_user.id).order_by(LeaveRequest.applied_on.desc()).all()
-    elif current_user.role == 'admin':
-        requests = LeaveRequest.query.join(User, LeaveRequest.user_id == User.id).order_by(LeaveRequest.applied_on.desc()).all()
-    else:  # manager
-        requests = LeaveRequest.query.join(User, LeaveRequest.user_id == User.id).filter(
-            User.team == current_user.team, User.role == 'employee'
-        ).order_by(LeaveRequest.applied_on.desc()).all()
-    
-    data = []
-    for req in requests:
-        data.append({
-            'id': req.id,
-            'employee': req.employee.username,
-            'start_date': req.start_date.strftime('%Y-%m-%d'),
-            'end_date': req.end_date.strftime('%Y-%m-%d'),
-            'days': req.days_count,
-            'status': req.status,
-            'status_class': req.status_class,
-            'applied_on': req.applied_on.strftime('%Y-%m-%d %H:%M'),
-            'reason': req.reason[:50] + '...' if len(req.reason) > 50 else req.reason
-        })
-    
-    return jsonify(data)
-
-# Export Routes
-@app.route('/reports/export-csv')
-@login_required
-@role_required('admin')
-def export_csv():
-    # Get filter parameters
-    month = request.args.get('month')
-    team = request.args.get('team')
-    
-    # Build query with explicit join condition
-    query = db.session.query(
-        LeaveRequest.id,
-        User.username.label('employee_username'),
-        User.team,
-        LeaveRequest.start_date,
-        LeaveRequest.end_date,
-        LeaveRequest.reason,
-        LeaveRequest.status,
-        LeaveRequest.applied_on
-    ).join(User, LeaveRequest.user_id == User.id)
-    
-    # Apply filters
-    if month:
-        year, month_num = month.split('-')
-        query = query.filter(
-            db.extract('year', LeaveRequest.applied_on) == int(year),
-            db.extract('month', LeaveRequest.applied_on) == int(month_num)
-        )
-    
-    if team:
-        query = query.filter(User.team == team)
-    
-    # Execute query and create CSV data
-    results = query.all()
-    
-    # Create CSV data using Python's built-in csv module
-    output = StringIO()
-    csv_writer = csv.writer(output)
-    
-    # Write CSV header
-    csv_writer.writerow([
-        'Request ID', 'Employee', 'Team', 'Start Date', 'End Date', 
-        'Days', 'Reason', 'Status', 'Applied Date'
-    ])
-    
-    # Write CSV data rows
-    for r in results:
-        csv_writer.writerow([
-            r.id,
-            r.employee_username,
-            r.team,
-            r.start_date.strftime('%Y-%m-%d'),
-            r.end_date.strftime('%Y-%m-%d'),
-            (r.end_date - r.start_date).days + 1,
-            r.reason,
-            r.status.title(),
-            r.applied_on.strftime('%Y-%m-%d %H:%M')
-        ])
-    
-    # Get CSV content
-    csv_content = output.getvalue()
-    output.close()
-    
-    log_action(f'Exported leave data to CSV')
-    
-    # Create response with CSV content
-    response = make_response(csv_content)
-    response.headers['Content-Type'] = 'text/csv'
-    response.headers['Content-Disposition'] = 'attachment; filename=leave_requests.csv'
-    return response
+# Used by init_db.py / emergency_db_init.py; created by `flask elms init-db`
+instance_path = app.instance_path
 
-# Initialize database and create tables
 def init_db():
-    with app.app_context():
-        db.create_all()
-        print("✅ Database tables created successfully!")
+    """Create the instance directory, bring the schema up to date and seed default users"""
+    _init_db(app)
 
 if __name__ == '__main__':
     init_db()
@@ -777,7 +31,6 @@ if __name__ == '__main__':
     if is_production:
         print("🚀 Employee Leave Management System starting in PRODUCTION mode...")
         print("🔒 Debug mode: DISABLED")
-        print("🗄️ Database: PostgreSQL")
         # In production, gunicorn will handle the app
         port = int(os.environ.get('PORT', 5000))
         app.run(host='0.0.0.0', port=port, debug=False)
@@ -785,6 +38,6 @@ if __name__ == '__main__':
         print("🚀 Employee Leave Management System starting in DEVELOPMENT mode...")
         print("🔧 Debug mode: ENABLED")
         print("📊 You can view the SQLite database using DB Browser for SQLite")
-        print("💾 Database file: leaves.db")
+        print(f"💾 Database: {app.config['SQLALCHEMY_DATABASE_URI']}")
         print("🌐 Access the application at: http://127.0.0.1:5000")
         app.run(debug=True, host='127.0.0.1', port=5000)
@@ -0,0 +1,114 @@
+"""
+Employee Leave Management System (ELMS)
+Audit-log search shared by the web app (elms/admin.py, elms/api.py) and the API (api.py)
+
+The audit pages used OFFSET pagination and counted the whole table on every
+page, so they slowed down as the log grew. A search now costs about the same
+on page 1 and on page 10,000:
+
+    - filters on user, IP, date range and text. The date range is a range scan
+      of ix_audit_log_timestamp_id, and a user is read from
+      ix_audit_log_user_timestamp already in page order
+    - text is matched through the audit_log_fts FTS5 index over action and
+      details (created by migrations.upgrade_schema; LIKE where it is missing).
+      Up to COUNT_LIMIT matches are fetched from the index by id; for more,
+      the timestamp index is walked and each row checked against the matches
+    - pages continue from a (timestamp, id) cursor (see pagination.py)
+    - the total is counted up to COUNT_LIMIT matches and then reported as a
+      lower bound; the web app also caches it (see query_cache.py)
+"""
+
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import column, func, or_, select, table, text
+
+from migrations import AUDIT_FTS_TABLE, has_audit_fts
+
+COUNT_LIMIT = 10_000
+
+
+class AuditSearch:
+    """The filters of one audit search: username, text, IP prefix and a date range (both ends inclusive)"""
+
+    def __init__(self, user='', q='', ip='', since=None, until=None):
+        self.user = user
+        self.q = q
+        self.ip = ip
+        self.since = since
+        self.until = until
+
+    @classmethod
+    def from_args(cls, args):
+        """Parse query-string arguments; raises ValueError for dates that are not YYYY-MM-DD"""
+        return cls(
+            user=args.get('user', '').strip(),
+            q=args.get('q', '').strip(),
+            ip=args.get('ip', '').strip(),
+            since=_parse_date(args.get('since')),
+            until=_parse_date(args.get('until')),
+        )
+
+    def to_args(self):
+        """The filters that are set, as query-string arguments (for next-page links and the form)"""
+        args = {'user': self.user, 'q': self.q, 'ip': self.ip,
+                'since': self.since.isoformat() if self.since else '',
+                'until': self.until.isoformat() if self.until else ''}
+        return {name: value for name, value in args.items() if value}
+
+    def cache_key(self):
+        return '&'.join(f'{name}={value}' for name, value in sorted(self.to_args().items()))
+
+    def apply(self, query, AuditLog, User):
+        """``query`` narrowed to the audit rows matching these filters"""
+        if self.user:
+            # A scalar subquery compares as a single value, so SQLite walks
+            # ix_audit_log_user_timestamp in page order instead of sorting
+            user_id = select(User.id).where(func.lower(User.username) == self.user.lower()).scalar_subquery()
+            query = query.filter(AuditLog.user_id == user_id)
+        if self.ip:
+            query = query.filter(AuditLog.ip_address.startswith(self.ip, autoescape=True))
+        if self.since:
+            query = query.filter(AuditLog.timestamp >= datetime.combine(self.since, datetime.min.time()))
+        if self.until:
+            query = query.filter(AuditLog.timestamp < datetime.combine(self.until + timedelta(days=1), datetime.min.time()))
+        if self.q:
+            query = query.filter(self._text_filter(query.session, AuditLog))
+        return query
+
+    def _text_filter(self, session, AuditLog):
+        match = match_expression(self.q)
+        if match and has_audit_fts(session):
+            matching_ids = select(column('rowid')).select_from(table(AUDIT_FTS_TABLE)).where(
+                text(f'{AUDIT_FTS_TABLE} MATCH :audit_match').bindparams(audit_match=match)
+            )
+            # Few matches: look them up by id and sort them. Many matches (a
+            # common word): "id + 0" keeps SQLite from driving the query from the
+            # match list, so it walks the timestamp index in page order instead
+            capped = session.execute(select(func.count()).select_from(matching_ids.limit(COUNT_LIMIT + 1).subquery()))
+            if capped.scalar() <= COUNT_LIMIT:
+                return AuditLog.id.in_(matching_ids)
+            return (AuditLog.id + 0).in_(matching_ids)
+        needle = self.q.lower()
+        return or_(
+            func.lower(AuditLog.action).contains(needle, autoescape=True),
+            func.lower(AuditLog.details).contains(needle, autoescape=True),
+        )
+
+
+def match_expression(q):
+    """An FTS5 query for rows containing every word of ``q``, each as a prefix ('' if ``q`` has no words)"""
+    # The unicode61 tokenizer splits on everything but letters and digits, so
+    # quoting each word keeps FTS5 operators in user input from being parsed
+    return ' '.join(f'"{word}"*' for word in re.findall(r'[^\W_]+', q))
+
+
+def count_matches(query, id_column, limit=COUNT_LIMIT):
+    """Return ``(count, exact)``: the rows of ``query``, counted up to ``limit``"""
+    capped = query.with_entities(id_column).order_by(None).limit(limit + 1).subquery()
+    count = query.session.query(func.count()).select_from(capped).scalar()
+    return min(count, limit), count <= limit
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
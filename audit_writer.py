@@ -0,0 +1,137 @@
+"""
+Employee Leave Management System (ELMS)
+Batched, asynchronous audit-log writer shared by the web app and the API
+
+log_action() used to add and commit one AuditLog row per user action, costing a
+separate transaction (and fsync on SQLite) for every login, logout, apply and
+decision. AuditWriter queues rows in-process and a background thread inserts
+them with a single executemany per batch.
+
+Configuration:
+    AUDIT_SYNC            write each row immediately in its own commit (compliance mode)
+    AUDIT_BATCH_SIZE      flush as soon as this many rows are queued
+    AUDIT_FLUSH_INTERVAL  flush queued rows at least this often (seconds)
+
+Queued rows are flushed when the process exits normally; rows still queued when
+a worker is killed with SIGKILL are lost, so deployments that cannot accept that
+should enable AUDIT_SYNC.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import weakref
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Writers to close at exit; one hook for all of them, without keeping discarded apps' writers alive
+_open_writers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_writers():
+    for writer in list(_open_writers):
+        writer.close()
+
+
+class AuditWriter:
+    """Queue audit rows and insert them in batches from a background thread"""
+
+    def __init__(self, db, model, app=None):
+        self.db = db
+        self.model = model
+        self.app = None
+        self._queue = queue.Queue()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AUDIT_SYNC', False)
+        app.config.setdefault('AUDIT_BATCH_SIZE', 200)
+        app.config.setdefault('AUDIT_FLUSH_INTERVAL', 1.0)
+        self.app = app
+        _open_writers.add(self)
+
+    def write(self, **row):
+        """Record one audit row; column values are passed as keyword arguments"""
+        row.setdefault('timestamp', datetime.utcnow())
+
+        if self.app.config['AUDIT_SYNC']:
+            self.db.session.add(self.model(**row))
+            self.db.session.commit()
+            return
+
+        self._ensure_thread()
+        self._queue.put(row)
+        if self._queue.qsize() >= self.app.config['AUDIT_BATCH_SIZE']:
+            self._wakeup.set()
+
+    def flush(self):
+        """Insert everything queued so far; returns the number of rows written"""
+        written = 0
+        batch_size = self.app.config['AUDIT_BATCH_SIZE']
+        with self._flush_lock:
+            while True:
+                rows = []
+                while len(rows) < batch_size:
+                    try:
+                        rows.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not rows:
+                    return written
+                self._insert(rows)
+                written += len(rows)
+
+    def close(self):
+        """Stop the background thread and flush any remaining rows"""
+        _open_writers.discard(self)
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout=10)
+        if self.app is not None:
+            self.flush()
+
+    def _ensure_thread(self):
+        # Gunicorn forks workers after import, so every process needs its own thread
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._stopping.clear()
+            if self._pid != os.getpid() or self._thread is None or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        interval = self.app.config['AUDIT_FLUSH_INTERVAL']
+        while not self._stopping.is_set():
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Audit log flush failed')
+
+    def _insert(self, rows):
+        try:
+            with self.app.app_context():
+                with self.db.engine.begin() as conn:
+                    conn.execute(self.model.__table__.insert(), rows)
+        except Exception:
+            # Never drop audit records silently: leave them in the application log
+            for row in rows:
+                logger.error('Unwritten audit record: %r', row)
+            raise
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: admin dashboard statistics
+Compares the original one-COUNT-per-figure queries with the grouped queries in stats.py
+against a seeded database of 100k leave requests.
+
+Usage: python benchmarks/bench_admin_stats.py [--requests 100000] [--users 1000]
+"""
+
+import argparse
+import os
+import tempfile
+
+from sqlalchemy.orm import Session
+
+from common import QueryCounter, make_engine, seed_database, timed
+
+from app_new import db, User, LeaveRequest
+from stats import leave_stats
+
+
+def legacy_stats(session):
+    """The per-figure COUNT queries admin_dashboard used to run"""
+    stats = {
+        'total_users': session.query(User).count(),
+        'total_employees': session.query(User).filter_by(role='employee').count(),
+        'total_managers': session.query(User).filter_by(role='manager').count(),
+        'total_requests': session.query(LeaveRequest).count(),
+        'pending_requests': session.query(LeaveRequest).filter_by(status='pending').count(),
+        'approved_requests': session.query(LeaveRequest).filter_by(status='approved').count(),
+        'rejected_requests': session.query(LeaveRequest).filter_by(status='rejected').count(),
+    }
+    teams = session.query(User.team).filter(User.team.isnot(None)).distinct().all()
+    stats['team_stats'] = [
+        {'name': team, 'requests': session.query(LeaveRequest).join(User, LeaveRequest.user_id == User.id).filter(User.team == team).count()}
+        for (team,) in teams
+    ]
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.gettempdir(), 'elms_bench_stats.db')
+    engine = make_engine(path)
+    print(f"🌱 Seeding {args.users:,} users / {args.requests:,} requests into {path}")
+    seed_database(engine, db.metadata, users=args.users, requests=args.requests)
+
+    print(f"\n{'strategy':<12}{'queries':>10}{'best ms':>12}{'mean ms':>12}")
+    for name, fn in [('legacy', legacy_stats), ('grouped', lambda s: leave_stats(s, User, LeaveRequest))]:
+        with Session(engine) as session:
+            with QueryCounter(engine) as counter:
+                result = fn(session)
+            _, best, mean = timed(lambda: fn(session), repeat=args.repeat)
+        print(f"{name:<12}{counter.count:>10}{best * 1000:>12.1f}{mean * 1000:>12.1f}")
+        assert result['total_requests'] == args.requests
+
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: audit-log retention on a large log
+Seeds --rows audit rows spread over three years and removes the ones older than
+a year two ways, while a second process keeps inserting audit rows the way
+request handlers do (one small transaction every few milliseconds):
+  - one DELETE ... WHERE timestamp < cutoff (what a naive cleanup would run)
+  - elms.audit_archive.archive_audit_logs(): gzip JSONL files per month, batches
+    of AUDIT_ARCHIVE_BATCH_SIZE rows, then vacuum_incremental()
+and reports how long the concurrent writer had to wait at worst, plus the
+database file size and the archive size.
+
+Usage: python benchmarks/bench_audit_archive.py [--rows 500000] [--batch-size 5000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from common import ROOT  # noqa: F401  (puts the project root on sys.path)
+
+# A real file in WAL mode, as in production; must be set before config is imported
+DB_PATH = os.path.join(tempfile.gettempdir(), 'elms_bench_archive.db')
+os.environ['TEST_DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+
+from sqlalchemy import create_engine, delete, insert
+
+from config import ProductionConfig
+from elms import create_app
+from elms.audit_archive import archive_audit_logs, vacuum_incremental
+from elms.extensions import db
+from elms.models import AuditLog, User
+from migrations import upgrade_schema
+from sqlite_pragmas import install_sqlite_pragmas
+
+
+class ConcurrentWriter(multiprocessing.Process):
+    """Insert an audit row every ``interval`` seconds from another process, like a gunicorn worker,
+    and record the slowest insert"""
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stop = multiprocessing.Event()
+        self.worst = multiprocessing.Value('d', 0.0)
+        self.writes = multiprocessing.Value('i', 0)
+
+    def run(self):
+        engine = create_engine(f'sqlite:///{DB_PATH}')
+        install_sqlite_pragmas(engine, ProductionConfig.SQLITE_PRAGMAS)
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            with engine.begin() as conn:
+                conn.execute(insert(AuditLog.__table__), {
+                    'user_id': 1, 'action': 'User logged in', 'timestamp': datetime.utcnow(), 'ip_address': '127.0.0.1',
+                })
+            self.worst.value = max(self.worst.value, time.perf_counter() - started)
+            self.writes.value += 1
+            time.sleep(self.interval)
+
+
+def seed(rows, batch_size=50_000):
+    db.session.remove()
+    db.engine.dispose()
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    upgrade_schema(db)
+    db.session.execute(insert(User), [{'id': 1, 'username': 'bench', 'email': 'bench@elms.test', 'password': '-',
+                                       'role': 'admin', 'is_active': True}])
+    started = datetime.utcnow() - timedelta(days=3 * 365)
+    step = timedelta(days=3 * 365) / rows
+    for offset in range(0, rows, batch_size):
+        db.session.execute(insert(AuditLog), [
+            {'user_id': 1, 'action': f'Approved leave request #{i} for employee', 'timestamp': started + step * i,
+             'ip_address': f'10.0.{i % 256}.{i % 199}', 'details': 'Comment: enjoy the break'}
+            for i in range(offset, min(offset + batch_size, rows))
+        ])
+        db.session.commit()
+
+
+def run(label, fn):
+    writer = ConcurrentWriter()
+    writer.start()
+    time.sleep(0.5)  # let the writer settle into its loop
+    started = time.perf_counter()
+    removed = fn()
+    elapsed = time.perf_counter() - started
+    writer.stop.set()
+    writer.join()
+    # Size once the WAL is checkpointed, which the next idle moment does in production
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+    size = os.path.getsize(DB_PATH) / 1e6
+    print(f"{label:<22}{removed:>10,}{elapsed:>10.1f}{writer.worst.value * 1000:>14.0f}{writer.writes.value:>10,}{size:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    archive_dir = tempfile.mkdtemp(prefix='elms-archive-')
+    app = create_app('testing', blueprints=['api'])
+    app.config.update(AUDIT_ARCHIVE_DIR=archive_dir, AUDIT_ARCHIVE_BATCH_SIZE=args.batch_size)
+    with app.app_context():
+        # WAL and auto_vacuum=INCREMENTAL from the production profile, applied before the file exists
+        install_sqlite_pragmas(db.engine, ProductionConfig.SQLITE_PRAGMAS)
+        cutoff = datetime.utcnow() - timedelta(days=365)
+
+        print(f"\n{'strategy':<22}{'removed':>10}{'seconds':>10}{'worst wait ms':>14}{'writes':>10}{'db MB':>10}")
+        for label in ('single DELETE', 'archive + vacuum'):
+            seed(args.rows)
+            if label == 'single DELETE':
+                def fn():
+                    removed = db.session.execute(delete(AuditLog).where(AuditLog.timestamp < cutoff)).rowcount
+                    db.session.commit()
+                    return removed
+            else:
+                def fn():
+                    removed = archive_audit_logs(cutoff).rows
+                    vacuum_incremental()
+                    return removed
+            run(label, fn)
+
+        files = os.listdir(archive_dir)
+        archived = sum(os.path.getsize(os.path.join(archive_dir, name)) for name in files) / 1e6
+        print(f"\n📦 {len(files) - 1} archive files, {archived:.1f} MB of gzip JSON Lines in {archive_dir}")
+        db.engine.dispose()
+    os.remove(DB_PATH)
+    shutil.rmtree(archive_dir)
+
+
+if __name__ == '__main__':
+    main()
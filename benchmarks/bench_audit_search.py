@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark: audit-log search on a large log
+Seeds --rows audit rows and times a deep page (page --page of 50 rows) three ways:
+  - the old admin page: OFFSET pagination plus a COUNT(*) of the whole table
+  - the same page reached by keyset pagination, with the count capped at COUNT_LIMIT
+  - typical searches (by user, by text through FTS5, by date range, combined),
+    first page plus capped count
+Use --rows 10000000 to reproduce the 10M-row case (seeding takes a few minutes).
+
+Usage: python benchmarks/bench_audit_search.py [--rows 1000000] [--users 1000] [--page 2000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.orm import Session
+
+from common import make_engine, timed
+
+from audit_search import AuditSearch, count_matches
+from elms.extensions import db
+from elms.models import AuditLog, User
+from migrations import create_audit_fts
+from pagination import keyset_page
+
+ACTIONS = [
+    ('User logged in', None),
+    ('User logged out', None),
+    ('Applied for leave: {day} to {day}', 'Reason: family visit'),
+    ('Approved leave request #{n} for user{user:06d}', 'Comment: enjoy the break'),
+    ('Rejected leave request #{n} for user{user:06d}', 'Comment: release week, please move it'),
+    ('Exported leave report', 'Month {day:%Y-%m}'),
+]
+
+
+def seed(engine, users, rows, batch_size=50_000, rng_seed=7):
+    rng = random.Random(rng_seed)
+    db.metadata.create_all(engine, tables=[User.__table__, AuditLog.__table__])
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {'id': i, 'username': f'user{i:06d}', 'email': f'user{i:06d}@elms.test', 'password': '-',
+             'role': 'employee', 'created_at': now, 'is_active': True}
+            for i in range(1, users + 1)
+        ])
+        started = datetime(2020, 1, 1)
+        step = (now - started) / rows
+        batch = []
+        for i in range(1, rows + 1):
+            template, details = ACTIONS[rng.randrange(len(ACTIONS))]
+            user = rng.randrange(1, users + 1)
+            day = date(2020, 1, 1) + timedelta(days=rng.randrange(2000))
+            batch.append({
+                'id': i, 'user_id': user, 'timestamp': started + step * i,
+                'ip_address': f'10.{user % 256}.{rng.randrange(256)}.{rng.randrange(256)}',
+                'action': template.format(day=day, n=i, user=user),
+                'details': details.format(day=day) if details else None,
+            })
+            if len(batch) >= batch_size:
+                conn.execute(insert(AuditLog.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(AuditLog.__table__), batch)
+        conn.execute(text('ANALYZE'))
+    # Build the FTS index in one pass over the seeded rows, like upgrade_schema on an existing database
+    create_audit_fts(engine)
+
+
+def legacy_page(session, page, per_page=50):
+    """What the admin audit page did: COUNT(*) of the table, then OFFSET to the page"""
+    total = session.query(func.count(AuditLog.id)).scalar()
+    items = session.query(AuditLog).order_by(AuditLog.timestamp.desc()).offset((page - 1) * per_page).limit(per_page).all()
+    return total, items
+
+
+def keyset_walk(session, page, per_page=50):
+    """Cursors for every page up to ``page`` (only the last request is timed)"""
+    cursor = None
+    query = session.query(AuditLog)
+    for _ in range(page - 1):
+        _, cursor = keyset_page(query, AuditLog.timestamp, AuditLog.id, cursor=cursor, per_page=per_page)
+    return cursor
+
+
+def search_page(session, search, cursor=None, per_page=50):
+    query = search.apply(session.query(AuditLog), AuditLog, User)
+    items, next_cursor = keyset_page(query, AuditLog.timestamp, AuditLog.id, cursor=cursor, per_page=per_page)
+    return items, count_matches(query, AuditLog.id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--page', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.gettempdir(), 'elms_bench_audit.db')
+    engine = make_engine(path)
+    print(f"🌱 Seeding {args.rows:,} audit rows for {args.users:,} users into {path}")
+    started = time.perf_counter()
+    seed(engine, args.users, args.rows)
+    print(f"   done in {time.perf_counter() - started:.1f}s ({os.path.getsize(path) / 1e6:.0f} MB with the FTS index)")
+
+    recent = (datetime.utcnow() - timedelta(days=30)).date()
+    searches = {
+        'user': AuditSearch(user='user000042'),
+        'text (rare)': AuditSearch(q='approved user000042'),
+        'text (one in twelve)': AuditSearch(q='release week'),
+        'text (one in three)': AuditSearch(q='logged'),
+        'date range (30 days)': AuditSearch(since=recent),
+        'user + text + dates': AuditSearch(user='user000042', q='approved', since=date(2022, 1, 1), until=date(2023, 12, 31)),
+    }
+
+    print(f"\n{'query':<34}{'rows':>8}{'count':>10}{'best ms':>10}{'mean ms':>10}")
+    with Session(engine) as session:
+        (total, items), best, mean = timed(lambda: legacy_page(session, args.page), repeat=args.repeat)
+        print(f"{f'OFFSET page {args.page} + COUNT(*)':<34}{len(items):>8}{total:>10,}{best * 1000:>10.1f}{mean * 1000:>10.1f}")
+        legacy_ids = [item.id for item in items]
+
+        cursor = keyset_walk(session, args.page)
+        (items, (count, exact)), best, mean = timed(lambda: search_page(session, AuditSearch(), cursor), repeat=args.repeat)
+        label = f'{count:,}{"" if exact else "+"}'
+        print(f"{f'keyset page {args.page} + capped count':<34}{len(items):>8}{label:>10}{best * 1000:>10.1f}{mean * 1000:>10.1f}")
+        assert [item.id for item in items] == legacy_ids, 'keyset and OFFSET pages differ'
+
+        for name, search in searches.items():
+            (items, (count, exact)), best, mean = timed(lambda: search_page(session, search), repeat=args.repeat)
+            label = f'{count:,}{"" if exact else "+"}'
+            print(f"{f'search: {name}':<34}{len(items):>8}{label:>10}{best * 1000:>10.1f}{mean * 1000:>10.1f}")
+
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CSV export peak memory
+Compares the original export (query.all() into one StringIO) with the streaming
+iter_leave_csv generator over yield_per batches. Each strategy runs in its own
+process so peak RSS (ru_maxrss) is measured independently.
+
+Usage: python benchmarks/bench_export_csv.py [--requests 1000000]
+"""
+
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import StringIO
+
+from sqlalchemy.orm import Session
+
+from common import make_engine, seed_database
+
+DB_PATH = os.path.join(tempfile.gettempdir(), 'elms_bench_export.db')
+
+
+def export_query(session):
+    from app_new import User, LeaveRequest
+    return session.query(
+        LeaveRequest.id,
+        User.username.label('employee_username'),
+        User.team,
+        LeaveRequest.start_date,
+        LeaveRequest.end_date,
+        LeaveRequest.reason,
+        LeaveRequest.status,
+        LeaveRequest.applied_on
+    ).join(User, LeaveRequest.user_id == User.id).order_by(LeaveRequest.id)
+
+
+def run_legacy(session):
+    output = StringIO()
+    writer = csv.writer(output)
+    for r in export_query(session).all():
+        writer.writerow([r.id, r.employee_username, r.team, r.start_date.strftime('%Y-%m-%d'),
+                         r.end_date.strftime('%Y-%m-%d'), (r.end_date - r.start_date).days + 1,
+                         r.reason, r.status.title(), r.applied_on.strftime('%Y-%m-%d %H:%M')])
+    return len(output.getvalue())
+
+
+def run_streaming(session):
+    from elms.reports import iter_leave_csv
+    # Consume the generator the way a WSGI server would, discarding each chunk after "sending" it
+    return sum(len(chunk) for chunk in iter_leave_csv(export_query(session).yield_per(1000)))
+
+
+def child(strategy):
+    from common import create_engine
+    engine = create_engine(f'sqlite:///{DB_PATH}')
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    with Session(engine) as session:
+        size = {'legacy': run_legacy, 'streaming': run_streaming}[strategy](session)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux
+    print(f"{strategy:<12}{size / 1e6:>12.1f}{elapsed:>10.1f}{peak / 1024:>14.1f}{(peak - baseline) / 1024:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--child', choices=['legacy', 'streaming'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    from app_new import db
+    engine = make_engine(DB_PATH)
+    print(f"🌱 Seeding {args.users:,} users / {args.requests:,} requests into {DB_PATH}")
+    seed_database(engine, db.metadata, users=args.users, requests=args.requests)
+    engine.dispose()
+
+    print(f"\n{'strategy':<12}{'CSV MB':>12}{'secs':>10}{'peak RSS MB':>14}{'growth MB':>14}")
+    for strategy in ['legacy', 'streaming']:
+        subprocess.run([sys.executable, __file__, '--child', strategy], check=True,
+                       stderr=subprocess.DEVNULL)
+    os.remove(DB_PATH)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: login throughput per core at different password hash costs
+For each PASSWORD_HASH_METHOD / PASSWORD_HASH_ITERATIONS setting, times a bare
+password verification and full POST /login requests on one thread, which is
+what one gunicorn sync worker (one core) can sustain during a login storm.
+
+Usage: python benchmarks/bench_login.py [--logins 20] [--costs pbkdf2:sha256:600000 scrypt:32768 ...]
+"""
+
+import argparse
+import time
+
+from common import ROOT  # noqa: F401  (puts the project root on sys.path)
+
+from elms import create_app
+from elms.extensions import db
+from elms.models import User
+from passwords import hash_password, hash_policy, verify_password
+
+DEFAULT_COSTS = [
+    'pbkdf2:sha256:100000',
+    'pbkdf2:sha256:260000',
+    'pbkdf2:sha256:600000',
+    'scrypt:16384',
+    'scrypt:32768',
+]
+
+
+def measure(cost, logins):
+    method, iterations = cost.rsplit(':', 1)
+    app = create_app('testing', blueprints=['auth', 'employee', 'manager', 'admin'])
+    app.config.update(PASSWORD_HASH_METHOD=method, PASSWORD_HASH_ITERATIONS=int(iterations),
+                      QUERY_BUDGET_STRICT=False)
+
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench', email='bench@elms.test', role='employee', team='Engineering')
+        user.set_password('bench-password')
+        db.session.add(user)
+        db.session.commit()
+        policy = hash_policy(app.config)
+
+    password_hash = hash_password('bench-password', policy)
+    started = time.perf_counter()
+    for _ in range(logins):
+        verify_password(password_hash, 'bench-password')
+    verify_ms = (time.perf_counter() - started) * 1000 / logins
+
+    started = time.perf_counter()
+    for _ in range(logins):
+        response = app.test_client().post('/login', data={'username': 'bench', 'password': 'bench-password'})
+        assert response.status_code == 302, response.status_code
+    elapsed = time.perf_counter() - started
+    return verify_ms, elapsed * 1000 / logins, logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--costs', nargs='+', default=DEFAULT_COSTS,
+                        help='method:iterations pairs, e.g. pbkdf2:sha256:600000 or scrypt:32768')
+    args = parser.parse_args()
+
+    print(f"{'policy':<24}{'verify ms':>12}{'login ms':>12}{'logins/s/core':>16}")
+    for cost in args.costs:
+        verify_ms, login_ms, rate = measure(cost, args.logins)
+        print(f"{cost:<24}{verify_ms:>12.1f}{login_ms:>12.1f}{rate:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
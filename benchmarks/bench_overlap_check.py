@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: self-overlap check latency as a user's leave history grows
+Compares loading every request of the user and testing overlaps in Python with
+overlaps.find_overlaps(), the indexed range query on (user_id, status, end_date)
+used by apply/edit. Each history is made of past, non-overlapping requests plus a
+handful of upcoming ones; the checked dates are next month's.
+
+Usage: python benchmarks/bench_overlap_check.py [--histories 10 100 1000 10000 50000] [--repeat 200]
+"""
+
+import argparse
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from common import make_engine, timed
+
+from elms.extensions import db
+from elms.models import LeaveRequest
+from migrations import explain_query_plan
+from overlaps import ACTIVE_STATUSES, find_overlaps
+
+USER_ID = 2
+
+
+def seed(engine, history):
+    """One user with ``history`` past requests (7-day spacing) and 5 upcoming ones"""
+    db.metadata.create_all(engine)
+    today = date.today()
+    with engine.begin() as conn:
+        conn.execute(insert(db.metadata.tables['user']), [
+            {'id': 1, 'username': 'other', 'email': 'other@elms.test', 'password': '-', 'role': 'employee',
+             'team': 'Engineering', 'is_active': True},
+            {'id': USER_ID, 'username': 'busy', 'email': 'busy@elms.test', 'password': '-', 'role': 'employee',
+             'team': 'Engineering', 'is_active': True},
+        ])
+        rows = []
+        for i in range(history):
+            start = today - timedelta(days=7 * (history - i) + 7)
+            rows.append({'user_id': USER_ID, 'start_date': start, 'end_date': start + timedelta(days=2),
+                         'reason': 'Synthetic past leave', 'status': ('approved', 'rejected', 'approved')[i % 3],
+                         'applied_on': datetime.combine(start, datetime.min.time())})
+        for i in range(5):
+            start = today + timedelta(days=60 + 7 * i)
+            rows.append({'user_id': USER_ID, 'start_date': start, 'end_date': start + timedelta(days=2),
+                         'reason': 'Synthetic upcoming leave', 'status': 'pending', 'applied_on': datetime.utcnow()})
+        conn.execute(insert(LeaveRequest.__table__), rows)
+        conn.exec_driver_sql('ANALYZE')
+
+
+def naive_overlaps(session, start_date, end_date):
+    """Load the user's whole history and test each request"""
+    return [
+        leave for leave in session.query(LeaveRequest).filter(LeaveRequest.user_id == USER_ID).all()
+        if leave.status in ACTIVE_STATUSES and leave.start_date <= end_date and leave.end_date >= start_date
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--histories', type=int, nargs='+', default=[10, 100, 1000, 10_000, 50_000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    start_date = date.today() + timedelta(days=30)
+    end_date = start_date + timedelta(days=4)
+    path = os.path.join(tempfile.gettempdir(), 'elms_bench_overlap.db')
+
+    print(f"{'history':>10}{'naive ms':>12}{'indexed ms':>12}")
+    plan = None
+    for history in args.histories:
+        engine = make_engine(path)
+        seed(engine, history)
+        with Session(engine) as session:
+            naive, naive_best, _ = timed(lambda: naive_overlaps(session, start_date, end_date), repeat=args.repeat)
+            session.expunge_all()
+            indexed, indexed_best, _ = timed(
+                lambda: find_overlaps(session, LeaveRequest, USER_ID, start_date, end_date), repeat=args.repeat
+            )
+            assert [leave.id for leave in naive] == [leave.id for leave in indexed]
+            plan = explain_query_plan(session, session.query(LeaveRequest).filter(
+                LeaveRequest.user_id == USER_ID, LeaveRequest.status.in_(ACTIVE_STATUSES),
+                LeaveRequest.end_date >= start_date,
+            ))
+        print(f"{history:>10,}{naive_best * 1000:>12.3f}{indexed_best * 1000:>12.3f}")
+        engine.dispose()
+
+    print(f"\nquery plan: {'; '.join(plan)}")
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
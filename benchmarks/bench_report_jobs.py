@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTML leave report, rendered in the request vs by the report worker
+  - legacy: what export_pdf did: query.all(), render_template() of the whole
+    list into one string, all inside the request
+  - queued: the request only enqueues a report_job (request_report()); the
+    worker then streams the template into a file (run_job()); a second request
+    for the same report is answered from the finished job
+Each strategy runs in its own process so peak RSS (ru_maxrss) is measured independently.
+
+Usage: python benchmarks/bench_report_jobs.py [--requests 200000]
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from common import make_engine, seed_database
+
+# Must be set before config is imported
+DB_PATH = os.path.join(tempfile.gettempdir(), 'elms_bench_reports.db')
+REPORT_DIR = os.path.join(tempfile.gettempdir(), 'elms_bench_reports')
+os.environ['TEST_DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+
+
+def run_legacy(app):
+    from flask import render_template
+    from elms.report_jobs import report_query
+    with app.test_request_context('/reports/export-pdf'):
+        started = time.perf_counter()
+        results = report_query('', '').all()
+        html = render_template('reports/pdf_template.html', requests=results, month=None, team=None,
+                               generated_at=datetime.now(), total=len(results),
+                               summary={status: sum(1 for r in results if r.status == status)
+                                        for status in ('pending', 'approved', 'rejected')})
+        request_seconds = time.perf_counter() - started
+    return request_seconds, request_seconds, None, len(html)
+
+
+def run_queued(app):
+    from elms.extensions import db
+    from elms.models import ReportJob
+    from elms.report_jobs import claim_next, report_path, request_report, run_job, worker_name
+    with app.test_request_context('/reports/export-pdf'):
+        started = time.perf_counter()
+        job_id = request_report('', '', None).id
+        request_seconds = time.perf_counter() - started
+
+    with app.app_context():
+        worker = worker_name()
+        started = time.perf_counter()
+        run_job(claim_next(worker), worker)
+        render_seconds = time.perf_counter() - started
+        size = os.path.getsize(report_path(db.session.get(ReportJob, job_id)))
+
+    with app.test_request_context('/reports/export-pdf'):
+        started = time.perf_counter()
+        assert request_report('', '', None).id == job_id, 'finished report was not reused'
+        cached_seconds = time.perf_counter() - started
+    return request_seconds, render_seconds, cached_seconds, size
+
+
+def child(strategy):
+    from elms import create_app
+    app = create_app('testing', blueprints=['reports'])
+    app.config.update(REPORT_DIR=REPORT_DIR, QUERY_BUDGET_STRICT=False)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    request_seconds, render_seconds, cached_seconds, size = {'legacy': run_legacy, 'queued': run_queued}[strategy](app)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    cached = f'{cached_seconds * 1000:.1f}' if cached_seconds is not None else '-'
+    # ru_maxrss is KiB on Linux
+    print(f"{strategy:<10}{request_seconds * 1000:>14.1f}{render_seconds:>12.1f}{cached:>12}"
+          f"{size / 1e6:>10.1f}{peak / 1024:>14.1f}{(peak - baseline) / 1024:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200_000)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--child', choices=['legacy', 'queued'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    from elms.extensions import db
+    import elms.models  # noqa: F401  (registers every table on db.metadata)
+    engine = make_engine(DB_PATH)
+    print(f"🌱 Seeding {args.users:,} users / {args.requests:,} requests into {DB_PATH}")
+    seed_database(engine, db.metadata, users=args.users, requests=args.requests)
+    engine.dispose()
+    shutil.rmtree(REPORT_DIR, ignore_errors=True)
+
+    print(f"\n{'strategy':<10}{'request ms':>14}{'render s':>12}{'cached ms':>12}{'HTML MB':>10}"
+          f"{'peak RSS MB':>14}{'growth MB':>12}")
+    for strategy in ['legacy', 'queued']:
+        subprocess.run([sys.executable, __file__, '--child', strategy], check=True, stderr=subprocess.DEVNULL)
+    os.remove(DB_PATH)
+    shutil.rmtree(REPORT_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
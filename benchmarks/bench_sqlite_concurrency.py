@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQLite under concurrent gunicorn-style workers
+Runs several processes doing a mixed read/write workload against one database
+file, once with SQLite defaults and once with ProductionConfig.SQLITE_PRAGMAS,
+and reports throughput and "database is locked" failures.
+
+Usage: python benchmarks/bench_sqlite_concurrency.py [--workers 4] [--seconds 10] [--write-ratio 0.1]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+
+from common import make_engine, seed_database
+
+from app_new import db, LeaveRequest, User
+from config import ProductionConfig
+from sqlite_pragmas import install_sqlite_pragmas
+
+DB_PATH = os.path.join(tempfile.gettempdir(), 'elms_bench_concurrency.db')
+
+
+def worker(pragmas, seconds, write_ratio, users, results):
+    engine = create_engine(f'sqlite:///{DB_PATH}', connect_args={'timeout': 0.1})
+    install_sqlite_pragmas(engine, pragmas)
+    rng = random.Random(os.getpid())
+    reads = writes = locked = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        user_id = rng.randrange(2, users + 1)
+        try:
+            if rng.random() < write_ratio:
+                with engine.begin() as conn:
+                    conn.execute(insert(LeaveRequest.__table__), {
+                        'user_id': user_id, 'start_date': date(2026, 1, 1), 'end_date': date(2026, 1, 2),
+                        'reason': 'Concurrency benchmark', 'status': 'pending', 'applied_on': datetime.utcnow(),
+                    })
+                writes += 1
+            else:
+                with engine.connect() as conn:
+                    conn.execute(
+                        select(LeaveRequest.id, LeaveRequest.status, User.username)
+                        .join(User, LeaveRequest.user_id == User.id)
+                        .where(LeaveRequest.user_id == user_id)
+                        .order_by(LeaveRequest.applied_on.desc()).limit(25)
+                    ).all()
+                reads += 1
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+    engine.dispose()
+    results.put((reads, writes, locked))
+
+
+def run(label, pragmas, args):
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(pragmas, args.seconds, args.write_ratio, args.users, results))
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    totals = [sum(values) for values in zip(*(results.get() for _ in processes))]
+    for process in processes:
+        process.join()
+    reads, writes, locked = totals
+    print(f"{label:<12}{reads / args.seconds:>12.0f}{writes / args.seconds:>12.0f}{locked:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12}{'reads/s':>12}{'writes/s':>12}{'locked':>10}")
+    for label, pragmas in [('default', {}), ('production', ProductionConfig.SQLITE_PRAGMAS)]:
+        # Fresh database per profile: journal_mode=WAL persists in the file
+        engine = make_engine(DB_PATH)
+        seed_database(engine, db.metadata, users=args.users, requests=args.requests)
+        engine.dispose()
+        run(label, pragmas, args)
+        for suffix in ['', '-wal', '-shm']:
+            if os.path.exists(DB_PATH + suffix):
+                os.remove(DB_PATH + suffix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark: server CPU for idle dashboards, SSE change feed vs. 30-second polling
+Starts the web app under gunicorn (one gthread worker) against a throwaway
+database, then, for the same wall-clock window, measures the worker's CPU time
+while N dashboards either
+  - hold an idle /api/events stream open (heartbeats only), or
+  - poll /api/dashboard-stats every 30 seconds, as the old dashboard did.
+
+Usage: python benchmarks/bench_sse_idle.py [--dashboards 2000] [--duration 60]
+"""
+
+import argparse
+import http.client
+import http.cookiejar
+import os
+import re
+import selectors
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+from common import ROOT
+
+
+def worker_cpu_seconds(master_pid):
+    """utime + stime of the gunicorn worker(s) forked by ``master_pid``"""
+    ticks = os.sysconf('SC_CLK_TCK')
+    total = 0
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == master_pid:
+            total += (int(fields[11]) + int(fields[12])) / ticks
+    return total
+
+
+def login(base_url):
+    """Log in as the seeded employee and return the session cookie header"""
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    page = opener.open(f'{base_url}/login').read().decode()
+    token = re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', page).group(1)
+    form = urllib.parse.urlencode({'csrf_token': token, 'username': 'employee', 'password': 'employee123'})
+    opener.open(f'{base_url}/login', data=form.encode())
+    return '; '.join(f'{cookie.name}={cookie.value}' for cookie in jar)
+
+
+def wait_for_server(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'{base_url}/login')
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not start')
+
+
+def open_streams(port, cookie, count):
+    """Open ``count`` idle SSE connections; returns the sockets once all have their 200"""
+    request = (f'GET /api/events HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n'
+               f'Accept: text/event-stream\r\n\r\n').encode()
+    streams = []
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port), timeout=60)
+        sock.sendall(request)
+        streams.append(sock)
+    for sock in streams:
+        status = sock.recv(64).split(b'\r\n', 1)[0]
+        if b' 200 ' not in status:
+            raise RuntimeError(f'stream refused: {status!r}')
+        sock.setblocking(False)
+    return streams
+
+
+def drain(streams, stop):
+    """Read (and discard) heartbeats so the server never blocks on a full socket"""
+    selector = selectors.DefaultSelector()
+    for sock in streams:
+        selector.register(sock, selectors.EVENT_READ)
+    while not stop.is_set():
+        for key, _ in selector.select(timeout=0.5):
+            try:
+                key.fileobj.recv(4096)
+            except BlockingIOError:
+                pass
+    selector.close()
+
+
+def poll(port, cookie, dashboards, duration, interval=30.0):
+    """Issue the requests ``dashboards`` tabs polling every ``interval`` s would make over ``duration`` s"""
+    rate = dashboards / interval
+    total = int(rate * duration)
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    started = time.perf_counter()
+    for i in range(total):
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        connection.request('GET', '/api/dashboard-stats', headers={'Cookie': cookie})
+        connection.getresponse().read()
+    remaining = started + duration - time.perf_counter()
+    if remaining > 0:
+        time.sleep(remaining)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dashboards', type=int, default=2000)
+    parser.add_argument('--duration', type=float, default=60.0, help='seconds measured per mode')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='elms-sse-')
+    env = dict(os.environ, FLASK_CONFIG='development', DEV_DATABASE_URL=f'sqlite:///{workdir}/bench.db',
+               SECRET_KEY='bench', SSE_MAX_CONNECTIONS=str(args.dashboards + 10), PYTHONPATH=ROOT)
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app_new', 'elms', 'init-db'],
+                   cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', '1', '-k', 'gthread', '--threads', str(args.dashboards + 50),
+         '--worker-connections', str(args.dashboards + 100), '--backlog', str(args.dashboards + 50),
+         '-b', f'127.0.0.1:{args.port}', '--log-level', 'warning', 'app_new:app'],
+        cwd=ROOT, env=env)
+    base_url = f'http://127.0.0.1:{args.port}'
+    try:
+        wait_for_server(base_url)
+        cookie = login(base_url)
+
+        print(f"{args.dashboards} dashboards, {args.duration:.0f} s per mode\n")
+        print(f"{'mode':<28}{'requests':>10}{'worker CPU s':>14}{'CPU %':>8}")
+
+        streams = open_streams(args.port, cookie, args.dashboards)
+        stop = threading.Event()
+        reader = threading.Thread(target=drain, args=(streams, stop), daemon=True)
+        reader.start()
+        before = worker_cpu_seconds(server.pid)
+        time.sleep(args.duration)
+        cpu = worker_cpu_seconds(server.pid) - before
+        stop.set()
+        reader.join()
+        for sock in streams:
+            sock.close()
+        print(f"{'SSE (idle streams)':<28}{args.dashboards:>10}{cpu:>14.2f}{cpu / args.duration * 100:>7.1f}%")
+
+        time.sleep(2)  # let the worker notice the closed streams
+        before = worker_cpu_seconds(server.pid)
+        requests = poll(args.port, cookie, args.dashboards, args.duration)
+        cpu = worker_cpu_seconds(server.pid) - before
+        print(f"{'polling every 30 s':<28}{requests:>10}{cpu:>14.2f}{cpu / args.duration * 100:>7.1f}%")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark: worker startup cost
+Measures, in fresh interpreter processes as gunicorn would spawn them, how long
+`import app_new` takes and the latency of the first request served afterwards.
+Database initialization (`flask elms init-db`) is timed separately since it now
+runs once per deploy rather than in every worker.
+
+Usage: python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import ROOT
+
+WORKER = r'''
+import json, time
+started = time.perf_counter()
+import app_new
+imported = time.perf_counter()
+client = app_new.app.test_client()
+response = client.get('/login')
+first_request = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({'import': imported - started, 'first_request': first_request - imported}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app_new', 'elms', 'init-db'],
+                   cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+    print(f"🗄️  init-db (once per deploy): {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    print(f"\n{'run':<6}{'import ms':>12}{'first request ms':>20}")
+    results = []
+    for run in range(1, args.runs + 1):
+        output = subprocess.run([sys.executable, '-c', WORKER], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{run:<6}{result['import'] * 1000:>12.0f}{result['first_request'] * 1000:>20.0f}")
+
+    mean = {key: sum(r[key] for r in results) / len(results) for key in ('import', 'first_request')}
+    print(f"{'mean':<6}{mean['import'] * 1000:>12.0f}{mean['first_request'] * 1000:>20.0f}")
+
+
+if __name__ == '__main__':
+    main()
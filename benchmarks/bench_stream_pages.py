@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: admin user list, rendered whole vs streamed
+  - legacy: what admin.users did: User.query.all(), then render_template() of
+    the whole list into one string before the first byte is sent
+  - streaming: stream_page() over yield_per(500) batches; chunks are consumed
+    the way a WSGI server would, discarding each one after "sending" it
+Reports time to first byte, total time and peak RSS. Each strategy runs in its
+own process so peak RSS (ru_maxrss) is measured independently.
+
+Usage: python benchmarks/bench_stream_pages.py [--users 10000]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import make_engine, seed_database
+
+# Must be set before config is imported
+DB_PATH = os.path.join(tempfile.gettempdir(), 'elms_bench_stream_pages.db')
+os.environ['TEST_DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+
+
+def role_counts():
+    from elms.extensions import db
+    from elms.models import User
+    return dict(db.session.query(User.role, db.func.count(User.id)).group_by(User.role).all())
+
+
+def run_legacy():
+    from flask import render_template
+    from elms.models import User
+    started = time.perf_counter()
+    counts = role_counts()
+    html = render_template('admin/users.html', users=User.query.order_by(User.created_at.desc()).all(),
+                           role_counts=counts, total_users=sum(counts.values()))
+    elapsed = time.perf_counter() - started
+    return elapsed, elapsed, len(html.encode())
+
+
+def run_streaming():
+    from elms.models import User
+    from elms.utils import stream_page
+    started = time.perf_counter()
+    counts = role_counts()
+    response = stream_page('admin/users.html', users=User.query.order_by(User.created_at.desc()).yield_per(500),
+                           role_counts=counts, total_users=sum(counts.values()))
+    chunks = iter(response.response)
+    size = len(next(chunks))
+    first_byte = time.perf_counter() - started
+    size += sum(len(chunk) for chunk in chunks)
+    return first_byte, time.perf_counter() - started, size
+
+
+def child(strategy):
+    from flask_login import login_user
+    from elms import create_app
+    from elms.extensions import db
+    from elms.models import User
+    app = create_app('testing')
+    app.config.update(QUERY_BUDGET_STRICT=False)
+    with app.test_request_context('/admin/users'):
+        login_user(db.session.get(User, 1))
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        first_byte, total, size = {'legacy': run_legacy, 'streaming': run_streaming}[strategy]()
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux
+    print(f"{strategy:<12}{first_byte * 1000:>10.1f}{total * 1000:>12.1f}{size / 1e6:>10.1f}"
+          f"{peak / 1024:>14.1f}{(peak - baseline) / 1024:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--child', choices=['legacy', 'streaming'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    from elms.extensions import db
+    import elms.models  # noqa: F401  (registers every table on db.metadata)
+    engine = make_engine(DB_PATH)
+    print(f"🌱 Seeding {args.users:,} users into {DB_PATH}")
+    seed_database(engine, db.metadata, users=args.users, requests=1000)
+    engine.dispose()
+
+    print(f"\n{'strategy':<12}{'TTFB ms':>10}{'total ms':>12}{'HTML MB':>10}{'peak RSS MB':>14}{'growth MB':>12}")
+    for strategy in ['legacy', 'streaming']:
+        subprocess.run([sys.executable, __file__, '--child', strategy], check=True, stderr=subprocess.DEVNULL)
+    os.remove(DB_PATH)
+
+
+if __name__ == '__main__':
+    main()
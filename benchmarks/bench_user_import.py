@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk user import from a 50k-row CSV
+Writes a CSV of --users rows, with some bad rows mixed in (invalid email, duplicates
+in the file, usernames that already exist), then
+  - imports the first --legacy-rows the way add_user does (two uniqueness
+    queries, a hash and a commit per user), and
+  - imports the whole file with elms.user_import.import_users(),
+and checks that every good row was imported and every bad row reported.
+Passwords use --iterations rounds of pbkdf2 so the run measures the import
+machinery rather than the hash cost.
+
+Usage: python benchmarks/bench_user_import.py [--users 50000] [--iterations 1000] [--workers 4]
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from common import ROOT  # noqa: F401  (puts the project root on sys.path)
+
+# A real file, so per-row commits cost what they do in production; must be set before config is imported
+DB_PATH = os.path.join(tempfile.gettempdir(), 'elms_bench_import.db')
+os.environ['TEST_DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+
+from elms import create_app
+from elms.extensions import db
+from elms.models import User
+from elms.user_import import import_users
+from passwords import hash_password, hash_policy
+
+
+def write_csv(path, users):
+    """Returns the number of rows that must be rejected"""
+    bad = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['username', 'email', 'password', 'role', 'team'])
+        for i in range(users):
+            username, email = f'imp{i:06d}', f'imp{i:06d}@elms.test'
+            if i % 1000 == 1:
+                email, bad = 'not-an-email', bad + 1
+            elif i % 1000 == 2:
+                username, bad = f'imp{i - 2:06d}', bad + 1     # repeats a username earlier in the file
+            elif i % 1000 == 3:
+                username, bad = 'existing', bad + 1            # already in the database
+            writer.writerow([username, email, 'import-password', 'employee', f'Team {i % 40}'])
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50_000)
+    parser.add_argument('--legacy-rows', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='elms-import-')
+    csv_path = os.path.join(workdir, 'users.csv')
+    bad = write_csv(csv_path, args.users)
+    print(f"📄 {args.users:,} rows ({bad} bad) in {csv_path}, {os.path.getsize(csv_path) / 1e6:.1f} MB")
+
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    app = create_app('testing', blueprints=['auth', 'admin'])
+    app.config.update(PASSWORD_HASH_ITERATIONS=args.iterations, USER_IMPORT_WORKERS=args.workers)
+    with app.app_context():
+        db.create_all()
+        with open(csv_path, newline='') as f:
+            rows = [tuple(row) for row in list(csv.reader(f))[1:args.legacy_rows + 1]]
+        policy = hash_policy(app.config)
+        started = time.perf_counter()
+        for username, email, password, role, team in rows:
+            if User.query.filter_by(username=username).first() or User.query.filter_by(email=email).first():
+                continue
+            user = User(username=username, email=email, role=role, team=team, password=hash_password(password, policy))
+            db.session.add(user)
+            db.session.commit()
+        legacy = time.perf_counter() - started
+
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(username='existing', email='existing@elms.test', role='employee', password='-'))
+        db.session.commit()
+
+        started = time.perf_counter()
+        with open(csv_path, 'rb') as f:
+            result = import_users(f, 'csv')
+        bulk = time.perf_counter() - started
+
+        assert result.imported == args.users - bad, (result.imported, args.users - bad)
+        assert result.failed == bad, (result.failed, bad)
+        assert User.query.count() == args.users - bad + 1
+
+    print(f"\n{'strategy':<22}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+    print(f"{'per-user (add_user)':<22}{len(rows):>10,}{legacy:>10.2f}{len(rows) / legacy:>12,.0f}")
+    print(f"{'bulk import':<22}{args.users:>10,}{bulk:>10.2f}{args.users / bulk:>12,.0f}")
+    print(f"\n✅ {result.imported:,} imported, {result.failed} rejected as expected "
+          f"({args.workers} hashing threads, pbkdf2 {args.iterations} iterations)")
+    os.remove(DB_PATH)
+    os.remove(csv_path)
+    os.rmdir(workdir)
+
+
+if __name__ == '__main__':
+    main()
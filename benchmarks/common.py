@@ -0,0 +1,102 @@
+"""
+Shared helpers for the ELMS benchmark scripts.
+Each benchmark builds its own throwaway SQLite database so it never touches instance/elms.db.
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine, event, insert
+
+TEAMS = ['Engineering', 'Sales', 'Marketing', 'Finance', 'Support', 'Operations', 'Legal', 'HR', 'Design', 'Product']
+STATUSES = ['pending', 'approved', 'rejected']
+
+
+def make_engine(path, **kwargs):
+    """Create an engine for a fresh benchmark database at ``path``"""
+    if os.path.exists(path):
+        os.remove(path)
+    return create_engine(f'sqlite:///{path}', **kwargs)
+
+
+def seed_database(engine, metadata, users=1000, requests=100_000, batch_size=10_000, rng_seed=42):
+    """Create the schema and bulk insert synthetic users and leave requests"""
+    rng = random.Random(rng_seed)
+    metadata.create_all(engine)
+    user_table = metadata.tables['user']
+    request_table = metadata.tables['leave_request']
+    now = datetime.utcnow()
+
+    user_rows = []
+    for i in range(1, users + 1):
+        role = 'admin' if i == 1 else ('manager' if i % 50 == 0 else 'employee')
+        user_rows.append({
+            'id': i,
+            'username': f'user{i:06d}',
+            'email': f'user{i:06d}@elms.test',
+            'password': 'not-a-real-hash',
+            'role': role,
+            'team': None if role == 'admin' else TEAMS[i % len(TEAMS)],
+            'created_at': now,
+            'is_active': True,
+        })
+
+    with engine.begin() as conn:
+        conn.execute(insert(user_table), user_rows)
+
+        batch = []
+        for i in range(1, requests + 1):
+            start = date(2020, 1, 1) + timedelta(days=rng.randrange(365 * 6))
+            status = rng.choice(STATUSES)
+            batch.append({
+                'id': i,
+                'user_id': rng.randrange(2, users + 1),
+                'start_date': start,
+                'end_date': start + timedelta(days=rng.randrange(10)),
+                'reason': 'Synthetic benchmark leave request',
+                'status': status,
+                'manager_id': None,
+                'applied_on': datetime.combine(start, datetime.min.time()) - timedelta(days=rng.randrange(1, 60)),
+                'decided_at': None if status == 'pending' else now,
+            })
+            if len(batch) >= batch_size:
+                conn.execute(insert(request_table), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(request_table), batch)
+
+
+class QueryCounter:
+    """Count statements executed on an engine while the context is active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+def timed(fn, repeat=5):
+    """Run ``fn`` ``repeat`` times and return (result, best seconds, mean seconds)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return result, min(timings), sum(timings) / len(timings)
@@ -0,0 +1,151 @@
+"""
+Employee Leave Management System (ELMS)
+Set-based approve/reject of many leave requests, shared by the web app (elms/) and the API (api.py)
+
+Deciding requests one at a time costs a get, a lazy load of the employee for
+the team check, a commit and an audit commit per request. decide_leave_requests()
+does the whole batch with a fixed number of statements, whatever its size:
+
+    1. one SELECT ... JOIN user WHERE id IN (...) to check status and team scope
+    2. one UPDATE leave_request ... WHERE id IN (...) AND status = 'pending'
+    3. for approvals, the balance ledger and the team_absence calendar
+       (one SELECT plus executemany UPDATE/INSERT)
+    4. one executemany INSERT of the audit rows
+
+All of it runs in the caller's transaction. The caller commits, after bumping
+scope versions: the UPDATE bypasses the ORM, so the listeners in elms/versions.py
+do not fire.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, insert, select, update
+
+MAX_BATCH = 200
+DECISIONS = ('approved', 'rejected')
+
+
+class DecisionConflict(Exception):
+    """Raised when another request decided some of the batch between the check and the update"""
+
+
+class BulkDecision:
+    """Outcome of decide_leave_requests(): the decided rows and the skipped IDs with reasons"""
+
+    def __init__(self, decision):
+        self.decision = decision
+        self.decided = []
+        self.skipped = {}
+
+    @property
+    def user_ids(self):
+        return {row['user_id'] for row in self.decided}
+
+    def to_dict(self):
+        return {
+            'decision': self.decision,
+            'decided': [row['id'] for row in self.decided],
+            'skipped': [{'id': leave_id, 'reason': reason} for leave_id, reason in sorted(self.skipped.items())],
+        }
+
+
+def decide_leave_requests(session, models, actor, leave_ids, decision, reason, ip_address):
+    """Apply ``decision`` to every pending request in ``leave_ids`` that ``actor`` may decide.
+
+    ``models`` provides the User, LeaveRequest, LeaveBalance, TeamAbsence and
+    AuditLog classes, because elms/ and api.py each declare their own copies.
+    Requests that do not exist, are already decided or belong to another team
+    are skipped and reported, not treated as errors. Nothing is committed.
+    """
+    if decision not in DECISIONS:
+        raise ValueError('Decision must be approved or rejected')
+    leave_ids = sorted(set(leave_ids))
+    if len(leave_ids) > MAX_BATCH:
+        raise ValueError(f'At most {MAX_BATCH} requests can be decided at once')
+
+    User, LeaveRequest = models.User, models.LeaveRequest
+    result = BulkDecision(decision)
+    rows = session.execute(
+        select(LeaveRequest.id, LeaveRequest.user_id, LeaveRequest.status, LeaveRequest.start_date,
+               LeaveRequest.end_date, User.username, User.team)
+        .join(User, LeaveRequest.user_id == User.id)
+        .where(LeaveRequest.id.in_(leave_ids))
+    ).mappings().all()
+
+    found = {row['id']: row for row in rows}
+    for leave_id in leave_ids:
+        row = found.get(leave_id)
+        if row is None:
+            result.skipped[leave_id] = 'not found'
+        elif actor.role == 'manager' and row['team'] != actor.team:
+            result.skipped[leave_id] = 'not in your team'
+        elif row['status'] != 'pending':
+            result.skipped[leave_id] = f'already {row["status"]}'
+        else:
+            result.decided.append(dict(row))
+    if not result.decided:
+        return result
+
+    decided_ids = [row['id'] for row in result.decided]
+    now = datetime.utcnow()
+    updated = session.execute(
+        update(LeaveRequest.__table__)
+        .where(LeaveRequest.__table__.c.id.in_(decided_ids), LeaveRequest.__table__.c.status == 'pending')
+        .values(status=decision, manager_id=actor.id, decision_reason=reason, decided_at=now)
+    )
+    if updated.rowcount != len(decided_ids):
+        raise DecisionConflict('Some of these requests were decided by someone else; reload and try again')
+
+    if decision == 'approved':
+        _record_balances(session, models.LeaveBalance, result.decided, now)
+        _record_absences(session, models.TeamAbsence, result.decided)
+
+    session.execute(insert(models.AuditLog.__table__), [
+        {'user_id': actor.id, 'action': f'{decision.title()} leave request #{row["id"]} for {row["username"]}',
+         'timestamp': now, 'ip_address': ip_address, 'details': f'Comment: {reason or "No comment"} (bulk decision)'}
+        for row in result.decided
+    ])
+    return result
+
+
+def _record_balances(session, LeaveBalance, rows, now):
+    """Add the approved days to the (user, year) ledger rows, creating missing ones"""
+    totals = {}
+    for row in rows:
+        key = (row['user_id'], row['start_date'].year)
+        totals[key] = totals.get(key, 0) + (row['end_date'] - row['start_date']).days + 1
+
+    table = LeaveBalance.__table__
+    existing = set(session.execute(
+        select(table.c.user_id, table.c.year).where(
+            table.c.user_id.in_({user_id for user_id, _ in totals}),
+            table.c.year.in_({year for _, year in totals}),
+        )
+    ).tuples())
+
+    increments = [{'b_user_id': user_id, 'b_year': year, 'b_days': days}
+                  for (user_id, year), days in totals.items() if (user_id, year) in existing]
+    if increments:
+        # Increment in SQL so concurrent approvals don't overwrite each other
+        session.execute(
+            update(table)
+            .where(table.c.user_id == bindparam('b_user_id'), table.c.year == bindparam('b_year'))
+            .values(used_days=table.c.used_days + bindparam('b_days'), updated_at=now),
+            increments,
+        )
+    created = [{'user_id': user_id, 'year': year, 'used_days': days, 'updated_at': now}
+               for (user_id, year), days in totals.items() if (user_id, year) not in existing]
+    if created:
+        session.execute(insert(table), created)
+
+
+def _record_absences(session, TeamAbsence, rows):
+    """One team_absence row per day of each approved request"""
+    days = [
+        {'team': row['team'], 'date': row['start_date'] + timedelta(days=offset),
+         'user_id': row['user_id'], 'leave_request_id': row['id']}
+        for row in rows if row['team'] is not None
+        for offset in range((row['end_date'] - row['start_date']).days + 1)
+    ]
+    if days:
+        session.execute(insert(TeamAbsence.__table__), days)
@@ -4,6 +4,7 @@ Configuration settings and environment variables
 """
 
 import os
+import secrets
 from datetime import timedelta
 
 class Config:
@@ -12,10 +13,13 @@ class Config:
     # Basic Flask configuration
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     
-    # Database configuration
+    # Database configuration (relative SQLite paths resolve inside the instance/ folder)
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///elms.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # SQLite PRAGMAs applied to every new connection (see sqlite_pragmas.py); empty keeps SQLite defaults
+    SQLITE_PRAGMAS = {}
+    
     # Session configuration
     PERMANENT_SESSION_LIFETIME = timedelta(hours=2)
     SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
@@ -29,9 +33,70 @@ class Config:
     # File upload settings (if needed for future features)
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
+    # Blueprints registered by elms.create_app(); e.g. ELMS_BLUEPRINTS=api for an API-only worker
+    ELMS_BLUEPRINTS = (os.environ.get('ELMS_BLUEPRINTS') or 'auth,employee,manager,admin,reports,api').split(',')
+    
     # Pagination settings
     POSTS_PER_PAGE = 25
     
+    # Query budget per request (see query_budget.py)
+    QUERY_BUDGET_DEFAULT = 15
+    QUERY_BUDGETS = {}
+    QUERY_BUDGET_STRICT = False
+    
+    # Audit log writer (see audit_writer.py)
+    AUDIT_SYNC = os.environ.get('AUDIT_SYNC', 'false').lower() in ['true', 'on', '1']
+    AUDIT_BATCH_SIZE = 200
+    AUDIT_FLUSH_INTERVAL = 1.0
+    
+    # Audit-log retention (see elms/audit_archive.py); run `flask elms archive-audit-logs` daily
+    AUDIT_RETENTION_DAYS = int(os.environ.get('AUDIT_RETENTION_DAYS') or 365)  # 0 keeps everything
+    AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR')  # default: <instance>/audit_archive
+    AUDIT_ARCHIVE_BATCH_SIZE = 5000
+    AUDIT_ARCHIVE_PAUSE = 0.05
+    AUDIT_VACUUM_STEP_PAGES = 2000  # 8 MB at the default 4 KiB page size
+    
+    # HTML leave reports rendered by `flask elms report-worker` (see elms/report_jobs.py)
+    REPORT_DIR = os.environ.get('REPORT_DIR')  # default: <instance>/reports
+    REPORT_WORKER_POLL_INTERVAL = 1.0
+    REPORT_HEARTBEAT_INTERVAL = 10.0
+    REPORT_JOB_STALE_AFTER = 120.0  # seconds without a heartbeat before a running job is retried
+    REPORT_JOB_MAX_ATTEMPTS = 3
+    
+    # Password hash cost (see passwords.py); stored hashes are upgraded on the next login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'pbkdf2:sha256'
+    PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS') or 600000)
+    PASSWORD_POOL_WORKERS = int(os.environ.get('PASSWORD_POOL_WORKERS') or 2)
+    PASSWORD_POOL_QUEUE = int(os.environ.get('PASSWORD_POOL_QUEUE') or 8)
+    PASSWORD_POOL_TIMEOUT = 10.0
+    
+    # Bulk user import (see elms/user_import.py); hashing 500 passwords at the default cost takes about a minute,
+    # so uploads are run by `flask elms import-worker` (see elms/import_jobs.py)
+    USER_IMPORT_BATCH_SIZE = 1000
+    USER_IMPORT_WORKERS = int(os.environ.get('USER_IMPORT_WORKERS') or min(8, os.cpu_count() or 1))
+    USER_IMPORT_MAX_UPLOAD_ROWS = int(os.environ.get('USER_IMPORT_MAX_UPLOAD_ROWS') or 500)
+    USER_IMPORT_DIR = os.environ.get('USER_IMPORT_DIR')  # default: <instance>/imports
+    USER_IMPORT_POLL_INTERVAL = 1.0
+    USER_IMPORT_JOB_STALE_AFTER = 300.0  # seconds without a heartbeat before a running import is marked failed
+    
+    # Authenticated user cache (see user_cache.py)
+    USER_CACHE_SIZE = 1024
+    USER_CACHE_TTL = 30.0
+    
+    # Team/employee listing cache (see query_cache.py); use 'file' to share invalidations between workers
+    QUERY_CACHE_BACKEND = os.environ.get('QUERY_CACHE_BACKEND') or 'memory'
+    QUERY_CACHE_SIZE = 512
+    QUERY_CACHE_TTL = 300.0
+    
+    # Dashboard change feed (see elms/events.py)
+    SSE_MAX_CONNECTIONS = int(os.environ.get('SSE_MAX_CONNECTIONS') or 150)  # keep below gunicorn --threads
+    SSE_HEARTBEAT = 20.0
+    SSE_POLL_INTERVAL = 5.0
+    SSE_QUEUE_SIZE = 100
+    
+    # Warn when a leave request would put more than this many team members off on one day (0 disables)
+    LEAVE_TEAM_CONCURRENCY_THRESHOLD = int(os.environ.get('LEAVE_TEAM_CONCURRENCY_THRESHOLD') or 3)
+    
     # Email settings (for future email notifications)
     MAIL_SERVER = os.environ.get('MAIL_SERVER')
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
@@ -53,20 +118,39 @@ class Config:
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DEV_DATABASE_URL') or 'sqlite:///elms-dev.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DEV_DATABASE_URL') or 'sqlite:///elms.db'
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    QUERY_BUDGET_STRICT = True  # Fail tests when a view exceeds its query budget
+    AUDIT_SYNC = True  # Audit rows visible as soon as the request returns
+    PASSWORD_HASH_ITERATIONS = 1000  # Cheap hashes keep login-heavy tests fast
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
+    SECRET_KEY = os.environ.get('SECRET_KEY') or secrets.token_hex(16)
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///elms.db'
     SESSION_COOKIE_SECURE = True  # Require HTTPS
     
+    # Multiple gunicorn workers share one SQLite file: WAL lets readers run alongside
+    # the single writer, and busy_timeout makes writers wait instead of failing
+    SQLITE_PRAGMAS = {
+        'auto_vacuum': 'INCREMENTAL',  # only takes effect on a new database, see elms/audit_archive.py
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',     # fsync at checkpoints only; safe with WAL
+        'busy_timeout': 5000,        # milliseconds
+        'cache_size': -20000,        # negative = KiB, i.e. ~20 MB page cache per connection
+        'mmap_size': 268435456,      # 256 MB memory-mapped reads
+        'temp_store': 'MEMORY',
+    }
+    
+    # Several gunicorn workers: invalidate listings in all of them on commit, not after the TTL
+    QUERY_CACHE_BACKEND = os.environ.get('QUERY_CACHE_BACKEND') or 'file'
+    
     @classmethod
     def init_app(cls, app):
         Config.init_app(app)
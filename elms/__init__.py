@@ -0,0 +1,108 @@
+"""
+Employee Leave Management System (ELMS)
+Application factory
+
+    app = create_app('production')                       # full site
+    app = create_app('production', blueprints=['api'])   # JSON API only
+
+Blueprints are imported only when registered, so an API-only worker never
+imports the WTForms/Flask-WTF form stack used by the HTML views.
+"""
+
+import importlib
+import os
+import re
+
+from flask import Flask, jsonify, request
+from flask_login import LoginManager
+
+from audit_writer import AuditWriter
+from config import config
+from passwords import PasswordPool, PasswordPoolFull
+from query_cache import QueryCache
+from query_budget import init_query_budget
+from sqlite_pragmas import install_sqlite_pragmas
+from user_cache import UserCache
+
+from .events import EventBroker
+from .extensions import db
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Blueprint name -> module defining ``bp``; imported lazily by create_app()
+BLUEPRINTS = {
+    'auth': 'elms.auth',
+    'employee': 'elms.employee',
+    'manager': 'elms.manager',
+    'admin': 'elms.admin',
+    'reports': 'elms.reports',
+    'api': 'elms.api',
+}
+
+
+def default_config_name():
+    """FLASK_CONFIG if set, otherwise 'production' when FLASK_ENV=production"""
+    return os.environ.get('FLASK_CONFIG') or ('production' if os.environ.get('FLASK_ENV') == 'production' else 'default')
+
+
+def create_app(config_name=None, blueprints=None):
+    """Create and configure an ELMS application instance"""
+    config_name = config_name or default_config_name()
+    # templates/, static/ and instance/ live at the project root, next to this package
+    app = Flask(__name__, root_path=PROJECT_ROOT)
+    app.config.from_object(config[config_name])
+    config[config_name].init_app(app)
+
+    # Initialize extensions
+    db.init_app(app)
+    with app.app_context():
+        install_sqlite_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])
+    init_query_budget(app)
+
+    from .models import AuditLog, SessionUser, User, load_user
+    from . import versions  # noqa: F401  (bumps scope versions on every leave write)
+    app.extensions['audit_writer'] = AuditWriter(db, AuditLog, app)
+    app.extensions['user_cache'] = UserCache(db, User, SessionUser, app)
+    app.extensions['password_pool'] = PasswordPool(app)
+    app.extensions['event_broker'] = EventBroker(app)
+    app.extensions['query_cache'] = QueryCache(app)
+    # Team and employee listings only depend on these columns (not e.g. last_login)
+    app.extensions['query_cache'].watch(User, 'users', columns=('username', 'role', 'team', 'is_active'))
+    app.register_error_handler(PasswordPoolFull, password_pool_full)
+
+    names = blueprints if blueprints is not None else app.config['ELMS_BLUEPRINTS']
+
+    login_manager = LoginManager(app)
+    login_manager.user_loader(load_user)
+    # Without the HTML login page, unauthenticated requests get a plain 401
+    login_manager.login_view = 'auth.login' if 'auth' in names else None
+    login_manager.login_message = 'Please log in to access this page.'
+    login_manager.login_message_category = 'info'
+
+    # Custom Jinja2 filter, registered as a test as well
+    app.add_template_filter(regex_match, 'regex_match')
+    app.add_template_test(regex_match, 'match')
+
+    for name in names:
+        module = importlib.import_module(BLUEPRINTS[name])
+        app.register_blueprint(module.bp)
+
+    from .cli import elms_cli
+    app.cli.add_command(elms_cli)
+
+    return app
+
+
+def password_pool_full(error):
+    """Shed logins quickly when password hashing is saturated rather than queueing them"""
+    headers = {'Retry-After': '1'}
+    if request.blueprint == 'api' or request.accept_mimetypes.best == 'application/json':
+        return jsonify({'error': 'Too many sign-in attempts in progress, please retry'}), 503, headers
+    return 'Too many sign-in attempts in progress, please retry in a moment.', 503, headers
+
+
+def regex_match(text, pattern):
+    """Check if text matches the regex pattern"""
+    if text is None:
+        return False
+    return bool(re.search(pattern, str(text), re.IGNORECASE))
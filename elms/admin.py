@@ -0,0 +1,142 @@
+"""
+Employee Leave Management System (ELMS)
+Admin views: statistics, user management and the audit trail
+"""
+
+from flask import Blueprint, current_app, jsonify, render_template, redirect, url_for, flash, request
+from flask_login import login_required, current_user
+
+from audit_search import AuditSearch, count_matches
+from pagination import KeysetPage
+from stats import leave_stats
+
+from .extensions import db
+from .forms import ImportUsersForm, RegistrationForm
+from .import_jobs import job_summary, queue_import
+from .models import User, LeaveRequest, AuditLog, ImportJob
+from .utils import log_action, role_required, stream_page
+
+bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+@bp.route('/dashboard')
+@login_required
+@role_required('admin')
+def dashboard():
+    # Get statistics (user, request and team counts in two grouped queries)
+    stats = leave_stats(db.session, User, LeaveRequest)
+    
+    # Get recent activity
+    recent_requests = LeaveRequest.query.options(db.joinedload(LeaveRequest.employee)).order_by(
+        LeaveRequest.applied_on.desc()
+    ).limit(5).all()
+    recent_logs = AuditLog.query.options(db.joinedload(AuditLog.user)).order_by(AuditLog.timestamp.desc()).limit(10).all()
+    
+    return render_template('admin/dashboard_new.html',
+                         recent_requests=recent_requests,
+                         recent_logs=recent_logs,
+                         **stats)
+
+@bp.route('/users')
+@login_required
+@role_required('admin')
+def users():
+    # Role totals in one grouped query; the rows are read in batches while the page streams
+    role_counts = dict(db.session.query(User.role, db.func.count(User.id)).group_by(User.role).all())
+    users = User.query.order_by(User.created_at.desc()).yield_per(500)
+    return stream_page('admin/users.html', users=users, role_counts=role_counts,
+                       total_users=sum(role_counts.values()))
+
+@bp.route('/add-user', methods=['GET', 'POST'])
+@login_required
+@role_required('admin')
+def add_user():
+    form = RegistrationForm()
+    if form.validate_on_submit():
+        user = User(
+            username=form.username.data,
+            email=form.email.data,
+            role=form.role.data,
+            team=form.team.data if form.team.data else None
+        )
+        user.set_password(form.password.data)
+        db.session.add(user)
+        db.session.commit()
+        
+        log_action(f'Added new user: {user.username} ({user.role})')
+        flash(f'User {user.username} added successfully!', 'success')
+        return redirect(url_for('admin.users'))
+    
+    return render_template('admin/add_user.html', form=form)
+
+@bp.route('/import-users', methods=['GET', 'POST'])
+@login_required
+@role_required('admin')
+def import_users_upload():
+    """Save the upload and queue it for the import worker (see import_jobs.py)"""
+    form = ImportUsersForm()
+    if form.validate_on_submit():
+        upload = form.file.data
+        job = queue_import(upload, current_user.id)
+        
+        log_action(f'Queued user import from {upload.filename}', f'Job #{job.id}')
+        return redirect(url_for('admin.import_job', job_id=job.id))
+    
+    return render_template('admin/import_users.html', form=form, job=None)
+
+@bp.route('/import-users/<int:job_id>')
+@login_required
+@role_required('admin')
+def import_job(job_id):
+    """Import status and report; polled with Accept: application/json until the import has run"""
+    job = ImportJob.query.get_or_404(job_id)
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(job_summary(job))
+    return render_template('admin/import_users.html', form=ImportUsersForm(), job=job)
+
+@bp.route('/delete-user/<int:user_id>')
+@login_required
+@role_required('admin')
+def delete_user(user_id):
+    user = User.query.get_or_404(user_id)
+    
+    if user.id == current_user.id:
+        flash('You cannot delete your own account.', 'danger')
+        return redirect(url_for('admin.users'))
+    
+    # Soft delete by deactivating
+    user.is_active = False
+    db.session.commit()
+    
+    log_action(f'Deactivated user: {user.username} ({user.role})')
+    flash(f'User {user.username} deactivated successfully!', 'info')
+    return redirect(url_for('admin.users'))
+
+@bp.route('/audit-logs')
+@login_required
+@role_required('admin')
+def audit_logs():
+    try:
+        search = AuditSearch.from_args(request.args)
+    except ValueError:
+        flash('Dates must be in YYYY-MM-DD format.', 'warning')
+        search = AuditSearch()
+    query = search.apply(AuditLog.query, AuditLog, User)
+    
+    # Keyset pagination on (timestamp, id), newest first; the page query runs as the table streams
+    logs = KeysetPage(
+        query.options(db.joinedload(AuditLog.user)), AuditLog.timestamp, AuditLog.id,
+        cursor=request.args.get('cursor'), per_page=50
+    )
+    
+    # Counted up to COUNT_LIMIT matches and cached for QUERY_CACHE_TTL, so paging never recounts the log
+    total, total_exact = current_app.extensions['query_cache'].get_or_load(
+        'audit_log', f'count:{search.cache_key()}', lambda: count_matches(query, AuditLog.id)
+    )
+    
+    return stream_page('admin/audit_logs.html',
+                       logs=logs,
+                       filters=search.to_args(),
+                       is_first_page=not request.args.get('cursor'),
+                       total=total,
+                       total_exact=total_exact)
@@ -0,0 +1,191 @@
+"""
+Employee Leave Management System (ELMS)
+Session-authenticated JSON endpoints used by the dashboards for live updates
+
+This blueprint must not import the form stack (forms.py / WTForms) so that an
+API-only worker (create_app(blueprints=['api'])) stays small. The JSON
+endpoints answer conditional GETs from the scope version counters (see
+versions.py); /api/events pushes changes as they happen (see events.py).
+"""
+
+import calendar
+import os
+from datetime import date, datetime, timedelta
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_login import login_required, current_user
+
+from audit_search import AuditSearch, count_matches
+from pagination import keyset_page
+
+from .extensions import db
+from .models import User, LeaveRequest, TeamAbsence, AuditLog
+from .utils import cached_employees, cached_team_names
+from .versions import leave_scope, versioned_json
+
+bp = Blueprint('api', __name__, url_prefix='/api')
+
+
+@bp.route('/dashboard-stats')
+@login_required
+def dashboard_stats():
+    """API endpoint for real-time dashboard updates"""
+    def build():
+        query = db.session.query(LeaveRequest.status, db.func.count(LeaveRequest.id))
+        if current_user.role == 'employee':
+            query = query.filter(LeaveRequest.user_id == current_user.id)
+        elif current_user.role == 'manager':
+            query = query.join(User, LeaveRequest.user_id == User.id).filter(User.team == current_user.team)
+        counts = dict(query.group_by(LeaveRequest.status).all())
+        
+        stats = {
+            'total_requests': sum(counts.values()),
+            'pending_requests': counts.get('pending', 0),
+            'approved_requests': counts.get('approved', 0),
+            'rejected_requests': counts.get('rejected', 0)
+        }
+        if current_user.role == 'employee':
+            stats['leave_balance'] = current_user.get_leave_balance()
+        return stats
+    
+    # The balance is per calendar year, so a new year is a new representation
+    return versioned_json(leave_scope(current_user), build, datetime.now().year)
+
+@bp.route('/leave-requests')
+@login_required
+def leave_requests():
+    """API endpoint to get leave requests for current user's scope"""
+    def build():
+        if current_user.role == 'employee':
+            requests = LeaveRequest.query.filter_by(user_id=current_user.id).options(
+                db.joinedload(LeaveRequest.employee)
+            ).order_by(LeaveRequest.applied_on.desc()).all()
+        elif current_user.role == 'admin':
+            requests = LeaveRequest.query.join(User, LeaveRequest.user_id == User.id).options(
+                db.contains_eager(LeaveRequest.employee)
+            ).order_by(LeaveRequest.applied_on.desc()).all()
+        else:  # manager
+            requests = LeaveRequest.query.join(User, LeaveRequest.user_id == User.id).filter(
+                User.team == current_user.team, User.role == 'employee'
+            ).options(db.contains_eager(LeaveRequest.employee)).order_by(LeaveRequest.applied_on.desc()).all()
+        
+        return [{
+            'id': req.id,
+            'employee': req.employee.username,
+            'start_date': req.start_date.strftime('%Y-%m-%d'),
+            'end_date': req.end_date.strftime('%Y-%m-%d'),
+            'days': req.days_count,
+            'status': req.status,
+            'status_class': req.status_class,
+            'applied_on': req.applied_on.strftime('%Y-%m-%d %H:%M'),
+            'reason': req.reason[:50] + '...' if len(req.reason) > 50 else req.reason
+        } for req in requests]
+    
+    return versioned_json(leave_scope(current_user), build)
+
+@bp.route('/teams')
+@login_required
+def teams():
+    """Names of all teams"""
+    return jsonify(cached_team_names())
+
+@bp.route('/employees')
+@login_required
+def employees():
+    """Active employees: all of them for admins, the caller's team for everyone else"""
+    return jsonify(cached_employees(None if current_user.role == 'admin' else current_user.team))
+
+@bp.route('/cache-stats')
+@login_required
+def cache_stats():
+    """Hit/miss counters of this worker's caches, for monitoring (admin only)"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    user_cache = current_app.extensions['user_cache']
+    return jsonify({
+        'pid': os.getpid(),
+        'query_cache': current_app.extensions['query_cache'].stats(),
+        'user_cache': {'hits': user_cache.hits, 'misses': user_cache.misses},
+    })
+
+@bp.route('/audit-logs')
+@login_required
+def audit_logs():
+    """Search the audit log (admin only): ?user=&q=&ip=&since=&until=&cursor=&limit=, newest first"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    try:
+        search = AuditSearch.from_args(request.args)
+    except ValueError:
+        return jsonify({'error': 'since and until must be YYYY-MM-DD'}), 400
+    query = search.apply(AuditLog.query, AuditLog, User)
+    
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    logs, next_cursor = keyset_page(
+        query.options(db.joinedload(AuditLog.user)), AuditLog.timestamp, AuditLog.id,
+        cursor=request.args.get('cursor'), per_page=limit
+    )
+    total, total_exact = current_app.extensions['query_cache'].get_or_load(
+        'audit_log', f'count:{search.cache_key()}', lambda: count_matches(query, AuditLog.id)
+    )
+    
+    return jsonify({
+        'logs': [{
+            'id': log.id,
+            'user_id': log.user_id,
+            'username': log.user.username,
+            'action': log.action,
+            'timestamp': log.timestamp.isoformat() if log.timestamp else None,
+            'ip_address': log.ip_address,
+            'details': log.details
+        } for log in logs],
+        'next_cursor': next_cursor,
+        'total': total,
+        'total_exact': total_exact
+    })
+
+@bp.route('/teams/<team>/calendar')
+@login_required
+def team_calendar(team):
+    """Who in ``team`` is off on each day of a month (?month=YYYY-MM, default this month)"""
+    if current_user.role != 'admin' and team != current_user.team:
+        return jsonify({'error': 'You can only view your own team calendar'}), 403
+    
+    month = request.args.get('month') or date.today().strftime('%Y-%m')
+    try:
+        first = datetime.strptime(month, '%Y-%m').date()
+    except ValueError:
+        return jsonify({'error': 'month must be YYYY-MM'}), 400
+    last = first.replace(day=calendar.monthrange(first.year, first.month)[1])
+    
+    def build():
+        days = {first + timedelta(days=offset): [] for offset in range(last.day)}
+        # One range scan of the team_absence primary key (team, date, ...)
+        for day, user_id, username in TeamAbsence.between(team, first, last):
+            days[day].append({'user_id': user_id, 'username': username})
+        return {
+            'team': team,
+            'month': first.strftime('%Y-%m'),
+            'days': [{'date': day.isoformat(), 'absent': absent} for day, absent in days.items()],
+        }
+    
+    # Absence rows only change together with the team's leave requests
+    return versioned_json(f'team:{team}', build, first.isoformat())
+
+@bp.route('/events')
+@login_required
+def events():
+    """Server-Sent Events feed of leave changes in the current user's scope"""
+    broker = current_app.extensions['event_broker']
+    subscription = broker.subscribe(leave_scope(current_user))
+    if subscription is None:
+        # Worker at its connection cap. A non-200 answer closes an EventSource for
+        # good, so the dashboard scripts poll and reconnect after a backoff themselves
+        return jsonify({'error': 'Too many open dashboards, please retry'}), 503, {'Retry-After': '10'}
+    
+    # Not wrapped in stream_with_context: the request's database session is
+    # released as soon as this view returns, not held for the life of the stream
+    response = Response(broker.stream(subscription), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+    return response
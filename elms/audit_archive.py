@@ -0,0 +1,251 @@
+"""
+Employee Leave Management System (ELMS)
+Audit-log retention: move old rows to compressed monthly archive files (`flask elms archive-audit-logs`)
+
+Every login, logout and decision adds an audit row and nothing removed them,
+so audit_log grew without bound inside the SQLite file that every other query
+shares. archive_audit_logs() moves rows older than AUDIT_RETENTION_DAYS out of
+the database, AUDIT_ARCHIVE_BATCH_SIZE rows at a time, oldest first:
+
+    1. read the batch (with the username, which may not outlive the user)
+    2. write one gzip JSON Lines file per calendar month in the batch, outside
+       any transaction: written to a temporary name, fsynced, then renamed
+    3. in one short write transaction, record each file in audit_archive and
+       delete the batch from audit_log (the FTS triggers drop it from search)
+
+A crash between 2 and 3 leaves a file that audit_archive does not know about
+while its rows are still live; the next run removes such files before it
+starts, so no row is ever archived twice or lost. A lock file in the archive
+directory keeps two runs from overlapping. audit_archive answers
+"which files cover this date range" and iter_archived() reads them back.
+
+Deleting rows only puts their pages on SQLite's freelist. vacuum_incremental()
+returns them to the filesystem AUDIT_VACUUM_STEP_PAGES at a time, one short
+transaction per step, which needs auto_vacuum=INCREMENTAL (set on new
+databases through SQLITE_PRAGMAS; existing ones are converted once with
+enable_incremental_vacuum(), a full VACUUM).
+
+Configuration:
+    AUDIT_RETENTION_DAYS       rows older than this many days are archived (0 disables archiving)
+    AUDIT_ARCHIVE_DIR          directory of the archive files (default: <instance>/audit_archive)
+    AUDIT_ARCHIVE_BATCH_SIZE   rows moved per write transaction
+    AUDIT_ARCHIVE_PAUSE        seconds to sleep between batches, so request writes get the lock
+    AUDIT_VACUUM_STEP_PAGES    free pages released per incremental vacuum step
+"""
+
+import gzip
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import groupby
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines: runs are not serialized
+    fcntl = None
+
+from flask import current_app
+from sqlalchemy import delete, insert, select, text
+
+from .extensions import db
+from .models import AuditArchive, AuditLog, User
+
+FILENAME_PATTERN = re.compile(r'^audit-\d{4}-\d{2}-\d+-\d+\.jsonl\.gz$')
+
+
+class ArchiveInProgress(Exception):
+    """Raised when another process is already archiving into the same directory"""
+
+
+class ArchiveResult:
+    """Rows moved and files written by one archive_audit_logs() run"""
+
+    def __init__(self, cutoff):
+        self.cutoff = cutoff
+        self.rows = 0
+        self.files = []
+        self.removed_orphans = []
+
+
+def archive_directory():
+    directory = current_app.config.get('AUDIT_ARCHIVE_DIR') or os.path.join(current_app.instance_path, 'audit_archive')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def archive_audit_logs(cutoff=None):
+    """Move audit rows older than ``cutoff`` (default: AUDIT_RETENTION_DAYS ago) to archive files"""
+    config = current_app.config
+    if cutoff is None:
+        if not config['AUDIT_RETENTION_DAYS']:
+            return ArchiveResult(None)
+        cutoff = datetime.utcnow() - timedelta(days=config['AUDIT_RETENTION_DAYS'])
+    directory = archive_directory()
+    with _exclusive(directory):
+        return _archive(directory, ArchiveResult(cutoff))
+
+
+@contextmanager
+def _exclusive(directory):
+    with open(os.path.join(directory, '.lock'), 'w') as lock:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise ArchiveInProgress(f'Another run is archiving audit logs into {directory}') from None
+        yield
+
+
+def _archive(directory, result):
+    config = current_app.config
+    cutoff = result.cutoff
+    result.removed_orphans = remove_orphans(directory)
+
+    columns = (AuditLog.id, AuditLog.user_id, User.username, AuditLog.action, AuditLog.timestamp,
+               AuditLog.ip_address, AuditLog.details)
+    while True:
+        rows = db.session.execute(
+            select(*columns).outerjoin(User, AuditLog.user_id == User.id)
+            .where(AuditLog.timestamp < cutoff)
+            .order_by(AuditLog.timestamp, AuditLog.id)
+            .limit(config['AUDIT_ARCHIVE_BATCH_SIZE'])
+        ).mappings().all()
+        # End the read transaction before the slow file writes
+        db.session.commit()
+        if not rows:
+            break
+
+        entries = [
+            _write_month(directory, month, list(month_rows))
+            for month, month_rows in groupby(rows, key=lambda row: row['timestamp'].strftime('%Y-%m'))
+        ]
+        try:
+            db.session.execute(insert(AuditArchive), entries)
+            db.session.execute(delete(AuditLog).where(AuditLog.id.in_([row['id'] for row in rows])))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            for entry in entries:
+                _remove_quietly(os.path.join(directory, entry['filename']))
+            raise
+
+        result.rows += len(rows)
+        result.files.extend(entry['filename'] for entry in entries)
+        time.sleep(config['AUDIT_ARCHIVE_PAUSE'])
+
+    if result.rows:
+        # Cached audit search counts (see admin.audit_logs) include the moved rows
+        current_app.extensions['query_cache'].invalidate('audit_log')
+    return result
+
+
+def _write_month(directory, month, rows):
+    """Write one month's rows to a new archive file; returns its audit_archive row"""
+    ids = [row['id'] for row in rows]
+    filename = f'audit-{month}-{min(ids)}-{max(ids)}.jsonl.gz'
+    path = os.path.join(directory, filename)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(filename=filename[:-3], mode='wb', fileobj=raw, compresslevel=6) as f:
+            f.write(''.join(json.dumps(dict(row, timestamp=row['timestamp'].isoformat())) + '\n' for row in rows).encode())
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    return {
+        'month': month, 'filename': filename, 'rows': len(rows),
+        'first_id': min(ids), 'last_id': max(ids),
+        'first_timestamp': rows[0]['timestamp'], 'last_timestamp': rows[-1]['timestamp'],
+        'size_bytes': os.path.getsize(path), 'created_at': datetime.utcnow(),
+    }
+
+
+def remove_orphans(directory):
+    """Delete archive files that audit_archive does not list (left by an interrupted run)"""
+    known = set(db.session.execute(select(AuditArchive.filename)).scalars())
+    db.session.commit()
+    removed = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.tmp') or (FILENAME_PATTERN.match(name) and name not in known):
+            _remove_quietly(os.path.join(directory, name))
+            removed.append(name)
+    return removed
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def archives_between(since=None, until=None):
+    """audit_archive rows whose time span overlaps [since, until), oldest first"""
+    query = AuditArchive.query
+    if since is not None:
+        query = query.filter(AuditArchive.last_timestamp >= since)
+    if until is not None:
+        query = query.filter(AuditArchive.first_timestamp < until)
+    return query.order_by(AuditArchive.first_timestamp, AuditArchive.id).all()
+
+
+def iter_archived(since=None, until=None):
+    """Yield archived audit rows (dicts, timestamps as ISO strings) in [since, until), oldest first"""
+    directory = archive_directory()
+    low = since.isoformat() if since is not None else None
+    high = until.isoformat() if until is not None else None
+    for archive in archives_between(since, until):
+        with gzip.open(os.path.join(directory, archive.filename), 'rt') as f:
+            for line in f:
+                row = json.loads(line)
+                # isoformat() strings of naive UTC datetimes sort like the datetimes
+                if (low is None or row['timestamp'] >= low) and (high is None or row['timestamp'] < high):
+                    yield row
+
+
+def vacuum_incremental(max_steps=None):
+    """Release the free pages of an auto_vacuum=INCREMENTAL SQLite database in short steps
+
+    Releases as many pages as were free when it started (pages freed meanwhile by
+    live traffic are left for the next run). Returns the number of pages
+    released, or None if the database is not SQLite or not in incremental mode.
+    """
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return None
+    step_pages = current_app.config['AUDIT_VACUUM_STEP_PAGES']
+    released, steps = 0, 0
+    with engine.connect() as conn:
+        if conn.exec_driver_sql('PRAGMA auto_vacuum').scalar() != 2:
+            return None
+        goal = conn.exec_driver_sql('PRAGMA freelist_count').scalar()
+        while released < goal and (max_steps is None or steps < max_steps):
+            # Count truncated pages: concurrent inserts also take pages off the freelist
+            pages = conn.exec_driver_sql('PRAGMA page_count').scalar()
+            conn.commit()
+            # The pragma frees one page per sqlite3_step() and returns no rows, so a
+            # cursor would stop after the first page; executescript() runs it to
+            # completion. Each call is its own write transaction, so requests wait
+            # for at most one step
+            conn.connection.dbapi_connection.executescript(
+                f'PRAGMA incremental_vacuum({min(goal - released, step_pages)})'
+            )
+            step = pages - conn.exec_driver_sql('PRAGMA page_count').scalar()
+            conn.commit()
+            if step <= 0:
+                break
+            released += step
+            steps += 1
+            time.sleep(current_app.config['AUDIT_ARCHIVE_PAUSE'])
+        # In WAL mode the file only shrinks once the truncation is checkpointed
+        conn.exec_driver_sql('PRAGMA wal_checkpoint(PASSIVE)')
+    return released
+
+
+def enable_incremental_vacuum():
+    """Switch an existing SQLite database to auto_vacuum=INCREMENTAL (a full VACUUM: locks the database)"""
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text('PRAGMA auto_vacuum = INCREMENTAL'))
+        conn.execute(text('VACUUM'))
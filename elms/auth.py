@@ -0,0 +1,100 @@
+"""
+Employee Leave Management System (ELMS)
+Authentication views: login, logout, registration and the role dispatcher
+"""
+
+from contextlib import suppress
+from datetime import datetime
+
+from flask import Blueprint, render_template, redirect, url_for, flash
+from flask_login import login_user, logout_user, login_required, current_user
+
+from passwords import PasswordPoolFull
+
+from .extensions import db
+from .forms import RegistrationForm, LoginForm
+from .models import User
+from .utils import log_action
+
+bp = Blueprint('auth', __name__)
+
+
+@bp.route('/')
+def index():
+    if current_user.is_authenticated:
+        return redirect(url_for('auth.dashboard'))
+    return redirect(url_for('auth.login'))
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if current_user.is_authenticated:
+        return redirect(url_for('auth.dashboard'))
+    
+    form = RegistrationForm()
+    if form.validate_on_submit():
+        user = User(
+            username=form.username.data,
+            email=form.email.data,
+            role=form.role.data,
+            team=form.team.data if form.team.data else None
+        )
+        user.set_password(form.password.data)
+        
+        db.session.add(user)
+        db.session.commit()
+        
+        flash(f'Registration successful! Welcome {user.username}. Please login.', 'success')
+        return redirect(url_for('auth.login'))
+    
+    return render_template('auth/register.html', form=form)
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('auth.dashboard'))
+    
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(username=form.username.data).first()
+        if user and user.check_password(form.password.data) and user.is_active:
+            login_user(user)
+            user.last_login = datetime.utcnow()
+            if user.password_needs_rehash():
+                # Upgrade hashes made under an older cost policy; saved with last_login.
+                # If the hashing pool is busy, the upgrade waits for a later login.
+                with suppress(PasswordPoolFull):
+                    user.set_password(form.password.data)
+            db.session.commit()
+            
+            log_action(f'User logged in')
+            flash(f'Welcome back, {user.username}!', 'success')
+            
+            # Redirect based on role
+            if user.role == 'admin':
+                return redirect(url_for('admin.dashboard'))
+            elif user.role == 'manager':
+                return redirect(url_for('manager.dashboard'))
+            else:
+                return redirect(url_for('employee.dashboard'))
+        else:
+            flash('Invalid username or password.', 'danger')
+    
+    return render_template('auth/login_new.html', form=form)
+
+@bp.route('/logout')
+@login_required
+def logout():
+    log_action(f'User logged out')
+    logout_user()
+    flash('You have been logged out successfully.', 'info')
+    return redirect(url_for('auth.login'))
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    if current_user.role == 'admin':
+        return redirect(url_for('admin.dashboard'))
+    elif current_user.role == 'manager':
+        return redirect(url_for('manager.dashboard'))
+    else:
+        return redirect(url_for('employee.dashboard'))
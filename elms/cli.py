@@ -0,0 +1,237 @@
+"""
+Employee Leave Management System (ELMS)
+Database initialization and maintenance commands (`flask --app app_new elms ...`)
+"""
+
+import json
+import os
+import signal
+import sys
+import threading
+from datetime import date, datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from migrations import explain_query_plan, full_table_scans, upgrade_schema
+
+from . import import_jobs, report_jobs
+from .audit_archive import (archive_audit_logs, archives_between, enable_incremental_vacuum, iter_archived,
+                            vacuum_incremental)
+from .extensions import db
+from .models import User, LeaveRequest, LeaveBalance, AuditLog, TeamAbsence, ReportJob, ImportJob
+from .user_import import format_for, import_users
+
+
+# Database initialization: run once per deploy (`flask --app app_new elms init-db`), never on import,
+# so gunicorn workers boot without touching the database
+def init_db(app=None):
+    """Create the instance directory, bring the schema up to date and seed default users"""
+    app = app or current_app._get_current_object()
+    os.makedirs(app.instance_path, exist_ok=True)
+    print(f"📁 Database: {app.config['SQLALCHEMY_DATABASE_URI']}")
+    
+    with app.app_context():
+        # Create missing tables and indexes
+        created = upgrade_schema(db)
+        print(f"✅ Database schema up to date! (new indexes: {', '.join(created) or 'none'})")
+        
+        # Backfill the balance ledger the first time it is created on an existing database
+        if LeaveBalance.query.first() is None and LeaveRequest.query.filter_by(status='approved').first():
+            rows = LeaveBalance.rebuild()
+            print(f"📒 Leave balance ledger rebuilt ({rows} rows)")
+        
+        # Same for the team absence calendar
+        if TeamAbsence.query.first() is None and LeaveRequest.query.filter_by(status='approved').first():
+            rows = TeamAbsence.rebuild()
+            print(f"📅 Team absence calendar rebuilt ({rows} rows)")
+        
+        # Create default users if none exist
+        user_count = User.query.count()
+        if user_count == 0:
+            print("👤 Creating default users...")
+            
+            # Create admin
+            admin = User(username='admin', email='admin@elms.com', role='admin', team=None)
+            admin.set_password('admin123')
+            db.session.add(admin)
+            
+            # Create manager
+            manager = User(username='manager', email='manager@elms.com', role='manager', team='Engineering')
+            manager.set_password('manager123')
+            db.session.add(manager)
+            
+            # Create employee
+            employee = User(username='employee', email='employee@elms.com', role='employee', team='Engineering')
+            employee.set_password('employee123')
+            db.session.add(employee)
+            
+            db.session.commit()
+            print("✅ Default users created!")
+        else:
+            print(f"ℹ️  Found {user_count} existing users")
+
+# CLI commands
+elms_cli = AppGroup('elms', help='Employee Leave Management System maintenance commands.')
+
+@elms_cli.command('init-db')
+def init_db_command():
+    """Create/upgrade the schema and seed default users (run once per deploy)."""
+    init_db()
+
+@elms_cli.command('rebuild-balances')
+def rebuild_balances_command():
+    """Rebuild the leave balance ledger from approved leave history."""
+    rows = LeaveBalance.rebuild()
+    click.echo(f'✅ Rebuilt leave balance ledger ({rows} rows)')
+
+@elms_cli.command('backfill-absences')
+def backfill_absences_command():
+    """Rebuild the team absence calendar from approved leave history."""
+    rows = TeamAbsence.rebuild()
+    click.echo(f'✅ Rebuilt team absence calendar ({rows} day rows)')
+
+@elms_cli.command('import-users')
+@click.argument('source', type=click.File('rb'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Defaults to the file extension.')
+@click.option('--report', type=click.File('w'), help='Write rejected rows (line, username, error) to this CSV file.')
+def import_users_command(source, fmt, report):
+    """Create users from a CSV or JSON Lines file (columns: username, email, password, role, team)."""
+    result = import_users(source, fmt or format_for(source.name))
+    if report is not None:
+        result.write_report(report)
+    else:
+        for line, username, message in sorted(result.errors):
+            click.echo(f'line {line}: {username or "-"}: {message}', err=True)
+    click.echo(f'✅ Imported {result.imported} users; {result.failed} rows rejected')
+
+@elms_cli.command('archive-audit-logs')
+@click.option('--older-than', 'days', type=int, help='Age in days (default: AUDIT_RETENTION_DAYS).')
+@click.option('--no-vacuum', is_flag=True, help='Leave the freed pages in the database file.')
+def archive_audit_logs_command(days, no_vacuum):
+    """Move old audit rows to gzip JSON Lines files per month, then vacuum incrementally (run daily)."""
+    cutoff = datetime.utcnow() - timedelta(days=days) if days is not None else None
+    result = archive_audit_logs(cutoff)
+    if result.cutoff is None:
+        click.echo('ℹ️  AUDIT_RETENTION_DAYS is 0; audit logs are kept forever')
+        return
+    for name in result.removed_orphans:
+        click.echo(f'🧹 Removed unrecorded archive file from an interrupted run: {name}')
+    click.echo(f'📦 Archived {result.rows} audit rows older than {result.cutoff:%Y-%m-%d %H:%M} '
+               f'into {len(result.files)} files')
+    if no_vacuum:
+        return
+    released = vacuum_incremental()
+    if released is None:
+        click.echo('ℹ️  Free pages kept: the database is not SQLite with auto_vacuum=INCREMENTAL '
+                   '(see `flask elms vacuum --enable-incremental`)')
+    else:
+        click.echo(f'✅ Released {released} free pages to the filesystem')
+
+@elms_cli.command('audit-archives')
+@click.option('--since', type=click.DateTime(['%Y-%m-%d']), help='First day (inclusive).')
+@click.option('--until', type=click.DateTime(['%Y-%m-%d']), help='Last day (inclusive).')
+@click.option('--rows', 'show_rows', is_flag=True, help='Print the archived rows as JSON Lines instead.')
+def audit_archives_command(since, until, show_rows):
+    """List archive files overlapping a date range, or print their rows."""
+    until = until + timedelta(days=1) if until else None
+    if show_rows:
+        for row in iter_archived(since, until):
+            sys.stdout.write(json.dumps(row) + '\n')
+        return
+    for archive in archives_between(since, until):
+        click.echo(f'{archive.month}  {archive.filename}  {archive.rows:>8} rows  '
+                   f'{archive.first_timestamp:%Y-%m-%d %H:%M} .. {archive.last_timestamp:%Y-%m-%d %H:%M}  '
+                   f'{archive.size_bytes / 1024:.0f} KiB')
+
+@elms_cli.command('vacuum')
+@click.option('--enable-incremental', is_flag=True,
+              help='Convert the database to auto_vacuum=INCREMENTAL first (a full VACUUM that locks it; run once, off-hours).')
+@click.option('--max-steps', type=int, help='Stop after this many AUDIT_VACUUM_STEP_PAGES steps.')
+def vacuum_command(enable_incremental, max_steps):
+    """Return free database pages to the filesystem in short steps."""
+    if enable_incremental:
+        enable_incremental_vacuum()
+        click.echo('✅ Database converted to auto_vacuum=INCREMENTAL')
+    released = vacuum_incremental(max_steps)
+    if released is None:
+        raise SystemExit('The database is not SQLite with auto_vacuum=INCREMENTAL; run with --enable-incremental once')
+    click.echo(f'✅ Released {released} free pages to the filesystem')
+
+@elms_cli.command('report-worker')
+@click.option('--once', is_flag=True, help='Exit when the queue is empty instead of waiting for jobs.')
+def report_worker_command(once):
+    """Render queued HTML leave reports (run alongside the web workers; stops cleanly on SIGTERM)."""
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    click.echo(f'🖨️  Report worker started (pid {os.getpid()})')
+    processed = report_jobs.run_worker(stop, once=once)
+    click.echo(f'✅ Report worker stopped after {processed} jobs')
+
+@elms_cli.command('import-worker')
+@click.option('--once', is_flag=True, help='Exit when the queue is empty instead of waiting for jobs.')
+def import_worker_command(once):
+    """Run user imports uploaded through the admin page (run alongside the web workers; stops cleanly on SIGTERM)."""
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    click.echo(f'👥 Import worker started (pid {os.getpid()})')
+    processed = import_jobs.run_worker(stop, once=once)
+    click.echo(f'✅ Import worker stopped after {processed} jobs')
+
+@elms_cli.command('migrate')
+def migrate_command():
+    """Create missing tables and indexes (safe to run repeatedly)."""
+    created = upgrade_schema(db)
+    click.echo(f'✅ Schema up to date; created indexes: {", ".join(created) or "none"}')
+
+def hot_queries():
+    """Representative instances of the queries on the app's hot paths"""
+    today = date.today()
+    team_requests = LeaveRequest.query.join(User, LeaveRequest.user_id == User.id).filter(
+        User.team == 'Engineering', User.role == 'employee'
+    )
+    return {
+        'employee requests': LeaveRequest.query.filter_by(user_id=1).order_by(LeaveRequest.applied_on.desc()),
+        'approved leave for user': LeaveRequest.query.filter(
+            LeaveRequest.user_id == 1, LeaveRequest.status == 'approved', LeaveRequest.start_date >= today
+        ),
+        'overlap check': LeaveRequest.query.filter(
+            LeaveRequest.user_id == 1, LeaveRequest.status.in_(['pending', 'approved']), LeaveRequest.end_date >= today
+        ),
+        'team requests page': team_requests.order_by(LeaveRequest.applied_on.desc().nulls_last(), LeaveRequest.id.desc()).limit(26),
+        'all requests page': LeaveRequest.query.order_by(LeaveRequest.applied_on.desc().nulls_last(), LeaveRequest.id.desc()).limit(26),
+        'requests by status page': LeaveRequest.query.filter(LeaveRequest.status == 'pending').order_by(
+            LeaveRequest.applied_on.desc()
+        ).limit(26),
+        'monthly export': LeaveRequest.query.filter(LeaveRequest.applied_on >= datetime(today.year, today.month, 1)),
+        'team absence month': TeamAbsence.query.filter(
+            TeamAbsence.team == 'Engineering', TeamAbsence.date.between(today.replace(day=1), today)
+        ),
+        'audit log page': AuditLog.query.order_by(AuditLog.timestamp.desc().nulls_last(), AuditLog.id.desc()).limit(50),
+        'audit search by user': AuditLog.query.filter(AuditLog.user_id == 1).order_by(
+            AuditLog.timestamp.desc().nulls_last(), AuditLog.id.desc()
+        ).limit(51),
+        'audit search by date': AuditLog.query.filter(
+            AuditLog.timestamp >= datetime(today.year, today.month, 1), AuditLog.timestamp < datetime.utcnow()
+        ).order_by(AuditLog.timestamp.desc().nulls_last(), AuditLog.id.desc()).limit(51),
+        'report queue': ReportJob.query.filter(ReportJob.status == 'queued').order_by(ReportJob.id).limit(1),
+        'report cache lookup': ReportJob.query.filter(
+            ReportJob.month == f'{today:%Y-%m}', ReportJob.team == 'Engineering', ReportJob.data_version == 1
+        ).order_by(ReportJob.id.desc()),
+        'import queue': ImportJob.query.filter(ImportJob.status == 'queued').order_by(ImportJob.id).limit(1),
+    }
+
+@elms_cli.command('check-indexes')
+def check_indexes_command():
+    """EXPLAIN each hot query and fail if any scans leave_request, team_absence, audit_log, report_job or import_job without an index."""
+    failures = 0
+    for name, query in hot_queries().items():
+        plan = explain_query_plan(db.session, query)
+        scans = full_table_scans(plan, {'leave_request', 'team_absence', 'audit_log', 'report_job', 'import_job'})
+        failures += bool(scans)
+        click.echo(f'{"❌" if scans else "✅"} {name}: {"; ".join(plan)}')
+    if failures:
+        raise SystemExit(f'{failures} hot queries fall back to full table scans')
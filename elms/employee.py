@@ -0,0 +1,131 @@
+"""
+Employee Leave Management System (ELMS)
+Employee views: own requests, apply, edit and cancel
+"""
+
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash
+from flask_login import login_required, current_user
+
+from overlaps import busy_team_days, describe_busy_days, describe_overlap, find_overlaps
+
+from .events import publish_leave_change
+from .extensions import db
+from .forms import LeaveRequestForm
+from .models import LeaveRequest, TeamAbsence
+from .utils import log_action
+
+bp = Blueprint('employee', __name__, url_prefix='/employee')
+
+
+def check_overlaps(start_date, end_date, exclude_id=None):
+    """Flash and return False if the dates overlap the user's own pending/approved leave;
+    flash a warning (but allow the request) when the team is already busy on some of them"""
+    overlapping = find_overlaps(db.session, LeaveRequest, current_user.id, start_date, end_date, exclude_id)
+    if overlapping:
+        flash(describe_overlap(overlapping[0]), 'danger')
+        return False
+    
+    busy_days = busy_team_days(db.session, TeamAbsence, current_user.team, start_date, end_date,
+                               current_app.config['LEAVE_TEAM_CONCURRENCY_THRESHOLD'], current_user.id)
+    if busy_days:
+        flash(describe_busy_days(busy_days), 'warning')
+    return True
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    # Get user's leave requests
+    leave_requests = LeaveRequest.query.filter_by(user_id=current_user.id).order_by(LeaveRequest.applied_on.desc()).all()
+    
+    # Calculate statistics
+    total_requests = len(leave_requests)
+    approved_requests = len([r for r in leave_requests if r.status == 'approved'])
+    pending_requests = len([r for r in leave_requests if r.status == 'pending'])
+    rejected_requests = len([r for r in leave_requests if r.status == 'rejected'])
+    leave_balance = current_user.get_leave_balance()
+    
+    return render_template('employee/dashboard_new.html', 
+                         leave_requests=leave_requests,
+                         total_requests=total_requests,
+                         approved_requests=approved_requests,
+                         pending_requests=pending_requests,
+                         rejected_requests=rejected_requests,
+                         leave_balance=leave_balance)
+
+@bp.route('/apply-leave', methods=['GET', 'POST'])
+@login_required
+def apply_leave():
+    form = LeaveRequestForm()
+    if form.validate_on_submit():
+        # Check leave balance
+        days_requested = (form.end_date.data - form.start_date.data).days + 1
+        leave_balance = current_user.get_leave_balance()
+        if leave_balance < days_requested:
+            flash(f'Insufficient leave balance. You have {leave_balance} days remaining.', 'warning')
+            return render_template('employee/apply_leave.html', form=form)
+        
+        if not check_overlaps(form.start_date.data, form.end_date.data):
+            return render_template('employee/apply_leave.html', form=form, leave_balance=leave_balance)
+        
+        leave_request = LeaveRequest(
+            user_id=current_user.id,
+            start_date=form.start_date.data,
+            end_date=form.end_date.data,
+            reason=form.reason.data
+        )
+        db.session.add(leave_request)
+        db.session.commit()
+        publish_leave_change('applied', leave_request, current_user.team,
+                             {'total_requests': 1, 'pending_requests': 1})
+        
+        log_action(f'Applied for leave from {form.start_date.data} to {form.end_date.data}', 
+                  f'Days: {days_requested}, Reason: {form.reason.data[:50]}...')
+        flash('Leave request submitted successfully!', 'success')
+        return redirect(url_for('employee.dashboard'))
+    
+    return render_template('employee/apply_leave.html', form=form, leave_balance=current_user.get_leave_balance())
+
+@bp.route('/edit-leave/<int:leave_id>', methods=['GET', 'POST'])
+@login_required
+def edit_leave(leave_id):
+    leave_request = LeaveRequest.query.get_or_404(leave_id)
+    
+    # Check permissions
+    if leave_request.user_id != current_user.id or leave_request.status != 'pending':
+        flash('You can only edit your own pending leave requests.', 'danger')
+        return redirect(url_for('employee.dashboard'))
+    
+    form = LeaveRequestForm(obj=leave_request)
+    if form.validate_on_submit() and check_overlaps(form.start_date.data, form.end_date.data, exclude_id=leave_id):
+        leave_request.start_date = form.start_date.data
+        leave_request.end_date = form.end_date.data
+        leave_request.reason = form.reason.data
+        db.session.commit()
+        publish_leave_change('edited', leave_request, current_user.team, {})
+        
+        log_action(f'Edited leave request #{leave_id}')
+        flash('Leave request updated successfully!', 'success')
+        return redirect(url_for('employee.dashboard'))
+    
+    return render_template('employee/edit_leave.html', form=form, leave_request=leave_request)
+
+@bp.route('/cancel-leave/<int:leave_id>')
+@login_required
+def cancel_leave(leave_id):
+    leave_request = LeaveRequest.query.get_or_404(leave_id)
+    
+    # Check permissions
+    if leave_request.user_id != current_user.id or leave_request.status != 'pending':
+        flash('You can only cancel your own pending leave requests.', 'danger')
+        return redirect(url_for('employee.dashboard'))
+    
+    cancelled = {column: getattr(leave_request, column) for column in ('id', 'user_id', 'start_date', 'end_date')}
+    TeamAbsence.clear(leave_request.id)
+    db.session.delete(leave_request)
+    db.session.commit()
+    publish_leave_change('cancelled', dict(cancelled, status='cancelled'), current_user.team,
+                         {'total_requests': -1, 'pending_requests': -1})
+    
+    log_action(f'Cancelled leave request #{leave_id}')
+    flash('Leave request cancelled successfully!', 'info')
+    return redirect(url_for('employee.dashboard'))
@@ -0,0 +1,209 @@
+"""
+Employee Leave Management System (ELMS)
+In-process pub/sub feeding the Server-Sent Events change feed (/api/events)
+
+Dashboards used to poll /api/dashboard-stats every 30 seconds from every open
+tab. Now each tab keeps one idle SSE connection subscribed to its scope (the
+same 'all' / 'team:<name>' / 'user:<id>' scopes as versions.py). The apply,
+edit, cancel and decide views publish an event to every scope that can see
+the request once their transaction has committed. An event carries the
+request's new status and the change to each dashboard counter, so clients
+update without asking the server for anything.
+
+Subscribers live in the worker process that accepted their connection. A
+background thread per process therefore also watches the scope_version
+counters of subscribed scopes (one indexed query every SSE_POLL_INTERVAL
+seconds) and sends a 'refresh' event when a write made by another worker
+changes one of them.
+
+Configuration:
+    SSE_MAX_CONNECTIONS  open streams allowed per worker; further ones get 503
+    SSE_HEARTBEAT        seconds between keep-alive comments on an idle stream
+    SSE_POLL_INTERVAL    seconds between scope_version checks for cross-worker writes
+    SSE_QUEUE_SIZE       undelivered events kept per stream before it is told to refresh
+
+Every open stream holds a server thread (or greenlet), so the web workers
+run with gunicorn's gthread worker class (see Procfile); SSE_MAX_CONNECTIONS
+must stay below --threads so ordinary requests always find a free thread.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import select
+
+from .extensions import db
+from .models import ScopeVersion
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One open event stream"""
+
+    def __init__(self, scope, maxsize):
+        self.scope = scope
+        self.queue = queue.Queue(maxsize)
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # A stalled client: drop what it missed and have it reload its stats
+            with self.queue.mutex:
+                self.queue.queue.clear()
+            self.queue.put_nowait({'type': 'refresh'})
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """Fan events out to the subscriptions of each scope in this process"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._subscriptions = defaultdict(set)
+        self._count = 0
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._poller = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SSE_MAX_CONNECTIONS', 150)
+        app.config.setdefault('SSE_HEARTBEAT', 20.0)
+        app.config.setdefault('SSE_POLL_INTERVAL', 5.0)
+        app.config.setdefault('SSE_QUEUE_SIZE', 100)
+        self.app = app
+
+    @property
+    def connections(self):
+        return self._count
+
+    def subscribe(self, scope):
+        """Open a subscription to ``scope``; returns None when the worker is at its connection cap"""
+        self._ensure_poller()
+        with self._lock:
+            if self._count >= self.app.config['SSE_MAX_CONNECTIONS']:
+                return None
+            subscription = Subscription(scope, self.app.config['SSE_QUEUE_SIZE'])
+            self._subscriptions[scope].add(subscription)
+            self._count += 1
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.scope)
+            if subscribers is not None and subscription in subscribers:
+                subscribers.discard(subscription)
+                self._count -= 1
+                if not subscribers:
+                    del self._subscriptions[subscription.scope]
+
+    def publish(self, scope, event):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(scope, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def stream(self, subscription):
+        """Yield the SSE wire format for ``subscription`` until the client goes away"""
+        heartbeat = self.app.config['SSE_HEARTBEAT']
+        try:
+            # Reconnect after 5 s if the connection drops
+            yield 'retry: 5000\n\n'
+            while True:
+                event = subscription.get(heartbeat)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def note_versions(self, scopes):
+        """Record the current scope versions after a local publish so the poller doesn't repeat it"""
+        if self._count:
+            self._versions.update(self._read_versions(scopes))
+
+    def _read_versions(self, scopes):
+        rows = db.session.execute(
+            select(ScopeVersion.scope, ScopeVersion.version).where(ScopeVersion.scope.in_(scopes))
+        )
+        return dict(rows.all())
+
+    def _ensure_poller(self):
+        # Gunicorn forks workers after import, so every process needs its own thread
+        if self._pid == os.getpid() and self._poller is not None and self._poller.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid() or self._poller is None or not self._poller.is_alive():
+                if self._pid != os.getpid():
+                    self._subscriptions.clear()
+                    self._count = 0
+                self._pid = os.getpid()
+                self._poller = threading.Thread(target=self._poll, name='sse-version-poller', daemon=True)
+                self._poller.start()
+
+    def _poll(self):
+        while True:
+            time.sleep(self.app.config['SSE_POLL_INTERVAL'])
+            with self._lock:
+                scopes = list(self._subscriptions)
+            if not scopes:
+                continue
+            try:
+                with self.app.app_context():
+                    versions = self._read_versions(scopes)
+            except Exception:
+                logger.exception('Scope version check failed')
+                continue
+            for scope, version in versions.items():
+                known = self._versions.get(scope)
+                self._versions[scope] = version
+                if known is not None and version > known:
+                    self.publish(scope, {'type': 'refresh'})
+
+
+def leave_event_scopes(user_id, team):
+    """Every scope that can see a leave request of ``user_id`` (see versions.leave_scope)"""
+    scopes = ['all', f'user:{user_id}']
+    if team:
+        scopes.append(f'team:{team}')
+    return scopes
+
+
+def publish_leave_change(action, leave, team, stats, leave_balance=0):
+    """Notify subscribers after a committed change to ``leave`` (a LeaveRequest or a dict of its columns)
+
+    ``stats`` maps dashboard counters to their change, e.g. {'pending_requests': -1,
+    'approved_requests': 1}; ``leave_balance`` is the change to the requester's balance.
+    """
+    broker = current_app.extensions['event_broker']
+    get = leave.get if isinstance(leave, dict) else lambda name: getattr(leave, name)
+    request = {
+        'id': get('id'),
+        'user_id': get('user_id'),
+        'status': get('status'),
+        'start_date': get('start_date').isoformat(),
+        'end_date': get('end_date').isoformat(),
+    }
+    scopes = leave_event_scopes(request['user_id'], team)
+    for scope in scopes:
+        event = {'type': 'leave', 'action': action, 'request': request, 'stats': stats}
+        if leave_balance and scope.startswith('user:'):
+            event['leave_balance'] = leave_balance
+        broker.publish(scope, event)
+    broker.note_versions(scopes)
@@ -0,0 +1,8 @@
+"""
+Employee Leave Management System (ELMS)
+Extension instances, bound to each application in create_app()
+"""
+
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
@@ -0,0 +1,77 @@
+"""
+Employee Leave Management System (ELMS)
+WTForms used by the HTML views; never imported by the JSON API blueprint
+"""
+
+from datetime import date
+
+from flask_wtf import FlaskForm
+from flask_wtf.file import FileAllowed, FileField, FileRequired
+from wtforms import StringField, PasswordField, SelectField, SelectMultipleField, DateField, TextAreaField, SubmitField
+from wtforms.validators import DataRequired, Email, Length, ValidationError, EqualTo
+
+from .models import User
+
+
+class RegistrationForm(FlaskForm):
+    username = StringField('Username', validators=[DataRequired(), Length(min=4, max=20)])
+    email = StringField('Email', validators=[DataRequired(), Email()])
+    password = PasswordField('Password', validators=[DataRequired(), Length(min=6)])
+    confirm_password = PasswordField('Confirm Password', validators=[
+        DataRequired(), EqualTo('password', message='Passwords must match')
+    ])
+    role = SelectField('Role', choices=[
+        ('employee', 'Employee'), 
+        ('manager', 'Manager'), 
+        ('admin', 'Admin')
+    ], validators=[DataRequired()])
+    team = StringField('Team', validators=[Length(max=50)])
+    submit = SubmitField('Register')
+    
+    def validate_username(self, username):
+        user = User.query.filter_by(username=username.data).first()
+        if user:
+            raise ValidationError('Username already exists. Choose a different one.')
+    
+    def validate_email(self, email):
+        user = User.query.filter_by(email=email.data).first()
+        if user:
+            raise ValidationError('Email already registered. Choose a different one.')
+
+class LoginForm(FlaskForm):
+    username = StringField('Username', validators=[DataRequired()])
+    password = PasswordField('Password', validators=[DataRequired()])
+    submit = SubmitField('Login')
+
+class LeaveRequestForm(FlaskForm):
+    start_date = DateField('Start Date', validators=[DataRequired()])
+    end_date = DateField('End Date', validators=[DataRequired()])
+    reason = TextAreaField('Reason', validators=[DataRequired(), Length(min=10, max=500)])
+    submit = SubmitField('Submit Request')
+    
+    def validate_start_date(self, field):
+        if field.data < date.today():
+            raise ValidationError('Start date cannot be in the past.')
+    
+    def validate_end_date(self, field):
+        if hasattr(self, 'start_date') and self.start_date.data and field.data < self.start_date.data:
+            raise ValidationError('End date cannot be before start date.')
+
+class DecisionForm(FlaskForm):
+    decision = SelectField('Decision', choices=[('approved', 'Approve'), ('rejected', 'Reject')], validators=[DataRequired()])
+    decision_reason = TextAreaField('Comment', validators=[Length(max=500)])
+    submit = SubmitField('Submit Decision')
+
+class BulkDecisionForm(FlaskForm):
+    # Checkbox values come from the rows on the current dashboard page; scope is checked on submit
+    leave_ids = SelectMultipleField('Requests', choices=[], coerce=int, validate_choice=False,
+                                    validators=[DataRequired(message='Select at least one request.')])
+    decision = SelectField('Decision', choices=[('approved', 'Approve'), ('rejected', 'Reject')], validators=[DataRequired()])
+    decision_reason = StringField('Comment', validators=[Length(max=500)])
+    submit = SubmitField('Apply to Selected')
+
+class ImportUsersForm(FlaskForm):
+    file = FileField('Users file', validators=[
+        FileRequired(), FileAllowed(['csv', 'jsonl', 'ndjson', 'json'], 'Upload a .csv or .jsonl file.')
+    ])
+    submit = SubmitField('Import Users')
@@ -0,0 +1,182 @@
+"""
+Employee Leave Management System (ELMS)
+User imports uploaded to /admin/import-users, run by a background worker (`flask elms import-worker`)
+
+Hashing USER_IMPORT_MAX_UPLOAD_ROWS passwords at the production cost takes
+about a minute, which is too long to hold a request thread, and too much
+hashing to run outside the web app's bounded PasswordPool. So the upload view
+only saves the file and records an import_job row; the import worker, a
+separate process like the report worker (see report_jobs.py), claims queued
+jobs and runs import_users() on its own USER_IMPORT_WORKERS hashing threads.
+The admin's browser polls the job page until the result is in.
+
+The uploaded file holds plaintext passwords. It is written readable by the
+app's user only, under USER_IMPORT_DIR, and deleted as soon as its job
+finishes or fails.
+
+Imports are not retried: the batches committed before a failure stay
+imported, and a second run would only report those rows as duplicates. A
+running job whose heartbeat (stamped after every batch) is older than
+USER_IMPORT_JOB_STALE_AFTER is marked failed.
+
+Configuration:
+    USER_IMPORT_DIR              directory of uploaded files waiting for the worker (default: <instance>/imports)
+    USER_IMPORT_POLL_INTERVAL    seconds between queue checks while idle
+    USER_IMPORT_JOB_STALE_AFTER  seconds without a heartbeat before a running job is marked failed
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from .extensions import db
+from .models import ImportJob
+from .report_jobs import worker_name
+from .user_import import format_for, import_users
+
+
+def import_directory():
+    directory = current_app.config.get('USER_IMPORT_DIR') or os.path.join(current_app.instance_path, 'imports')
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return directory
+
+
+def upload_path(job):
+    return os.path.join(import_directory(), f'import-{job.id}.{job.format}')
+
+
+def queue_import(upload, user_id):
+    """Save an uploaded file (a werkzeug FileStorage) and queue its import; returns the job"""
+    job = ImportJob(filename=upload.filename[:255], format=format_for(upload.filename), requested_by=user_id)
+    db.session.add(job)
+    db.session.flush()
+    path = upload_path(job)
+    try:
+        with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+            shutil.copyfileobj(upload.stream, f)
+        db.session.commit()
+    except BaseException:
+        db.session.rollback()
+        _remove_quietly(path)
+        raise
+    return job
+
+
+def job_summary(job):
+    """JSON-friendly status of ``job`` for polling clients"""
+    return {
+        'id': job.id,
+        'status': job.status,
+        'filename': job.filename,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'imported': job.imported,
+        'failed': job.failed,
+        'truncated': job.truncated,
+        'error': job.error,
+    }
+
+
+def fail_stale():
+    """Mark running jobs whose worker stopped heartbeating failed and delete their files"""
+    stale_after = timedelta(seconds=current_app.config['USER_IMPORT_JOB_STALE_AFTER'])
+    stale = ImportJob.query.filter(ImportJob.status == 'running',
+                                   ImportJob.heartbeat_at < datetime.utcnow() - stale_after).all()
+    for job in stale:
+        job.status = 'failed'
+        job.worker = None
+        job.finished_at = datetime.utcnow()
+        job.error = 'The import worker stopped responding; rows imported before it stopped were kept'
+    db.session.commit()
+    for job in stale:
+        _remove_quietly(upload_path(job))
+    return len(stale)
+
+
+def claim_next(worker):
+    """Mark the oldest queued job as running on ``worker`` and return it, or None if the queue is empty"""
+    while True:
+        job_id = db.session.execute(
+            select(ImportJob.id).where(ImportJob.status == 'queued').order_by(ImportJob.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            db.session.commit()
+            return None
+        now = datetime.utcnow()
+        # Another worker may have claimed it since the SELECT; only one UPDATE matches
+        claimed = db.session.execute(
+            update(ImportJob).where(ImportJob.id == job_id, ImportJob.status == 'queued')
+            .values(status='running', worker=worker, started_at=now, heartbeat_at=now)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(ImportJob, job_id)
+
+
+def run_job(job, worker):
+    """Import the file of a claimed job, then delete it; returns the job's new status"""
+    path = upload_path(job)
+    owned = (ImportJob.id == job.id, ImportJob.status == 'running', ImportJob.worker == worker)
+
+    def progress(result):
+        db.session.execute(update(ImportJob).where(*owned).values(
+            heartbeat_at=datetime.utcnow(), imported=result.imported, failed=result.failed,
+        ))
+        db.session.commit()
+
+    try:
+        with open(path, 'rb') as f:
+            result = import_users(f, job.format, max_rows=current_app.config['USER_IMPORT_MAX_UPLOAD_ROWS'],
+                                  progress=progress)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception('Import job %s failed', job.id)
+        db.session.execute(update(ImportJob).where(*owned).values(
+            status='failed', worker=None, finished_at=datetime.utcnow(), error=f'{type(e).__name__}: {e}'[:500],
+        ))
+        db.session.commit()
+        return 'failed'
+    finally:
+        _remove_quietly(path)
+
+    db.session.execute(update(ImportJob).where(*owned).values(
+        status='done', imported=result.imported, failed=result.failed, truncated=result.truncated,
+        rejected=json.dumps(sorted(result.errors)), finished_at=datetime.utcnow(),
+    ))
+    db.session.commit()
+    return 'done'
+
+
+def run_worker(stop, once=False):
+    """Run queued imports until ``stop`` (a threading.Event) is set; with ``once``, until the queue is empty
+
+    Returns the number of jobs processed.
+    """
+    worker = worker_name()
+    poll_interval = current_app.config['USER_IMPORT_POLL_INTERVAL']
+    processed = 0
+    while not stop.is_set():
+        fail_stale()
+        job = claim_next(worker)
+        if job is None:
+            if once:
+                break
+            stop.wait(poll_interval)
+            continue
+        current_app.logger.info('Running import job %s (%s)', job.id, job.filename)
+        run_job(job, worker)
+        processed += 1
+        db.session.remove()
+    return processed
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,158 @@
+"""
+Employee Leave Management System (ELMS)
+Manager views: team request listing and decisions
+"""
+
+from datetime import datetime
+
+from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask_login import login_required, current_user
+
+from bulk_decisions import DecisionConflict
+from pagination import KeysetPage
+
+from .events import publish_leave_change
+from .extensions import db
+from .forms import BulkDecisionForm, DecisionForm
+from .models import User, LeaveRequest, LeaveBalance, TeamAbsence
+from .utils import cached_employees, decide_in_bulk, log_action, parse_date, stream_page
+
+bp = Blueprint('manager', __name__, url_prefix='/manager')
+
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    if current_user.role not in ['manager', 'admin']:
+        flash('Access denied.', 'danger')
+        return redirect(url_for('auth.dashboard'))
+    
+    # Get team leave requests, loading employee and manager with the same query
+    query = LeaveRequest.query.join(User, LeaveRequest.user_id == User.id).options(
+        db.contains_eager(LeaveRequest.employee),
+        db.joinedload(LeaveRequest.manager)
+    )
+    if current_user.role != 'admin':
+        # Manager sees requests from their team; admin can see all requests
+        query = query.filter(User.team == current_user.team, User.role == 'employee')
+    
+    # Apply filters in SQL
+    status_filter = request.args.get('status', '')
+    employee_filter = request.args.get('employee', '')
+    start_date_filter = request.args.get('start_date', '')
+    end_date_filter = request.args.get('end_date', '')
+    
+    if status_filter:
+        query = query.filter(LeaveRequest.status == status_filter)
+    
+    if employee_filter:
+        query = query.filter(db.func.lower(User.username).contains(employee_filter.lower(), autoescape=True))
+    
+    start_date = parse_date(start_date_filter)
+    if start_date:
+        query = query.filter(LeaveRequest.start_date >= start_date)
+    
+    end_date = parse_date(end_date_filter)
+    if end_date:
+        query = query.filter(LeaveRequest.end_date <= end_date)
+    
+    # Keyset pagination on (applied_on, id), newest first; the page query runs as the table streams
+    per_page = min(max(request.args.get('per_page', 25, type=int), 1), 100)
+    leave_requests = KeysetPage(
+        query, LeaveRequest.applied_on, LeaveRequest.id,
+        cursor=request.args.get('cursor'), per_page=per_page
+    )
+    
+    # Get team employees for filter dropdown (cached until a user write commits)
+    team_employees = cached_employees(None if current_user.role == 'admin' else current_user.team)
+    
+    filters = {
+        'status': status_filter,
+        'employee': employee_filter,
+        'start_date': start_date_filter,
+        'end_date': end_date_filter
+    }
+    
+    return stream_page('manager/dashboard.html',
+                       leave_requests=leave_requests,
+                       team_employees=team_employees,
+                       filters=filters,
+                       page_args={k: v for k, v in filters.items() if v},
+                       is_first_page=not request.args.get('cursor'),
+                       bulk_form=BulkDecisionForm())
+
+@bp.route('/decide-leave/<int:leave_id>', methods=['GET', 'POST'])
+@login_required
+def decide_leave(leave_id):
+    if current_user.role not in ['manager', 'admin']:
+        flash('Access denied.', 'danger')
+        return redirect(url_for('auth.dashboard'))
+    
+    leave_request = LeaveRequest.query.get_or_404(leave_id)
+    
+    # Check if manager can decide on this request
+    if current_user.role == 'manager' and leave_request.employee.team != current_user.team:
+        flash('You can only decide on leave requests from your team.', 'danger')
+        return redirect(url_for('manager.dashboard'))
+    
+    if leave_request.status != 'pending':
+        flash('This leave request has already been decided.', 'warning')
+        return redirect(url_for('manager.dashboard'))
+    
+    form = DecisionForm()
+    if form.validate_on_submit():
+        leave_request.status = form.decision.data
+        leave_request.manager_id = current_user.id
+        leave_request.decision_reason = form.decision_reason.data
+        leave_request.decided_at = datetime.utcnow()
+        if leave_request.status == 'approved':
+            LeaveBalance.record_approval(leave_request)
+            TeamAbsence.record_approval(leave_request)
+        db.session.commit()
+        publish_leave_change(leave_request.status, leave_request, leave_request.employee.team,
+                             {'pending_requests': -1, f'{leave_request.status}_requests': 1},
+                             leave_balance=-leave_request.days_count if leave_request.status == 'approved' else 0)
+        
+        log_action(f'{form.decision.data.title()} leave request #{leave_id} for {leave_request.employee.username}', 
+                  f'Comment: {form.decision_reason.data or "No comment"}')
+        flash(f'Leave request {form.decision.data} successfully!', 'success')
+        return redirect(url_for('manager.dashboard'))
+    
+    # Teammates already off during the requested dates, from the materialized calendar
+    team_absences = {}
+    if leave_request.employee.team:
+        for day, user_id, username in TeamAbsence.between(
+            leave_request.employee.team, leave_request.start_date, leave_request.end_date
+        ):
+            if user_id != leave_request.user_id:
+                team_absences.setdefault(username, []).append(day)
+    
+    return render_template('manager/decide_leave.html', form=form, leave_request=leave_request,
+                         team_absences=team_absences)
+
+@bp.route('/decide-bulk', methods=['POST'])
+@login_required
+def decide_bulk():
+    if current_user.role not in ['manager', 'admin']:
+        flash('Access denied.', 'danger')
+        return redirect(url_for('auth.dashboard'))
+    
+    form = BulkDecisionForm()
+    if not form.validate_on_submit():
+        for errors in form.errors.values():
+            for error in errors:
+                flash(error, 'danger')
+        return redirect(url_for('manager.dashboard'))
+    
+    try:
+        result = decide_in_bulk(form.leave_ids.data, form.decision.data, form.decision_reason.data)
+    except (DecisionConflict, ValueError) as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('manager.dashboard'))
+    
+    if result.decided:
+        flash(f'{len(result.decided)} leave request{"s" if len(result.decided) != 1 else ""} {form.decision.data}.', 'success')
+    if result.skipped:
+        flash('Skipped ' + ', '.join(f'#{leave_id} ({reason})' for leave_id, reason in sorted(result.skipped.items())),
+              'warning')
+    return redirect(url_for('manager.dashboard'))
@@ -0,0 +1,331 @@
+"""
+Employee Leave Management System (ELMS)
+Database models
+"""
+
+import json
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_login import UserMixin
+from passwords import hash_policy, needs_rehash
+from user_cache import UserSnapshot
+
+from .extensions import db
+
+
+class User(UserMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+    role = db.Column(db.String(20), nullable=False)  # admin, manager, employee
+    team = db.Column(db.String(50), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    is_active = db.Column(db.Boolean, default=True)
+    last_login = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_user_team_role', 'team', 'role'),
+    )
+    
+    # Relationships
+    leave_requests = db.relationship('LeaveRequest', foreign_keys='LeaveRequest.user_id', backref='employee', lazy='dynamic')
+    managed_requests = db.relationship('LeaveRequest', foreign_keys='LeaveRequest.manager_id', backref='manager', lazy='dynamic')
+    audit_logs = db.relationship('AuditLog', backref='user', lazy='dynamic')
+    
+    # Hashing runs on the bounded password pool (see passwords.PasswordPool)
+    def set_password(self, password):
+        self.password = current_app.extensions['password_pool'].hash(password, hash_policy(current_app.config))
+    
+    def check_password(self, password):
+        return current_app.extensions['password_pool'].verify(self.password, password)
+    
+    def password_needs_rehash(self):
+        return needs_rehash(self.password, hash_policy(current_app.config))
+    
+    def get_leave_balance(self):
+        # Remaining leave days (assuming 30 days per year), read from the balance ledger
+        balance = db.session.get(LeaveBalance, (self.id, datetime.now().year))
+        used_days = balance.used_days if balance else 0
+        return max(0, 30 - used_days)
+    
+    def __repr__(self):
+        return f'<User {self.username}>'
+
+class LeaveRequest(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    reason = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='pending')  # pending, approved, rejected
+    manager_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    decision_reason = db.Column(db.Text, nullable=True)
+    applied_on = db.Column(db.DateTime, default=datetime.utcnow)
+    decided_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        # Own requests by status/date (balances, overlap checks) and per-user listings
+        db.Index('ix_leave_request_user_status_start', 'user_id', 'status', 'start_date'),
+        # Overlap checks: the user's requests still running on or after a date (see overlaps.py)
+        db.Index('ix_leave_request_user_status_end', 'user_id', 'status', 'end_date'),
+        # Status-filtered listings, newest first
+        db.Index('ix_leave_request_status_applied', 'status', 'applied_on'),
+        # Keyset pagination over all requests, newest first
+        db.Index('ix_leave_request_applied_id', 'applied_on', 'id'),
+    )
+    
+    @property
+    def days_count(self):
+        return (self.end_date - self.start_date).days + 1
+    
+    @property
+    def status_class(self):
+        return {
+            'pending': 'warning',
+            'approved': 'success',
+            'rejected': 'danger'
+        }.get(self.status, 'secondary')
+    
+    def __repr__(self):
+        return f'<LeaveRequest {self.id} - {self.status}>'
+
+class LeaveBalance(db.Model):
+    """Per-user, per-year ledger of approved leave days"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    used_days = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @classmethod
+    def record_approval(cls, leave_request):
+        """Add an approved request's days to the ledger; committed with the caller's transaction"""
+        year = leave_request.start_date.year
+        balance = db.session.get(cls, (leave_request.user_id, year))
+        if balance is None:
+            db.session.add(cls(user_id=leave_request.user_id, year=year, used_days=leave_request.days_count))
+        else:
+            # Increment in SQL so concurrent approvals don't overwrite each other
+            balance.used_days = cls.used_days + leave_request.days_count
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute the whole ledger from approved leave history"""
+        totals = {}
+        approved = db.session.query(
+            LeaveRequest.user_id, LeaveRequest.start_date, LeaveRequest.end_date
+        ).filter(LeaveRequest.status == 'approved').yield_per(1000)
+        for user_id, start_date, end_date in approved:
+            key = (user_id, start_date.year)
+            totals[key] = totals.get(key, 0) + (end_date - start_date).days + 1
+        
+        cls.query.delete()
+        if totals:
+            db.session.execute(db.insert(cls), [
+                {'user_id': user_id, 'year': year, 'used_days': used_days, 'updated_at': datetime.utcnow()}
+                for (user_id, year), used_days in totals.items()
+            ])
+        db.session.commit()
+        return len(totals)
+    
+    def __repr__(self):
+        return f'<LeaveBalance {self.user_id}/{self.year}: {self.used_days}>'
+
+class TeamAbsence(db.Model):
+    """One row per team member per day of approved leave, materialized from LeaveRequest
+    
+    Answers "who in team T is off between two dates" with one range scan of the
+    primary key instead of overlap tests on every request's date range.
+    Maintained in the approving/cancelling transaction; `elms backfill-absences`
+    rebuilds it (e.g. after users change team).
+    """
+    team = db.Column(db.String(50), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    leave_request_id = db.Column(db.Integer, db.ForeignKey('leave_request.id'), primary_key=True, autoincrement=False)
+    
+    __table_args__ = (
+        db.Index('ix_team_absence_leave_request_id', 'leave_request_id'),
+    )
+    
+    @staticmethod
+    def _rows(leave_request_id, user_id, team, start_date, end_date):
+        return [
+            {'team': team, 'date': start_date + timedelta(days=offset), 'user_id': user_id,
+             'leave_request_id': leave_request_id}
+            for offset in range((end_date - start_date).days + 1)
+        ]
+    
+    @classmethod
+    def record_approval(cls, leave_request):
+        """Add a day row per day of an approved request; committed with the caller's transaction"""
+        team = leave_request.employee.team
+        if team is None:
+            return
+        db.session.execute(db.insert(cls), cls._rows(
+            leave_request.id, leave_request.user_id, team, leave_request.start_date, leave_request.end_date
+        ))
+    
+    @classmethod
+    def clear(cls, leave_request_id):
+        """Drop a request's day rows (before it is cancelled or deleted)"""
+        db.session.execute(db.delete(cls).where(cls.leave_request_id == leave_request_id))
+    
+    @classmethod
+    def between(cls, team, start_date, end_date):
+        """(date, user_id, username) for everyone in ``team`` off between the dates, by date"""
+        return db.session.execute(
+            db.select(cls.date, cls.user_id, User.username)
+            .join(User, cls.user_id == User.id)
+            .where(cls.team == team, cls.date.between(start_date, end_date))
+            .distinct()
+            .order_by(cls.date, User.username)
+        ).all()
+    
+    @classmethod
+    def rebuild(cls, batch_size=5000):
+        """Recompute the whole table from approved leave history"""
+        approved = db.session.query(
+            LeaveRequest.id, LeaveRequest.user_id, User.team, LeaveRequest.start_date, LeaveRequest.end_date
+        ).join(User, LeaveRequest.user_id == User.id).filter(
+            LeaveRequest.status == 'approved', User.team.isnot(None)
+        ).yield_per(1000)
+        
+        cls.query.delete()
+        rows, written = [], 0
+        for leave in approved:
+            rows.extend(cls._rows(*leave))
+            if len(rows) >= batch_size:
+                db.session.execute(db.insert(cls), rows)
+                written += len(rows)
+                rows = []
+        if rows:
+            db.session.execute(db.insert(cls), rows)
+            written += len(rows)
+        db.session.commit()
+        return written
+    
+    def __repr__(self):
+        return f'<TeamAbsence {self.team} {self.date}: {self.user_id}>'
+
+class AuditLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    action = db.Column(db.String(200), nullable=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    ip_address = db.Column(db.String(50), nullable=False)
+    details = db.Column(db.Text, nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_audit_log_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_audit_log_user_timestamp', 'user_id', 'timestamp', 'id'),
+    )
+    
+    def __repr__(self):
+        return f'<AuditLog {self.id} - {self.action}>'
+
+class AuditArchive(db.Model):
+    """One gzip JSON Lines file of audit rows moved out of audit_log, see audit_archive.py
+
+    Rows of one calendar month only, so the files overlapping a date range are
+    found from (month, first_timestamp, last_timestamp) without opening any.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.String(7), nullable=False)  # YYYY-MM
+    filename = db.Column(db.String(100), unique=True, nullable=False)  # relative to AUDIT_ARCHIVE_DIR
+    rows = db.Column(db.Integer, nullable=False)
+    first_id = db.Column(db.Integer, nullable=False)
+    last_id = db.Column(db.Integer, nullable=False)
+    first_timestamp = db.Column(db.DateTime, nullable=False)
+    last_timestamp = db.Column(db.DateTime, nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_audit_archive_month', 'month'),
+    )
+
+    def __repr__(self):
+        return f'<AuditArchive {self.filename}: {self.rows} rows>'
+
+class ReportJob(db.Model):
+    """A leave report rendered to a file by the report worker, see report_jobs.py
+
+    Finished jobs double as the report cache: a request for the same
+    (month, team, data_version) is answered with the existing job.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.String(7), nullable=False, default='')  # YYYY-MM, '' for all months
+    team = db.Column(db.String(50), nullable=False, default='')  # '' for all teams
+    data_version = db.Column(db.Integer, nullable=False)  # scope_version counter when requested
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed, expired
+    requested_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    worker = db.Column(db.String(100), nullable=True)  # host:pid of the worker running it
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    filename = db.Column(db.String(100), nullable=True)  # relative to REPORT_DIR
+    rows = db.Column(db.Integer, nullable=True)
+    size_bytes = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.String(500), nullable=True)
+
+    __table_args__ = (
+        # Cache lookups by report key
+        db.Index('ix_report_job_key', 'month', 'team', 'data_version'),
+        # The worker's next queued job, and stale running ones
+        db.Index('ix_report_job_status_id', 'status', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<ReportJob {self.id} {self.month or "all"}/{self.team or "all"} - {self.status}>'
+
+class ImportJob(db.Model):
+    """A user import uploaded through the admin page and run by the import worker, see import_jobs.py"""
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)  # name of the uploaded file, for display
+    format = db.Column(db.String(10), nullable=False)  # csv or jsonl
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    requested_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    worker = db.Column(db.String(100), nullable=True)  # host:pid of the worker running it
+    imported = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    truncated = db.Column(db.Boolean, nullable=False, default=False)  # stopped at USER_IMPORT_MAX_UPLOAD_ROWS
+    rejected = db.Column(db.Text, nullable=True)  # JSON list of [line, username, error]
+    error = db.Column(db.String(500), nullable=True)
+
+    __table_args__ = (
+        # The worker's next queued job, and stale running ones
+        db.Index('ix_import_job_status_id', 'status', 'id'),
+    )
+
+    @property
+    def rejected_rows(self):
+        return json.loads(self.rejected) if self.rejected else []
+
+    def __repr__(self):
+        return f'<ImportJob {self.id} {self.filename} - {self.status}>'
+
+class ScopeVersion(db.Model):
+    """Change counter per visibility scope ('all', 'team:<name>', 'user:<id>'), see versions.py"""
+    scope = db.Column(db.String(80), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ScopeVersion {self.scope}: {self.version}>'
+
+class SessionUser(UserSnapshot):
+    """Cached snapshot of the logged-in user, used as Flask-Login's current_user"""
+    get_leave_balance = User.get_leave_balance
+
+def load_user(user_id):
+    """Flask-Login user loader; served from the user cache, deactivated users are logged out"""
+    user = current_app.extensions['user_cache'].get(int(user_id))
+    return user if user is not None and user.is_active else None
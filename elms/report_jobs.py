@@ -0,0 +1,315 @@
+"""
+Employee Leave Management System (ELMS)
+HTML leave reports rendered by a background worker (`flask elms report-worker`)
+
+The legacy export_pdf view rendered the whole filtered result set inside the
+request, holding a gunicorn thread (and every row) for as long as a large
+month took. Now the request only records a report_job row. A separate worker
+process claims queued jobs, streams the template into a file under REPORT_DIR
+and marks the job done; the browser polls the job and then downloads the file.
+
+report_job is both the queue and the result cache. A report is keyed by
+(month, team, data_version), where data_version is the scope_version counter
+of the team ('all' without a team filter) at request time, which every leave
+write in that scope bumps (see versions.py). A request whose key matches a
+queued, running or finished job gets that job back, so repeated downloads
+render once and simultaneous requests share one render. User edits (renames,
+team moves) do not bump the counters; they reach a cached report with the
+next leave write in its scope.
+
+The worker:
+    - claims the oldest queued job with a conditional UPDATE, so several
+      workers can share the queue
+    - reads the rows in keyset batches of REPORT_BATCH_SIZE through
+      stream_template(), writing each chunk to a temporary file that is
+      renamed when complete, so memory stays flat however large the report
+    - stamps heartbeat_at between batches; a running job whose heartbeat is
+      older than REPORT_JOB_STALE_AFTER (its worker was killed) is queued
+      again, up to REPORT_JOB_MAX_ATTEMPTS attempts
+    - expires older versions of the same report, deleting their files
+
+Configuration:
+    REPORT_DIR                   directory of rendered reports (default: <instance>/reports)
+    REPORT_WORKER_POLL_INTERVAL  seconds between queue checks while idle
+    REPORT_HEARTBEAT_INTERVAL    seconds between heartbeat updates while rendering
+    REPORT_JOB_STALE_AFTER       seconds without a heartbeat before a running job is retried
+    REPORT_JOB_MAX_ATTEMPTS      attempts before a job is marked failed
+"""
+
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app, stream_template
+from sqlalchemy import func, select, update
+
+from pagination import keyset_page
+
+from .extensions import db
+from .models import LeaveRequest, ReportJob, ScopeVersion, User
+
+REPORT_TEMPLATE = 'reports/pdf_template.html'
+REPORT_BATCH_SIZE = 1000
+
+# Jobs that answer a request for their key; failed and expired ones are rendered again
+CACHEABLE_STATUSES = ('queued', 'running', 'done')
+
+
+def report_directory():
+    directory = current_app.config.get('REPORT_DIR') or os.path.join(current_app.instance_path, 'reports')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def report_path(job):
+    return os.path.join(report_directory(), job.filename)
+
+
+def data_version(team):
+    """Current scope_version counter of the leave requests a report on ``team`` covers"""
+    scope = f'team:{team}' if team else 'all'
+    return db.session.execute(select(ScopeVersion.version).where(ScopeVersion.scope == scope)).scalar() or 0
+
+
+def request_report(month, team, user_id):
+    """The job for (month, team) at the current data version: a cached or pending one, else a new queued one"""
+    month, team = month or '', team or ''
+    version = data_version(team)
+    job = ReportJob.query.filter(
+        ReportJob.month == month, ReportJob.team == team, ReportJob.data_version == version,
+        ReportJob.status.in_(CACHEABLE_STATUSES),
+    ).order_by(ReportJob.id.desc()).first()
+    if job is not None and job.status == 'done' and not os.path.exists(report_path(job)):
+        # The file was removed by hand (or REPORT_DIR moved); render it again
+        job.status = 'expired'
+        job = None
+    if job is None:
+        job = ReportJob(month=month, team=team, data_version=version, requested_by=user_id)
+        db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def job_summary(job):
+    """JSON-friendly status of ``job`` for polling clients"""
+    return {
+        'id': job.id,
+        'status': job.status,
+        'month': job.month or None,
+        'team': job.team or None,
+        'data_version': job.data_version,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'attempts': job.attempts,
+        'rows': job.rows,
+        'size_bytes': job.size_bytes,
+        'error': job.error,
+    }
+
+
+def report_query(month, team):
+    """The leave rows of a report, unordered (see render_report)"""
+    query = db.session.query(
+        LeaveRequest.id,
+        User.username.label('employee_name'),
+        User.team,
+        LeaveRequest.start_date,
+        LeaveRequest.end_date,
+        LeaveRequest.reason,
+        LeaveRequest.status,
+        LeaveRequest.applied_on
+    ).join(User, LeaveRequest.user_id == User.id)
+    if month:
+        # Range predicate so the applied_on index can be used, as in export_csv
+        month_start, next_month = month_range(month)
+        query = query.filter(LeaveRequest.applied_on >= month_start, LeaveRequest.applied_on < next_month)
+    if team:
+        query = query.filter(User.team == team)
+    return query
+
+
+def month_range(month):
+    """(first instant, first instant of the next month) of a 'YYYY-MM' string; ValueError if malformed"""
+    month_start = datetime.strptime(month, '%Y-%m')
+    return month_start, datetime(month_start.year + month_start.month // 12, month_start.month % 12 + 1, 1)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def requeue_stale():
+    """Queue running jobs whose worker stopped heartbeating again (or fail them after the last attempt)"""
+    config = current_app.config
+    now = datetime.utcnow()
+    stale = (ReportJob.status == 'running',
+             ReportJob.heartbeat_at < now - timedelta(seconds=config['REPORT_JOB_STALE_AFTER']))
+    db.session.execute(
+        update(ReportJob).where(*stale, ReportJob.attempts >= config['REPORT_JOB_MAX_ATTEMPTS'])
+        .values(status='failed', worker=None, finished_at=now, error='The report worker stopped responding')
+    )
+    requeued = db.session.execute(update(ReportJob).where(*stale).values(status='queued', worker=None)).rowcount
+    db.session.commit()
+    return requeued
+
+
+def claim_next(worker):
+    """Mark the oldest queued job as running on ``worker`` and return it, or None if the queue is empty"""
+    while True:
+        job_id = db.session.execute(
+            select(ReportJob.id).where(ReportJob.status == 'queued').order_by(ReportJob.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            db.session.commit()
+            return None
+        now = datetime.utcnow()
+        # Another worker may have claimed it since the SELECT; only one UPDATE matches
+        claimed = db.session.execute(
+            update(ReportJob).where(ReportJob.id == job_id, ReportJob.status == 'queued')
+            .values(status='running', worker=worker, started_at=now, heartbeat_at=now,
+                    attempts=ReportJob.attempts + 1, error=None)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(ReportJob, job_id)
+
+
+def run_job(job, worker):
+    """Render a claimed job to its file; returns the job's new status
+
+    The final UPDATE only matches while ``worker`` still owns the job, so a
+    worker that was presumed dead and raced by a retry does not overwrite it.
+    """
+    filename = f'leave-report-{job.id}.html'
+    path = os.path.join(report_directory(), filename)
+    tmp_path = path + '.tmp'
+    owned = (ReportJob.id == job.id, ReportJob.status == 'running', ReportJob.worker == worker)
+    try:
+        rows = render_report(job, tmp_path, worker)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        db.session.rollback()
+        _remove_quietly(tmp_path)
+        current_app.logger.exception('Report job %s failed', job.id)
+        retry = job.attempts < current_app.config['REPORT_JOB_MAX_ATTEMPTS']
+        db.session.execute(update(ReportJob).where(*owned).values(
+            status='queued' if retry else 'failed', worker=None,
+            finished_at=None if retry else datetime.utcnow(), error=f'{type(e).__name__}: {e}'[:500],
+        ))
+        db.session.commit()
+        return 'queued' if retry else 'failed'
+
+    done = db.session.execute(update(ReportJob).where(*owned).values(
+        status='done', filename=filename, rows=rows, size_bytes=os.path.getsize(path), finished_at=datetime.utcnow(),
+    )).rowcount
+    db.session.commit()
+    if not done:
+        _remove_quietly(path)
+        return db.session.get(ReportJob, job.id).status
+    expire_older_versions(job)
+    return 'done'
+
+
+def render_report(job, path, worker):
+    """Stream the report of ``job`` into ``path``; returns the number of rows written"""
+    query = report_query(job.month, job.team)
+    summary = dict(query.with_entities(LeaveRequest.status, func.count(LeaveRequest.id))
+                   .group_by(LeaveRequest.status).all())
+    rows = _BatchedRows(query, job.id, worker)
+    with open(path, 'w', encoding='utf-8') as f:
+        # Jinja yields a chunk per template node; the file's buffer batches the writes
+        f.writelines(stream_template(REPORT_TEMPLATE,
+                                     requests=rows,
+                                     month=job.month or None,
+                                     team=job.team or None,
+                                     generated_at=datetime.now(),
+                                     total=sum(summary.values()),
+                                     summary=summary))
+        f.flush()
+        os.fsync(f.fileno())
+    return rows.count
+
+
+class _BatchedRows:
+    """Report rows newest first, read in keyset batches with a heartbeat between them
+
+    Each batch is its own short read, so no SQLite read transaction stays open
+    for the whole render and the heartbeat can be committed in between.
+    """
+
+    def __init__(self, query, job_id, worker):
+        self.query = query
+        self.job_id = job_id
+        self.worker = worker
+        self.count = 0
+
+    def __iter__(self):
+        interval = current_app.config['REPORT_HEARTBEAT_INTERVAL']
+        last_beat = time.monotonic()
+        cursor = None
+        while True:
+            batch, cursor = keyset_page(self.query, LeaveRequest.applied_on, LeaveRequest.id,
+                                        cursor=cursor, per_page=REPORT_BATCH_SIZE)
+            if time.monotonic() - last_beat >= interval:
+                self._beat()
+                last_beat = time.monotonic()
+            else:
+                db.session.commit()
+            self.count += len(batch)
+            yield from batch
+            if cursor is None:
+                return
+
+    def _beat(self):
+        db.session.execute(
+            update(ReportJob).where(ReportJob.id == self.job_id, ReportJob.worker == self.worker)
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        db.session.commit()
+
+
+def expire_older_versions(job):
+    """Mark finished reports with the same (month, team) and an older data version expired, deleting their files"""
+    older = ReportJob.query.filter(
+        ReportJob.month == job.month, ReportJob.team == job.team, ReportJob.status == 'done',
+        ReportJob.id != job.id, ReportJob.data_version <= job.data_version,
+    ).all()
+    for old in older:
+        old.status = 'expired'
+    db.session.commit()
+    for old in older:
+        _remove_quietly(report_path(old))
+    return len(older)
+
+
+def run_worker(stop, once=False):
+    """Render queued jobs until ``stop`` (a threading.Event) is set; with ``once``, until the queue is empty
+
+    Returns the number of jobs processed.
+    """
+    worker = worker_name()
+    poll_interval = current_app.config['REPORT_WORKER_POLL_INTERVAL']
+    processed = 0
+    while not stop.is_set():
+        requeue_stale()
+        job = claim_next(worker)
+        if job is None:
+            if once:
+                break
+            stop.wait(poll_interval)
+            continue
+        current_app.logger.info('Rendering report job %s (%s/%s)', job.id, job.month or 'all', job.team or 'all')
+        run_job(job, worker)
+        processed += 1
+        # Don't keep job objects (and their rows) in the identity map between jobs
+        db.session.remove()
+    return processed
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
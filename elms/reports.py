@@ -0,0 +1,139 @@
+"""
+Employee Leave Management System (ELMS)
+Report exports: streamed CSV, and HTML reports rendered by the report worker (see report_jobs.py)
+"""
+
+import csv
+import os
+from datetime import datetime
+from io import StringIO
+
+from flask import (Blueprint, flash, jsonify, redirect, render_template, request, Response, send_file,
+                   stream_with_context, url_for)
+from flask_login import current_user, login_required
+from werkzeug.utils import secure_filename
+
+from .extensions import db
+from .models import User, LeaveRequest, ReportJob
+from .report_jobs import job_summary, month_range, report_path, request_report
+from .utils import log_action, role_required
+
+bp = Blueprint('reports', __name__, url_prefix='/reports')
+
+
+@bp.route('/export-csv')
+@login_required
+@role_required('admin')
+def export_csv():
+    # Get filter parameters
+    month = request.args.get('month')
+    team = request.args.get('team')
+    
+    # Build query with explicit join condition
+    query = db.session.query(
+        LeaveRequest.id,
+        User.username.label('employee_username'),
+        User.team,
+        LeaveRequest.start_date,
+        LeaveRequest.end_date,
+        LeaveRequest.reason,
+        LeaveRequest.status,
+        LeaveRequest.applied_on
+    ).join(User, LeaveRequest.user_id == User.id)
+    
+    # Apply filters
+    if month:
+        # Range predicate rather than extract() so the applied_on index can be used
+        try:
+            month_start, next_month = month_range(month)
+        except ValueError:
+            flash('Choose the export month as YYYY-MM.', 'warning')
+            return redirect(url_for('admin.dashboard'))
+        query = query.filter(LeaveRequest.applied_on >= month_start, LeaveRequest.applied_on < next_month)
+    
+    if team:
+        query = query.filter(User.team == team)
+    
+    log_action(f'Exported leave data to CSV')
+    
+    # Stream the CSV as it is produced; rows are fetched from the database in batches
+    rows = query.order_by(LeaveRequest.id).yield_per(1000)
+    response = Response(stream_with_context(iter_leave_csv(rows)), mimetype='text/csv')
+    response.headers['Content-Disposition'] = 'attachment; filename=leave_requests.csv'
+    return response
+
+def iter_leave_csv(rows, chunk_rows=1000):
+    """Yield CSV text for leave export rows in chunks of ``chunk_rows`` lines"""
+    output = StringIO()
+    csv_writer = csv.writer(output)
+    
+    # Write CSV header
+    csv_writer.writerow([
+        'Request ID', 'Employee', 'Team', 'Start Date', 'End Date', 
+        'Days', 'Reason', 'Status', 'Applied Date'
+    ])
+    
+    # Write CSV data rows, handing each full chunk to the response
+    for count, r in enumerate(rows, start=1):
+        csv_writer.writerow([
+            r.id,
+            r.employee_username,
+            r.team,
+            r.start_date.strftime('%Y-%m-%d'),
+            r.end_date.strftime('%Y-%m-%d'),
+            (r.end_date - r.start_date).days + 1,
+            r.reason,
+            r.status.title(),
+            r.applied_on.strftime('%Y-%m-%d %H:%M') if r.applied_on else ''
+        ])
+        if count % chunk_rows == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    
+    yield output.getvalue()
+    output.close()
+
+@bp.route('/export-pdf')
+@login_required
+@role_required('admin')
+def export_pdf():
+    """Queue the printable HTML report (or reuse a cached one) and send the admin to its status page"""
+    month = request.args.get('month') or ''
+    team = request.args.get('team') or ''
+    if month:
+        try:
+            datetime.strptime(month, '%Y-%m')
+        except ValueError:
+            flash('Choose the report month as YYYY-MM.', 'warning')
+            return redirect(url_for('admin.dashboard'))
+    
+    job = request_report(month, team, current_user.id)
+    log_action('Requested HTML leave report', f'Month: {month or "all"}, team: {team or "all"}, job #{job.id}')
+    return redirect(url_for('reports.report_job', job_id=job.id))
+
+@bp.route('/jobs/<int:job_id>')
+@login_required
+@role_required('admin')
+def report_job(job_id):
+    """Report status page; polled with Accept: application/json until the report is ready"""
+    job = ReportJob.query.get_or_404(job_id)
+    if request.accept_mimetypes.best == 'application/json':
+        summary = job_summary(job)
+        summary['download_url'] = url_for('reports.download_report', job_id=job.id) if job.status == 'done' else None
+        return jsonify(summary)
+    return render_template('reports/job.html', job=job)
+
+@bp.route('/jobs/<int:job_id>/download')
+@login_required
+@role_required('admin')
+def download_report(job_id):
+    job = ReportJob.query.get_or_404(job_id)
+    if job.status != 'done' or not os.path.exists(report_path(job)):
+        flash('That report is not available; request it again.', 'warning')
+        return redirect(url_for('reports.report_job', job_id=job.id))
+    
+    log_action('Exported leave data to HTML report', f'Job #{job.id}')
+    name = secure_filename(f'leave_report_{job.month or "all"}_{job.team or "all"}.html')
+    # Served from disk (no rendering or queries in the request), with conditional GET support
+    return send_file(report_path(job), mimetype='text/html', download_name=name, conditional=True)
@@ -0,0 +1,217 @@
+"""
+Employee Leave Management System (ELMS)
+Bulk user import from CSV or JSON Lines (`flask elms import-users`, and the import
+worker for uploads to /admin/import-users, see import_jobs.py)
+
+Adding users one form at a time costs two uniqueness queries, a password hash
+and a commit per person. import_users() streams the file instead and works in
+batches of USER_IMPORT_BATCH_SIZE rows:
+
+    - field checks in Python (same rules as RegistrationForm)
+    - duplicates within the file tracked in memory; duplicates of existing users
+      found with one `username IN (...)` and one `email IN (...)` query per batch
+    - passwords hashed on a thread pool of USER_IMPORT_WORKERS threads (hashlib
+      releases the GIL, so the hashes run on separate cores)
+    - one executemany INSERT and one commit per batch
+
+Rows that fail are left out and reported with their line number; the other
+rows are still imported. import_users() runs in a CLI process, never in a web
+request: its hashing threads are not bounded by the web app's PasswordPool. Columns: username, email, password, role (employee,
+manager or admin; default employee) and team (optional).
+
+Configuration:
+    USER_IMPORT_BATCH_SIZE       rows checked, hashed and inserted together
+    USER_IMPORT_WORKERS          password hashing threads for an import
+    USER_IMPORT_MAX_UPLOAD_ROWS  rows accepted from a web upload; larger files go through the CLI
+"""
+
+import codecs
+import csv
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice, repeat
+
+from flask import current_app
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from passwords import hash_password, hash_policy
+
+from .extensions import db
+from .models import User
+
+ROLES = ('employee', 'manager', 'admin')
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
+class ImportResult:
+    """Counts and per-row errors of one import"""
+
+    def __init__(self):
+        self.imported = 0
+        self.errors = []  # (line, username, message)
+        self.truncated = False
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def error(self, line, username, message):
+        self.errors.append((line, username, message))
+
+    def write_report(self, stream):
+        """Write the errors as CSV (line, username, error)"""
+        writer = csv.writer(stream)
+        writer.writerow(['line', 'username', 'error'])
+        writer.writerows(sorted(self.errors))
+
+
+def read_rows(stream, fmt):
+    """Yield (line, row dict or None, parse error) from a binary or text stream, one record at a time"""
+    if isinstance(stream.read(0), bytes):
+        stream = codecs.getreader('utf-8-sig')(stream)
+
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key.strip().lower(): value for key, value in row.items() if key}, None
+    elif fmt == 'jsonl':
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as e:
+                yield line, None, f'invalid JSON: {e}'
+                continue
+            if isinstance(row, dict):
+                yield line, row, None
+            else:
+                yield line, None, 'expected a JSON object'
+    else:
+        raise ValueError(f'Unknown import format: {fmt}')
+
+
+def format_for(filename):
+    """'csv' or 'jsonl' from a file name"""
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def check_row(row):
+    """Normalized (username, email, password, role, team) or an error message"""
+    username = str(row.get('username') or '').strip()
+    email = str(row.get('email') or '').strip()
+    password = str(row.get('password') or '')
+    role = str(row.get('role') or 'employee').strip().lower()
+    team = str(row.get('team') or '').strip() or None
+
+    if not 4 <= len(username) <= 20:
+        return 'username must be 4-20 characters'
+    if not EMAIL_PATTERN.match(email) or len(email) > 120:
+        return 'invalid email address'
+    if len(password) < 6:
+        return 'password must be at least 6 characters'
+    if role not in ROLES:
+        return f'role must be one of {", ".join(ROLES)}'
+    if team and len(team) > 50:
+        return 'team must be at most 50 characters'
+    return username, email, password, role, team
+
+
+def import_users(stream, fmt='csv', max_rows=None, progress=None):
+    """Import users from ``stream``; returns an ImportResult. Runs in the current app context.
+
+    ``progress``, if given, is called with the ImportResult after each batch.
+    """
+    config = current_app.config
+    policy = hash_policy(config)
+    result = ImportResult()
+    seen_usernames, seen_emails = set(), set()
+
+    with ThreadPoolExecutor(max_workers=config['USER_IMPORT_WORKERS'], thread_name_prefix='user-import') as pool:
+        for records in _chunks(_limited(read_rows(stream, fmt), max_rows, result), config['USER_IMPORT_BATCH_SIZE']):
+            batch = []
+            for line, row, parse_error in records:
+                if parse_error:
+                    result.error(line, '', parse_error)
+                    continue
+                checked = check_row(row)
+                if isinstance(checked, str):
+                    result.error(line, str(row.get('username') or ''), checked)
+                    continue
+                username, email = checked[0], checked[1]
+                if username in seen_usernames:
+                    result.error(line, username, 'duplicate username in file')
+                elif email in seen_emails:
+                    result.error(line, username, 'duplicate email in file')
+                else:
+                    seen_usernames.add(username)
+                    seen_emails.add(email)
+                    batch.append((line,) + checked)
+            if batch:
+                _import_batch(batch, pool, policy, result)
+            if progress is not None:
+                progress(result)
+    return result
+
+
+def _limited(rows, max_rows, result):
+    for count, item in enumerate(rows):
+        if max_rows is not None and count >= max_rows:
+            result.truncated = True
+            return
+        yield item
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _import_batch(batch, pool, policy, result):
+    usernames = [row[1] for row in batch]
+    emails = [row[2] for row in batch]
+    taken_usernames = set(db.session.execute(select(User.username).where(User.username.in_(usernames))).scalars())
+    taken_emails = set(db.session.execute(select(User.email).where(User.email.in_(emails))).scalars())
+
+    accepted = []
+    for row in batch:
+        line, username, email = row[:3]
+        if username in taken_usernames:
+            result.error(line, username, 'username already exists')
+        elif email in taken_emails:
+            result.error(line, username, 'email already registered')
+        else:
+            accepted.append(row)
+    if not accepted:
+        return
+
+    hashes = pool.map(hash_password, [row[3] for row in accepted], repeat(policy))
+    now = datetime.utcnow()
+    values = [
+        {'username': username, 'email': email, 'password': password_hash, 'role': role, 'team': team,
+         'created_at': now, 'is_active': True}
+        for (line, username, email, _, role, team), password_hash in zip(accepted, hashes)
+    ]
+    try:
+        db.session.execute(insert(User), values)
+        db.session.commit()
+        result.imported += len(values)
+    except IntegrityError:
+        # Someone added one of these users since the check; retry row by row to find it
+        db.session.rollback()
+        for row, value in zip(accepted, values):
+            try:
+                db.session.execute(insert(User), [value])
+                db.session.commit()
+                result.imported += 1
+            except IntegrityError:
+                db.session.rollback()
+                result.error(row[0], row[1], 'username or email already exists')
+
@@ -0,0 +1,125 @@
+"""
+Employee Leave Management System (ELMS)
+Helpers shared by the blueprints
+"""
+
+from datetime import datetime
+from functools import wraps
+
+from flask import Response, current_app, flash, get_flashed_messages, redirect, request, stream_template, url_for
+from flask_login import current_user
+
+from bulk_decisions import decide_leave_requests
+
+from . import models
+from .events import publish_leave_change
+from .extensions import db
+from .versions import bump_leave_versions
+
+
+def log_action(action, details=None):
+    """Log user actions for audit trail (queued and written in batches, see audit_writer.py)"""
+    if current_user.is_authenticated:
+        current_app.extensions['audit_writer'].write(
+            user_id=current_user.id,
+            action=action,
+            ip_address=get_user_ip(),
+            details=details
+        )
+
+def role_required(role):
+    """Decorator to restrict access by role"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not current_user.is_authenticated or current_user.role != role:
+                flash('Access denied. Insufficient permissions.', 'danger')
+                return redirect(url_for('auth.login'))
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+# Characters per streamed chunk: small enough that the page head goes out before the first row query
+STREAM_CHUNK_SIZE = 4096
+
+def stream_page(template_name, **context):
+    """Response that sends ``template_name`` while it renders (stream_template) instead of building it first
+
+    Row sources in ``context`` can be generators or lazy queries: they are read
+    as the table is rendered, so time to first byte and memory don't grow with
+    the number of rows. Jinja yields a string per template node, so chunks are
+    joined to about STREAM_CHUNK_SIZE characters before each write.
+    """
+    # The session cookie goes out with the headers, before the body renders:
+    # consume flashed messages and create the CSRF token (forms on the page) now
+    get_flashed_messages()
+    if current_app.config.get('WTF_CSRF_ENABLED', True):
+        from flask_wtf.csrf import generate_csrf  # HTML views only; the api blueprint never streams pages
+        generate_csrf()
+    return Response(_joined(stream_template(template_name, **context), STREAM_CHUNK_SIZE), mimetype='text/html')
+
+def _joined(parts, size):
+    buffer, buffered = [], 0
+    try:
+        for part in parts:
+            buffer.append(part)
+            buffered += len(part)
+            if buffered >= size:
+                yield ''.join(buffer)
+                buffer, buffered = [], 0
+    finally:
+        # Closing the template generator pops the request context it re-pushed
+        parts.close()
+    if buffer:
+        yield ''.join(buffer)
+
+def get_user_ip():
+    """Get user IP address"""
+    return request.environ.get('HTTP_X_REAL_IP', request.remote_addr)
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD query parameter, returning None if it is missing or invalid"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        return None
+
+def decide_in_bulk(leave_ids, decision, reason):
+    """Approve or reject many requests in one transaction (see bulk_decisions.py) and notify dashboards
+
+    Raises DecisionConflict (after rolling back) if another manager got to some of them first.
+    """
+    try:
+        result = decide_leave_requests(db.session, models, current_user, leave_ids, decision, reason, get_user_ip())
+        # The UPDATE bypasses the ORM, so the versions.py listeners don't see it
+        bump_leave_versions(db.session.connection(), result.user_ids)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    for row in result.decided:
+        publish_leave_change(decision, dict(row, status=decision), row['team'],
+                             {'pending_requests': -1, f'{decision}_requests': 1},
+                             leave_balance=-((row['end_date'] - row['start_date']).days + 1) if decision == 'approved' else 0)
+    return result
+
+def cached_team_names():
+    """Distinct team names, from the query cache (see query_cache.py)"""
+    return current_app.extensions['query_cache'].get_or_load('users', 'teams', lambda: [
+        team for (team,) in db.session.query(models.User.team).filter(models.User.team.isnot(None))
+        .distinct().order_by(models.User.team)
+    ])
+
+def cached_employees(team=None):
+    """Active employees as {'id', 'username', 'team'} dicts, all of them or one team's, from the query cache"""
+    def load():
+        query = db.session.query(models.User.id, models.User.username, models.User.team).filter(
+            models.User.role == 'employee', models.User.is_active.is_(True)
+        )
+        if team is not None:
+            query = query.filter(models.User.team == team)
+        return [row._asdict() for row in query.order_by(models.User.username)]
+    
+    key = 'employees:all' if team is None else f'employees:team:{team}'
+    return current_app.extensions['query_cache'].get_or_load('users', key, load)
@@ -0,0 +1,99 @@
+"""
+Employee Leave Management System (ELMS)
+Per-scope change counters for conditional GETs on the dashboard JSON endpoints
+
+Every insert, update or delete of a LeaveRequest bumps three counters in the
+scope_version table, in the same transaction as the write:
+
+    'all'           everything an admin sees
+    'team:<name>'   the requester's team, as seen by its manager
+    'user:<id>'     the requester's own requests and balance
+
+Polling endpoints turn the caller's counter into an ETag/Last-Modified pair
+and answer 304 when the client already has that version. That check is one
+primary-key lookup on scope_version; the leave_request table is only read
+when something in the scope actually changed. Writes that bypass the ORM
+(bulk UPDATE statements) must call bump_leave_versions() themselves.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+
+from flask import Response, jsonify, request
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import object_session
+
+from .extensions import db
+from .models import LeaveRequest, ScopeVersion, User
+
+
+def leave_scope(user):
+    """The scope whose leave requests ``user`` can see"""
+    if user.role == 'admin':
+        return 'all'
+    if user.role == 'manager':
+        return f'team:{user.team}'
+    return f'user:{user.id}'
+
+
+def bump_leave_versions(connection, user_ids):
+    """Bump the counters of every scope that can see leave requests of ``user_ids``"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    users = User.__table__
+    teams = connection.execute(
+        select(users.c.team).where(users.c.id.in_(user_ids), users.c.team.isnot(None)).distinct()
+    ).scalars()
+    scopes = ['all'] + [f'team:{team}' for team in teams] + [f'user:{user_id}' for user_id in sorted(user_ids)]
+
+    table = ScopeVersion.__table__
+    now = datetime.utcnow()
+    for scope in scopes:
+        result = connection.execute(
+            update(table).where(table.c.scope == scope).values(version=table.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(scope=scope, version=1, updated_at=now))
+
+
+@event.listens_for(LeaveRequest, 'after_insert')
+@event.listens_for(LeaveRequest, 'after_delete')
+def _leave_written(mapper, connection, target):
+    bump_leave_versions(connection, [target.user_id])
+
+
+@event.listens_for(LeaveRequest, 'after_update')
+def _leave_updated(mapper, connection, target):
+    # after_update also fires for objects that were marked dirty without net changes
+    if object_session(target).is_modified(target, include_collections=False):
+        bump_leave_versions(connection, [target.user_id])
+
+
+def versioned_json(scope, build, *variant):
+    """jsonify(build()) with validators for ``scope``, or an empty 304 if the client is current
+
+    ``variant`` values are mixed into the ETag for representations that also
+    depend on something other than the scope's leave requests.
+    """
+    row = db.session.execute(
+        select(ScopeVersion.version, ScopeVersion.updated_at).where(ScopeVersion.scope == scope)
+    ).first()
+    version, updated_at = row if row is not None else (0, None)
+    etag = hashlib.sha1(repr((scope, version) + variant).encode()).hexdigest()[:20]
+    last_modified = updated_at.replace(microsecond=0, tzinfo=timezone.utc) if updated_at else None
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        not_modified = bool(last_modified and request.if_modified_since and last_modified <= request.if_modified_since)
+
+    response = Response(status=304) if not_modified else jsonify(build())
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    # Always revalidate; the answer differs per logged-in user
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Cookie')
+    return response
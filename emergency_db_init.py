@@ -11,13 +11,14 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from app_new import app, db, User
+    from app_new import app, db, User, instance_path
     
     def emergency_db_init():
         """Emergency database initialization"""
         print("🚨 Emergency Database Initialization")
         print("=" * 50)
         
+        os.makedirs(instance_path, exist_ok=True)
         with app.app_context():
             try:
                 # Force create all tables
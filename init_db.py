@@ -5,7 +5,8 @@ This script creates the database tables and initial admin user
 """
 
 import os
-from app_new import app, db, User
+from app_new import app, db, User, instance_path
+from migrations import upgrade_schema
 
 def create_default_users():
     """Create default admin and test users"""
@@ -55,10 +56,11 @@ def create_default_users():
 
 def init_database():
     """Initialize database with tables and default data"""
+    os.makedirs(instance_path, exist_ok=True)
     with app.app_context():
         try:
-            # Create all tables
-            db.create_all()
+            # Create all tables and indexes
+            upgrade_schema(db)
             print("✅ Database tables created successfully!")
             
             # Create default users
@@ -0,0 +1,111 @@
+"""
+Employee Leave Management System (ELMS)
+Idempotent schema migration and query-plan checks shared by the web app and the API
+
+db.create_all() only creates tables that are missing, so indexes added to models
+later never reach an existing database. upgrade_schema() creates missing tables
+and then any missing indexes on existing tables; running it again is a no-op.
+On SQLite it also creates the audit_log_fts full-text index (see audit_search.py).
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+
+
+def upgrade_schema(db):
+    """Bring the database schema up to date with the models; returns the names of created indexes"""
+    engine = db.engine
+    db.metadata.create_all(engine)
+
+    inspector = inspect(engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
+                created.append(index.name)
+
+    if engine.dialect.name == 'sqlite' and 'audit_log' in db.metadata.tables and create_audit_fts(engine):
+        created.append(AUDIT_FTS_TABLE)
+
+    if created and engine.dialect.name == 'sqlite':
+        # Refresh planner statistics so the new indexes are actually chosen. Only
+        # the model tables: statistics on the FTS5 shadow tables, taken while they
+        # are still small, make every later insert into the index slower
+        with engine.begin() as conn:
+            for table in db.metadata.sorted_tables:
+                conn.execute(text(f'ANALYZE "{table.name}"'))
+            if conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")).first():
+                conn.execute(text(f"DELETE FROM sqlite_stat1 WHERE tbl LIKE '{AUDIT_FTS_TABLE}%'"))
+    return created
+
+
+# External-content FTS5 index over audit_log.action/details. The triggers keep it in
+# step with every writer (ORM, the batched AuditWriter, bulk_decisions' executemany)
+AUDIT_FTS_TABLE = 'audit_log_fts'
+AUDIT_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE {AUDIT_FTS_TABLE} USING fts5(action, details, content='audit_log', content_rowid='id')",
+    f"""CREATE TRIGGER {AUDIT_FTS_TABLE}_insert AFTER INSERT ON audit_log BEGIN
+        INSERT INTO {AUDIT_FTS_TABLE}(rowid, action, details) VALUES (new.id, new.action, new.details);
+    END""",
+    f"""CREATE TRIGGER {AUDIT_FTS_TABLE}_delete AFTER DELETE ON audit_log BEGIN
+        INSERT INTO {AUDIT_FTS_TABLE}({AUDIT_FTS_TABLE}, rowid, action, details)
+        VALUES ('delete', old.id, old.action, old.details);
+    END""",
+    f"""CREATE TRIGGER {AUDIT_FTS_TABLE}_update AFTER UPDATE OF action, details ON audit_log BEGIN
+        INSERT INTO {AUDIT_FTS_TABLE}({AUDIT_FTS_TABLE}, rowid, action, details)
+        VALUES ('delete', old.id, old.action, old.details);
+        INSERT INTO {AUDIT_FTS_TABLE}(rowid, action, details) VALUES (new.id, new.action, new.details);
+    END""",
+    # Index the rows written before the table existed
+    f"INSERT INTO {AUDIT_FTS_TABLE}({AUDIT_FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def has_audit_fts(connection):
+    """Whether the audit_log_fts index exists on the database behind ``connection`` (a Connection or Session)"""
+    dialect = connection.dialect if hasattr(connection, 'dialect') else connection.get_bind().dialect
+    if dialect.name != 'sqlite':
+        return False
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': AUDIT_FTS_TABLE}
+    ).first() is not None
+
+
+def create_audit_fts(engine):
+    """Create the audit_log full-text index and its triggers if missing; returns True if created.
+
+    SQLite builds without FTS5 keep working: audit search falls back to LIKE.
+    """
+    try:
+        with engine.begin() as conn:
+            if has_audit_fts(conn):
+                return False
+            for statement in AUDIT_FTS_DDL:
+                conn.exec_driver_sql(statement)
+    except OperationalError as e:
+        if 'fts5' not in str(e):
+            raise
+        return False
+    return True
+
+
+def explain_query_plan(session, query):
+    """Return SQLite's EXPLAIN QUERY PLAN detail lines for an ORM query"""
+    bind = session.get_bind()
+    # render_postcompile expands IN lists into one placeholder per value
+    compiled = query.statement.compile(dialect=bind.dialect, compile_kwargs={'render_postcompile': True})
+    params = tuple(compiled.params[name] for name in (compiled.positiontup or []))
+    with bind.connect() as conn:
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled.string}', params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def full_table_scans(plan, tables):
+    """Plan lines that scan one of ``tables`` without using any index"""
+    return [
+        line for line in plan
+        if line.startswith('SCAN ') and 'USING' not in line
+        and line.split()[1].strip('"') in tables
+    ]
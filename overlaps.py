@@ -0,0 +1,73 @@
+"""
+Employee Leave Management System (ELMS)
+Leave overlap checks shared by the web app (elms/) and the API (api.py)
+
+A new or edited request must not overlap the same user's pending or approved
+leave. Testing that against every request the user ever made gets slower as
+history grows. Instead, the check asks only for requests that end on or after
+the new start date:
+
+    user_id = ? AND status IN ('pending', 'approved') AND end_date >= ?
+
+This is a range seek on ix_leave_request_user_status_end. Requests cannot start
+in the past, so that range only holds the user's current and future leave,
+however many years of history sit before it; those few rows are then tested
+against the new end date.
+
+Team concurrency is read from the team_absence calendar (one row per member per
+day off), grouped by day over the requested dates.
+"""
+
+from sqlalchemy import func
+
+ACTIVE_STATUSES = ('pending', 'approved')
+
+
+def find_overlaps(session, LeaveRequest, user_id, start_date, end_date, exclude_id=None):
+    """The user's pending/approved requests that share at least one day with start_date..end_date.
+
+    ``exclude_id`` leaves out the request being edited. The model class is passed
+    in because elms/ and api.py each declare their own copy.
+    """
+    # Only the end_date bound goes to SQL: given a start_date bound as well, SQLite
+    # may pick the (..., start_date) index and walk the user's whole history
+    query = session.query(LeaveRequest).filter(
+        LeaveRequest.user_id == user_id,
+        LeaveRequest.status.in_(ACTIVE_STATUSES),
+        LeaveRequest.end_date >= start_date,
+    )
+    if exclude_id is not None:
+        query = query.filter(LeaveRequest.id != exclude_id)
+    upcoming = query.all()
+    return sorted((leave for leave in upcoming if leave.start_date <= end_date), key=lambda leave: leave.start_date)
+
+
+def busy_team_days(session, TeamAbsence, team, start_date, end_date, threshold, exclude_user_id=None):
+    """[(date, members already off)] for days where one more absence would exceed ``threshold``.
+
+    Counts approved leave only (what team_absence holds). ``threshold`` <= 0
+    disables the check.
+    """
+    if not team or threshold <= 0:
+        return []
+    off = func.count(func.distinct(TeamAbsence.user_id))
+    query = session.query(TeamAbsence.date, off).filter(
+        TeamAbsence.team == team,
+        TeamAbsence.date.between(start_date, end_date),
+    )
+    if exclude_user_id is not None:
+        query = query.filter(TeamAbsence.user_id != exclude_user_id)
+    return query.group_by(TeamAbsence.date).having(off >= threshold).order_by(TeamAbsence.date).all()
+
+
+def describe_overlap(leave_request):
+    """User-facing message for a rejected self-overlap"""
+    return (f'These dates overlap your {leave_request.status} leave from '
+            f'{leave_request.start_date:%Y-%m-%d} to {leave_request.end_date:%Y-%m-%d} (request #{leave_request.id}).')
+
+
+def describe_busy_days(busy_days):
+    """User-facing warning for days where the team is already at its concurrency threshold"""
+    days = ', '.join(f'{day:%Y-%m-%d} ({count} off)' for day, count in busy_days[:5])
+    more = f' and {len(busy_days) - 5} more days' if len(busy_days) > 5 else ''
+    return f'Several teammates are already on approved leave on {days}{more}.'
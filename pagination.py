@@ -0,0 +1,96 @@
+"""
+Employee Leave Management System (ELMS)
+Keyset (cursor) pagination shared by the web app and the API
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(timestamp, row_id):
+    """Encode the (timestamp, id) position of the last row on a page; ``timestamp`` may be None"""
+    raw = f'{timestamp.isoformat() if timestamp is not None else ""}|{row_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into (timestamp or None, id); returns None for missing or malformed cursors"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.rsplit('|', 1)
+        return (datetime.fromisoformat(timestamp) if timestamp else None), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def keyset_page(query, timestamp_column, id_column, cursor=None, per_page=25):
+    """Return ``(items, next_cursor)`` for a newest-first page of ``query``.
+
+    Rows are ordered by ``(timestamp_column, id_column)`` descending and the
+    cursor continues strictly after the last row of the previous page, so the
+    cost of a page depends on ``per_page`` rather than on how deep it is.
+
+    Rows whose timestamp is NULL come last, by id. They are read with a
+    separate ``IS NULL`` query once the dated rows run out: an ``OR ... IS NULL``
+    in the cursor predicate would turn the index search into a scan.
+    """
+    order = (timestamp_column.desc().nulls_last(), id_column.desc())
+    undated = query.filter(timestamp_column.is_(None))
+    position = decode_cursor(cursor)
+    if position is None:
+        items = query.order_by(*order).limit(per_page + 1).all()
+    elif position[0] is None:
+        items = undated.filter(id_column < position[1]).order_by(*order).limit(per_page + 1).all()
+    else:
+        timestamp, row_id = position
+        items = query.filter(or_(
+            timestamp_column < timestamp,
+            and_(timestamp_column == timestamp, id_column < row_id)
+        )).order_by(*order).limit(per_page + 1).all()
+        if len(items) <= per_page:
+            items += undated.order_by(*order).limit(per_page + 1 - len(items)).all()
+
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, timestamp_column.key), getattr(last, id_column.key))
+    return items, next_cursor
+
+
+class KeysetPage:
+    """A keyset_page() that runs its query on first use
+
+    Streamed templates send the markup above the table before the page query
+    runs, so time to first byte does not include it. The rows can be iterated
+    more than once; ``next_cursor`` is known once they have been loaded.
+    """
+
+    def __init__(self, query, timestamp_column, id_column, cursor=None, per_page=25):
+        self._page_args = (query, timestamp_column, id_column, cursor, per_page)
+        self._items = None
+        self._next_cursor = None
+
+    def _load(self):
+        if self._items is None:
+            self._items, self._next_cursor = keyset_page(*self._page_args)
+        return self._items
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __bool__(self):
+        return bool(self._load())
+
+    @property
+    def next_cursor(self):
+        self._load()
+        return self._next_cursor
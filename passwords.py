@@ -0,0 +1,119 @@
+"""
+Employee Leave Management System (ELMS)
+Password hashing policy shared by the web app and the API
+
+The hash cost is a deliberate tradeoff between brute-force resistance and
+login throughput (see benchmarks/bench_login.py), so it is set from config
+instead of relying on Werkzeug's defaults:
+
+    PASSWORD_HASH_METHOD      'pbkdf2:sha256' (or another pbkdf2 digest) or 'scrypt'
+    PASSWORD_HASH_ITERATIONS  pbkdf2 iteration count, or the scrypt cost parameter n
+
+Stored hashes record the parameters they were made with. After a successful
+login, a hash made under an older policy is replaced with one made under the
+current policy, so changing the config migrates users as they sign in.
+
+PasswordPool moves that CPU-heavy work off the request threads (see below).
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+def hash_policy(config):
+    """Werkzeug method string for the configured policy, e.g. 'pbkdf2:sha256:600000'"""
+    method = config['PASSWORD_HASH_METHOD']
+    iterations = config['PASSWORD_HASH_ITERATIONS']
+    if method == 'scrypt':
+        return f'scrypt:{iterations}:8:1'
+    return f'{method}:{iterations}'
+
+
+def hash_password(password, policy):
+    return generate_password_hash(password, method=policy)
+
+
+def verify_password(password_hash, password):
+    return check_password_hash(password_hash, password)
+
+
+def needs_rehash(password_hash, policy):
+    """True if ``password_hash`` was not made with ``policy``"""
+    return password_hash.split('$', 1)[0] != policy
+
+
+class PasswordPoolFull(Exception):
+    """Raised when the hashing pool already has its maximum number of jobs pending"""
+
+
+class PasswordPool:
+    """Run password hashing and verification on a small bounded thread pool
+
+    hashlib releases the GIL while it runs pbkdf2/scrypt, so hashing on the
+    pool never holds up request threads serving other pages, and at most
+    PASSWORD_POOL_WORKERS cores per process are spent on it. When
+    PASSWORD_POOL_WORKERS + PASSWORD_POOL_QUEUE jobs are already pending, new
+    ones fail immediately with PasswordPoolFull (answered with a 503) instead
+    of queueing behind a login storm.
+
+    Configuration:
+        PASSWORD_POOL_WORKERS  hashing threads per process (0 hashes inline on the caller)
+        PASSWORD_POOL_QUEUE    jobs allowed to wait for a free thread
+        PASSWORD_POOL_TIMEOUT  seconds a caller waits for its result before giving up
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_POOL_WORKERS', 2)
+        app.config.setdefault('PASSWORD_POOL_QUEUE', 8)
+        app.config.setdefault('PASSWORD_POOL_TIMEOUT', 10.0)
+        self.app = app
+
+    def hash(self, password, policy):
+        return self._run(hash_password, password, policy)
+
+    def verify(self, password_hash, password):
+        return self._run(verify_password, password_hash, password)
+
+    def _run(self, fn, *args):
+        if self.app.config['PASSWORD_POOL_WORKERS'] <= 0:
+            return fn(*args)
+
+        executor, slots = self._ensure_executor()
+        if not slots.acquire(blocking=False):
+            raise PasswordPoolFull('Password hashing pool is saturated')
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the job finishes, even if the caller stops waiting
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            return future.result(timeout=self.app.config['PASSWORD_POOL_TIMEOUT'])
+        except FuturesTimeoutError:
+            raise PasswordPoolFull('Timed out waiting for the password hashing pool') from None
+
+    def _ensure_executor(self):
+        # Gunicorn forks workers after import, so every process needs its own threads
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    workers = self.app.config['PASSWORD_POOL_WORKERS']
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-pool')
+                    self._slots = threading.BoundedSemaphore(workers + self.app.config['PASSWORD_POOL_QUEUE'])
+                    self._pid = os.getpid()
+        return self._executor, self._slots
@@ -0,0 +1,75 @@
+"""
+Employee Leave Management System (ELMS)
+Per-request SQL query counting with a configurable query budget
+
+Every statement executed while a request is being handled is counted. After the
+view returns, the count is compared with the endpoint's budget:
+
+    QUERY_BUDGET_DEFAULT  budget for endpoints not listed below (None disables the check)
+    QUERY_BUDGETS         {'endpoint_name': max_queries} overrides
+    QUERY_BUDGET_STRICT   raise QueryBudgetExceeded instead of logging a warning,
+                          so tests fail as soon as a view regresses into N+1 queries
+
+Streamed responses (stream_template) run queries while the body is being sent,
+after the view has returned, so they are checked once the last chunk is out
+and carry no X-Query-Count header. The count lives in the WSGI environ rather
+than on ``g`` because the streaming generator runs in a new application context.
+"""
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a view runs more queries than its budget allows"""
+
+
+COUNT_KEY = 'elms.query_count'
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        request.environ[COUNT_KEY] = request.environ.get(COUNT_KEY, 0) + 1
+
+
+def _check(app, endpoint, count, budget):
+    if budget is not None and count > budget:
+        message = f'{endpoint} ran {count} queries (budget {budget})'
+        if app.config['QUERY_BUDGET_STRICT']:
+            raise QueryBudgetExceeded(message)
+        app.logger.warning(message)
+
+
+def _checked_stream(app, chunks, environ, endpoint, budget):
+    try:
+        yield from chunks
+    finally:
+        # The server closes this generator, not the wrapped body
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+    _check(app, endpoint, environ.get(COUNT_KEY, 0), budget)
+
+
+def init_query_budget(app):
+    """Install the query counter and the after-request budget check on ``app``"""
+    app.config.setdefault('QUERY_BUDGET_DEFAULT', None)
+    app.config.setdefault('QUERY_BUDGETS', {})
+    app.config.setdefault('QUERY_BUDGET_STRICT', False)
+
+    if not event.contains(Engine, 'before_cursor_execute', _count_query):
+        event.listen(Engine, 'before_cursor_execute', _count_query)
+
+    @app.after_request
+    def check_query_budget(response):
+        budget = app.config['QUERY_BUDGETS'].get(request.endpoint, app.config['QUERY_BUDGET_DEFAULT'])
+        if response.is_streamed and not response.direct_passthrough:
+            response.response = _checked_stream(app, response.response, request.environ, request.endpoint, budget)
+            return response
+
+        count = request.environ.get(COUNT_KEY, 0)
+        if app.debug or app.testing:
+            response.headers['X-Query-Count'] = str(count)
+        _check(app, request.endpoint, count, budget)
+        return response
@@ -0,0 +1,351 @@
+"""
+Employee Leave Management System (ELMS)
+Result cache for slow-changing listing queries (teams, employees per team)
+
+Team membership changes a few times a week, yet the team and employee
+listings were re-queried on every page load. QueryCache keeps their results
+under a (namespace, key) pair. Here the namespace names the table the result
+was read from ('users') and the key names the query and the caller's scope,
+e.g. 'employees:team:Engineering'.
+
+A namespace is dropped when a transaction that wrote to a watched model
+commits. That covers ORM flushes that change one of the watched columns (so a
+login stamping last_login does not count) and bulk INSERT/UPDATE/DELETE
+statements run through the session. Rolled-back writes invalidate nothing.
+A result whose namespace was invalidated while it was being loaded is returned
+to its caller but not stored.
+
+Backends (QUERY_CACHE_BACKEND):
+    'memory'  in-process LRU (default). Another worker's writes are only seen
+              once QUERY_CACHE_TTL expires.
+    'file'    pickled entries under QUERY_CACHE_DIR, shared by every worker on
+              the host. Each namespace has a generation file that is rewritten
+              on invalidation, so a commit in one worker is seen by all of
+              them. Expired entries and those beyond QUERY_CACHE_SIZE are swept
+              periodically. Pointing QUERY_CACHE_DIR at /dev/shm keeps it in memory.
+    'none'    no caching (every lookup is a miss)
+
+Configuration:
+    QUERY_CACHE_BACKEND  'memory', 'file' or 'none'
+    QUERY_CACHE_SIZE     maximum entries (per process for 'memory', in QUERY_CACHE_DIR for 'file')
+    QUERY_CACHE_TTL      seconds an entry may be served
+    QUERY_CACHE_DIR      directory of the file backend (default: <instance>/query_cache)
+
+Hit and miss counts per namespace are kept per process (see stats()).
+QueryCache.init_app() stores the cache in app.extensions['query_cache'];
+writes are only tracked for sessions used inside that app's context.
+"""
+
+import glob
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+_MISSING = object()
+
+
+class MemoryBackend:
+    """LRU of (expiry, value) per key, private to this process"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._generations = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None or entry[0] <= time.monotonic():
+                return _MISSING
+            self._entries.move_to_end((namespace, key))
+            return entry[1]
+
+    def generation(self, namespace):
+        with self._lock:
+            return self._generations[namespace]
+
+    def set(self, namespace, key, value, ttl, generation):
+        with self._lock:
+            if self._generations[namespace] != generation:
+                return
+            self._entries[(namespace, key)] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace):
+        with self._lock:
+            self._generations[namespace] += 1
+            for cache_key in [cache_key for cache_key in self._entries if cache_key[0] == namespace]:
+                del self._entries[cache_key]
+
+
+class FileBackend:
+    """Pickled entries in a directory shared by every worker process on the host
+
+    Each entry file's mtime is set to its expiry time. Every ``maxsize // 8``
+    writes (per process), expired files are deleted and, past ``maxsize``
+    entries, those closest to expiry, so the directory stays bounded however
+    many distinct keys (e.g. audit-log searches) are cached.
+    """
+
+    def __init__(self, directory, maxsize=512):
+        self.directory = directory
+        self.maxsize = maxsize
+        self._sweep_every = max(1, maxsize // 8)
+        self._writes = 0
+        self._sweep_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, namespace, key):
+        try:
+            with open(self._path(namespace, key, self.generation(namespace)), 'rb') as f:
+                expires, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return _MISSING
+        return value if expires > time.time() else _MISSING
+
+    def set(self, namespace, key, value, ttl, generation):
+        if self.generation(namespace) != generation:
+            return
+        # Written under the generation read before the load: if a commit moves the
+        # namespace on meanwhile, readers never look at this file
+        path = self._path(namespace, key, generation)
+        expires = time.time() + ttl
+        self._write(path, pickle.dumps((expires, value)), mtime=expires)
+        if self.generation(namespace) != generation:
+            _remove_quietly(path)
+        with self._sweep_lock:
+            self._writes += 1
+            sweep = self._writes % self._sweep_every == 0
+        if sweep:
+            self.sweep()
+
+    def sweep(self):
+        """Delete expired entries, then the ones closest to expiry beyond ``maxsize``; returns the number deleted"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.pickle'):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        pass
+        now = time.time()
+        entries.sort()
+        expired = sum(1 for expires, _ in entries if expires <= now)
+        doomed = entries[:max(expired, len(entries) - self.maxsize)]
+        for _, path in doomed:
+            _remove_quietly(path)
+        return len(doomed)
+
+    def invalidate(self, namespace):
+        generation = uuid.uuid4().hex
+        self._write(self._generation_path(namespace), generation.encode())
+        # Entries of older generations can never be read again
+        for path in glob.glob(os.path.join(self.directory, f'{namespace}-*.pickle')):
+            if not os.path.basename(path).startswith(f'{namespace}-{generation}-'):
+                _remove_quietly(path)
+
+    def generation(self, namespace):
+        try:
+            with open(self._generation_path(namespace), 'rb') as f:
+                return f.read().decode() or '0'
+        except OSError:
+            return '0'
+
+    def _generation_path(self, namespace):
+        return os.path.join(self.directory, f'{namespace}.generation')
+
+    def _path(self, namespace, key, generation):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.directory, f'{namespace}-{generation}-{digest}.pickle')
+
+    def _write(self, path, data, mtime=None):
+        # Write then rename, so readers in other processes never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            if mtime is not None:
+                os.utime(tmp_path, (mtime, mtime))
+            os.replace(tmp_path, path)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class NullBackend:
+    def get(self, namespace, key):
+        return _MISSING
+
+    def generation(self, namespace):
+        return None
+
+    def set(self, namespace, key, value, ttl, generation):
+        pass
+
+    def invalidate(self, namespace):
+        pass
+
+
+class QueryCache:
+    """Cache query results by (namespace, key); invalidated when writes to watched models commit"""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 300.0
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.invalidations = defaultdict(int)
+        self._watched = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUERY_CACHE_BACKEND', 'memory')
+        app.config.setdefault('QUERY_CACHE_SIZE', 512)
+        app.config.setdefault('QUERY_CACHE_TTL', 300.0)
+        app.config.setdefault('QUERY_CACHE_DIR', os.path.join(app.instance_path, 'query_cache'))
+        self.ttl = app.config['QUERY_CACHE_TTL']
+
+        backend = app.config['QUERY_CACHE_BACKEND']
+        if backend == 'memory':
+            self.backend = MemoryBackend(app.config['QUERY_CACHE_SIZE'])
+        elif backend == 'file':
+            self.backend = FileBackend(app.config['QUERY_CACHE_DIR'], app.config['QUERY_CACHE_SIZE'])
+        elif backend == 'none':
+            self.backend = NullBackend()
+        else:
+            raise ValueError(f'Unknown QUERY_CACHE_BACKEND: {backend!r}')
+        # The session and mapper listeners below find the cache of the app in context here
+        app.extensions['query_cache'] = self
+
+    def watch(self, model, namespace, columns=None):
+        """Invalidate ``namespace`` after commits that write ``model`` (only ``columns``, for updates)"""
+        self._watched[model.__table__] = (namespace, columns)
+        with _listen_lock:
+            if model not in _listened_models:
+                event.listen(model, 'after_insert', _on_insert_or_delete)
+                event.listen(model, 'after_delete', _on_insert_or_delete)
+                event.listen(model, 'after_update', _on_update)
+                _listened_models.add(model)
+
+    def get_or_load(self, namespace, key, loader):
+        """The cached result for (namespace, key), or loader()'s result, which is then cached"""
+        value = self.backend.get(namespace, key)
+        if value is not _MISSING:
+            self.hits[namespace] += 1
+            return value
+        self.misses[namespace] += 1
+        # A commit that invalidates the namespace while loader() runs may not be in
+        # its result; set() skips the write once the generation has moved on
+        generation = self.backend.generation(namespace)
+        value = loader()
+        self.backend.set(namespace, key, value, self.ttl, generation)
+        return value
+
+    def invalidate(self, namespace):
+        self.invalidations[namespace] += 1
+        self.backend.invalidate(namespace)
+
+    def stats(self):
+        """Per-namespace hit/miss/invalidation counts for this process"""
+        namespaces = set(self.hits) | set(self.misses) | set(self.invalidations)
+        return {
+            namespace: {
+                'hits': self.hits[namespace],
+                'misses': self.misses[namespace],
+                'invalidations': self.invalidations[namespace],
+            }
+            for namespace in sorted(namespaces)
+        }
+
+    def _on_row_change(self, mapper, target, updated):
+        watched = self._watched.get(mapper.local_table)
+        if watched is None:
+            return
+        namespace, columns = watched
+        if updated and columns is not None:
+            state = inspect(target)
+            if not any(state.attrs[name].history.has_changes() for name in columns):
+                return
+        _mark(object_session(target), namespace)
+
+    def _on_execute(self, orm_execute_state):
+        # Bulk statements (session.execute(insert(User), rows), update(User)...) skip mapper events
+        if orm_execute_state.is_select:
+            return
+        table = getattr(orm_execute_state.statement, 'table', None)
+        watched = self._watched.get(table)
+        if watched is not None:
+            _mark(orm_execute_state.session, watched[0])
+
+    def _on_commit(self, session):
+        for namespace in session.info.pop(_INFO_KEY, ()):
+            self.invalidate(namespace)
+
+
+# Listeners are registered once per process (and per watched model), not per
+# QueryCache: each one hands the event to the cache of the app in context, so
+# several apps in one process (tests, the CLI) don't see each other's sessions.
+_INFO_KEY = 'query_cache_dirty'
+_listened_models = set()
+_listen_lock = threading.Lock()
+
+
+def _current_cache():
+    return current_app.extensions.get('query_cache') if has_app_context() else None
+
+
+def _mark(session, namespace):
+    if session is not None:
+        session.info.setdefault(_INFO_KEY, set()).add(namespace)
+
+
+def _on_insert_or_delete(mapper, connection, target):
+    cache = _current_cache()
+    if cache is not None:
+        cache._on_row_change(mapper, target, updated=False)
+
+
+def _on_update(mapper, connection, target):
+    cache = _current_cache()
+    if cache is not None:
+        cache._on_row_change(mapper, target, updated=True)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _on_execute(orm_execute_state):
+    cache = _current_cache()
+    if cache is not None:
+        cache._on_execute(orm_execute_state)
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_commit(session):
+    cache = _current_cache()
+    if cache is not None:
+        cache._on_commit(session)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_rollback(session):
+    session.info.pop(_INFO_KEY, None)
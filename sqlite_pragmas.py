@@ -0,0 +1,26 @@
+"""
+Employee Leave Management System (ELMS)
+SQLite connection tuning
+
+PRAGMAs such as busy_timeout, cache_size and mmap_size only last for the
+connection that sets them, so the profile is applied from a 'connect' event on
+every new pooled connection. journal_mode=WAL is persistent in the database
+file but setting it again is harmless.
+"""
+
+from sqlalchemy import event
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Apply ``pragmas`` ({name: value}) to every new connection of a SQLite engine"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
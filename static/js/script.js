@@ -124,26 +124,40 @@ document.addEventListener('DOMContentLoaded', function() {
         return new bootstrap.Tooltip(tooltipTriggerEl);
     });
     
-    // Auto-refresh data every 30 seconds for dashboard pages
-    if (window.location.pathname.includes('dashboard')) {
-        setInterval(function() {
-            // Only refresh if user is active (has interacted in last 5 minutes)
-            if (Date.now() - window.lastActivity < 300000) {
-                // Add subtle indication of refresh
-                const refreshIndicator = document.createElement('div');
-                refreshIndicator.className = 'position-fixed top-0 end-0 p-3';
-                refreshIndicator.innerHTML = '<div class="toast show" role="alert"><div class="toast-body"><i class="bi bi-arrow-clockwise"></i> Refreshing data...</div></div>';
-                document.body.appendChild(refreshIndicator);
-                
+    // Live change notifications for dashboard pages (Server-Sent Events, no polling)
+    function listenForChangeNotices(retryDelay) {
+        const changes = new EventSource('/api/events');
+        changes.addEventListener('open', function() {
+            retryDelay = 10000;
+        });
+        
+        // A non-200 answer (503 when the worker is at its connection cap) closes
+        // the EventSource for good: open a new one after a backoff
+        changes.addEventListener('error', function() {
+            if (changes.readyState === EventSource.CLOSED) {
                 setTimeout(function() {
-                    refreshIndicator.remove();
-                }, 2000);
-                
-                // In a real application, you would make an AJAX call here
-                // For now, we'll just reload the page
-                // window.location.reload();
+                    listenForChangeNotices(Math.min(retryDelay * 2, 300000));
+                }, retryDelay);
             }
-        }, 30000);
+        });
+        
+        changes.addEventListener('leave', function(message) {
+            const change = JSON.parse(message.data);
+            const notice = document.createElement('div');
+            notice.className = 'position-fixed top-0 end-0 p-3';
+            notice.innerHTML = '<div class="toast show" role="alert"><div class="toast-body">' +
+                '<i class="bi bi-arrow-clockwise"></i> Leave request #' + change.request.id + ' ' + change.action +
+                ' - <a href="javascript:window.location.reload()">refresh</a></div></div>';
+            document.body.appendChild(notice);
+            
+            setTimeout(function() {
+                notice.remove();
+            }, 8000);
+        });
+    }
+    
+    if (window.location.pathname.includes('dashboard') && window.EventSource) {
+        listenForChangeNotices(10000);
     }
     
     // Track user activity
@@ -0,0 +1,46 @@
+"""
+Employee Leave Management System (ELMS)
+Aggregate dashboard statistics shared by the web app (app_new.py) and the API (api.py)
+"""
+
+from sqlalchemy import func
+
+
+def leave_stats(session, User, LeaveRequest):
+    """Compute user, request and per-team counts with two GROUP BY queries.
+
+    The model classes are passed in because app_new.py and api.py each declare
+    their own copies bound to their own database.
+    """
+    role_counts = dict(
+        session.query(User.role, func.count(User.id)).group_by(User.role).all()
+    )
+
+    # One pass over users LEFT JOIN requests gives both the per-status totals
+    # and the per-team totals; teams without requests come back with a zero count.
+    status_counts = {}
+    team_counts = {}
+    rows = session.query(User.team, LeaveRequest.status, func.count(LeaveRequest.id)).outerjoin(
+        LeaveRequest, LeaveRequest.user_id == User.id
+    ).group_by(User.team, LeaveRequest.status).all()
+
+    for team, status, count in rows:
+        if status is not None:
+            status_counts[status] = status_counts.get(status, 0) + count
+        if team is not None:
+            team_counts[team] = team_counts.get(team, 0) + count
+
+    total_requests = sum(status_counts.values())
+    approved_requests = status_counts.get('approved', 0)
+
+    return {
+        'total_users': sum(role_counts.values()),
+        'total_employees': role_counts.get('employee', 0),
+        'total_managers': role_counts.get('manager', 0),
+        'total_requests': total_requests,
+        'pending_requests': status_counts.get('pending', 0),
+        'approved_requests': approved_requests,
+        'rejected_requests': status_counts.get('rejected', 0),
+        'approval_rate': round((approved_requests / total_requests * 100) if total_requests > 0 else 0, 1),
+        'team_stats': [{'name': name, 'requests': team_counts[name]} for name in sorted(team_counts)]
+    }
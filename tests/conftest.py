@@ -0,0 +1,54 @@
+"""
+Fixtures: a TestingConfig app on an in-memory SQLite database with the default users
+
+Run from the project root with python -m pytest. pytest.ini limits collection to
+tests/; test_application.py is a manual script against a running server.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from elms import create_app
+from elms.extensions import db
+from elms.models import LeaveRequest, User
+from migrations import upgrade_schema
+
+PASSWORDS = {'admin': 'admin123', 'manager': 'manager123', 'employee': 'employee123'}
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        upgrade_schema(db)
+        for username, role, team in [('admin', 'admin', None),
+                                     ('manager', 'manager', 'Engineering'),
+                                     ('employee', 'employee', 'Engineering')]:
+            user = User(username=username, email=f'{username}@elms.com', role=role, team=team)
+            user.set_password(PASSWORDS[username])
+            db.session.add(user)
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.session.remove()
+
+
+def login(app, username):
+    client = app.test_client()
+    response = client.post('/login', data={'username': username, 'password': PASSWORDS[username]})
+    assert response.status_code == 302
+    return client
+
+
+def add_leave_requests(app, username, count):
+    """``count`` pending one-day requests for ``username``, applied an hour apart"""
+    with app.app_context():
+        user = User.query.filter_by(username=username).one()
+        start = date.today() + timedelta(days=7)
+        db.session.add_all(
+            LeaveRequest(user_id=user.id, start_date=start + timedelta(days=i), end_date=start + timedelta(days=i),
+                         reason=f'Planned leave {i}', applied_on=datetime(2026, 1, 1) + timedelta(hours=i))
+            for i in range(count)
+        )
+        db.session.commit()
@@ -0,0 +1,53 @@
+"""
+User imports uploaded through the admin page and run by the import worker (see elms/import_jobs.py)
+"""
+
+import io
+import os
+import threading
+
+from elms.extensions import db
+from elms.import_jobs import run_worker, upload_path
+from elms.models import ImportJob, User
+
+from conftest import login
+
+CSV = ('username,email,password,role,team\n'
+       'alice1,alice@elms.com,secret1,employee,Sales\n'
+       'bob,bob@elms.com,secret2,employee,Sales\n'
+       'manager,other@elms.com,secret3,manager,\n')
+
+
+def upload(client, data=CSV, filename='users.csv'):
+    return client.post('/admin/import-users', data={'file': (io.BytesIO(data.encode()), filename)},
+                       content_type='multipart/form-data')
+
+
+def test_upload_is_queued_not_imported(app, tmp_path):
+    app.config['USER_IMPORT_DIR'] = str(tmp_path)
+    client = login(app, 'admin')
+    response = upload(client)
+    assert response.status_code == 302
+    with app.app_context():
+        job = ImportJob.query.one()
+        assert response.headers['Location'].endswith(f'/admin/import-users/{job.id}')
+        assert job.status == 'queued'
+        assert os.stat(upload_path(job)).st_mode & 0o077 == 0
+        assert User.query.filter_by(username='alice1').first() is None
+    status = client.get(f'/admin/import-users/{job.id}', headers={'Accept': 'application/json'}).get_json()
+    assert status['status'] == 'queued'
+
+
+def test_worker_imports_and_deletes_the_upload(app, tmp_path):
+    app.config['USER_IMPORT_DIR'] = str(tmp_path)
+    client = login(app, 'admin')
+    job_id = int(upload(client).headers['Location'].rsplit('/', 1)[1])
+    with app.app_context():
+        assert run_worker(threading.Event(), once=True) == 1
+        job = db.session.get(ImportJob, job_id)
+        assert (job.status, job.imported, job.failed) == ('done', 1, 2)
+        assert [row[1] for row in job.rejected_rows] == ['bob', 'manager']
+        assert not os.path.exists(upload_path(job))
+        assert User.query.filter_by(username='alice1').one().check_password('secret1')
+    page = client.get(f'/admin/import-users/{job_id}').get_data(as_text=True)
+    assert 'username must be 4-20 characters' in page and 'username already exists' in page
@@ -0,0 +1,18 @@
+"""
+Query plans of the hot paths (see elms/cli.py hot_queries and `flask elms check-indexes`)
+"""
+
+from elms.cli import hot_queries
+from elms.extensions import db
+from migrations import explain_query_plan, full_table_scans
+
+INDEXED_TABLES = {'leave_request', 'team_absence', 'audit_log', 'report_job', 'import_job'}
+
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        queries = hot_queries()
+        assert queries
+        for name, query in queries.items():
+            plan = explain_query_plan(db.session, query)
+            assert full_table_scans(plan, INDEXED_TABLES) == [], f'{name}: {"; ".join(plan)}'
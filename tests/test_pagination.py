@@ -0,0 +1,68 @@
+"""
+Keyset pagination (see pagination.py), including rows whose sort timestamp is NULL
+"""
+
+import re
+from datetime import date
+
+from sqlalchemy import update
+
+from elms.extensions import db
+from elms.models import LeaveRequest, User
+from pagination import decode_cursor, encode_cursor, keyset_page
+
+from conftest import add_leave_requests, login
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+    assert decode_cursor('not a cursor') is None
+
+
+def add_undated_requests(app, count):
+    with app.app_context():
+        user = User.query.filter_by(username='employee').one()
+        db.session.add_all(LeaveRequest(user_id=user.id, start_date=date.today(), end_date=date.today(),
+                                        reason=f'Undated leave {i}')
+                           for i in range(count))
+        db.session.flush()
+        # The column default fills in applied_on on insert, so clear it afterwards
+        db.session.execute(update(LeaveRequest).where(LeaveRequest.reason.startswith('Undated'))
+                           .values(applied_on=None))
+        db.session.commit()
+
+
+def test_null_timestamps_come_last(app):
+    add_leave_requests(app, 'employee', 7)
+    add_undated_requests(app, 6)
+    with app.app_context():
+        expected = [r.id for r in LeaveRequest.query.filter(LeaveRequest.applied_on.isnot(None))
+                    .order_by(LeaveRequest.applied_on.desc(), LeaveRequest.id.desc())]
+        expected += [r.id for r in LeaveRequest.query.filter(LeaveRequest.applied_on.is_(None))
+                     .order_by(LeaveRequest.id.desc())]
+        for per_page in (1, 4, 7, 13, 20):
+            seen, cursor = [], None
+            while True:
+                items, cursor = keyset_page(LeaveRequest.query, LeaveRequest.applied_on, LeaveRequest.id,
+                                            cursor=cursor, per_page=per_page)
+                seen += [r.id for r in items]
+                if cursor is None:
+                    break
+            assert seen == expected, per_page
+
+
+def test_dashboard_pages_past_undated_rows(app):
+    # 25 per page: the first page ends on an undated row, so its cursor has no timestamp
+    add_leave_requests(app, 'employee', 24)
+    add_undated_requests(app, 4)
+    client = login(app, 'manager')
+    pages, url = [], '/manager/dashboard'
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append(response.get_data(as_text=True))
+        match = re.search(r'href="([^"]*cursor=[^"]*)"', pages[-1])
+        url = match.group(1).replace('&amp;', '&') if match else None
+    assert len(pages) == 2
+    assert 'Undated leave 3' in pages[0] and 'Undated leave 2' not in pages[0]
+    assert 'Undated leave 0' in pages[1] and 'Planned leave' not in pages[1]
@@ -0,0 +1,65 @@
+"""
+Query budget (see query_budget.py): hot pages stay within their budget, and
+TestingConfig's QUERY_BUDGET_STRICT turns a regression into a failing test
+"""
+
+import pytest
+from sqlalchemy import text
+
+from elms.extensions import db
+from query_budget import QueryBudgetExceeded
+
+from conftest import add_leave_requests, login
+
+
+def test_testing_config_is_strict(app):
+    assert app.config['QUERY_BUDGET_STRICT']
+
+
+def test_query_count_header(app):
+    response = login(app, 'admin').get('/admin/dashboard')
+    assert response.status_code == 200
+    assert 0 < int(response.headers['X-Query-Count']) <= app.config['QUERY_BUDGET_DEFAULT']
+
+
+def test_user_list_within_budget(app):
+    with app.app_context():
+        for i in range(40):
+            db.session.execute(text(
+                "INSERT INTO user (username, email, password, role, team, is_active, created_at) "
+                "VALUES (:name, :email, 'x', 'employee', 'Sales', 1, CURRENT_TIMESTAMP)"
+            ), {'name': f'user{i:03d}', 'email': f'user{i:03d}@elms.com'})
+        db.session.commit()
+    # Streamed page: the budget is checked once the body has been sent
+    body = login(app, 'admin').get('/admin/users').get_data(as_text=True)
+    assert 'user039' in body
+
+
+def test_manager_dashboard_within_budget(app):
+    add_leave_requests(app, 'employee', 40)
+    client = login(app, 'manager')
+    first_page = client.get('/manager/dashboard?per_page=25').get_data(as_text=True)
+    assert 'Planned leave 39' in first_page
+    assert 'Planned leave 14' not in first_page  # newest 25 only
+    assert client.get('/manager/dashboard?status=pending&employee=emp').status_code == 200
+
+
+def test_over_budget_view_raises(app):
+    budget = app.config['QUERY_BUDGET_DEFAULT']
+
+    @app.route('/n-plus-one')
+    def n_plus_one():
+        for _ in range(budget + 1):
+            db.session.execute(text('SELECT 1'))
+        return 'ok'
+
+    with pytest.raises(QueryBudgetExceeded, match=rf'n_plus_one ran {budget + 1} queries'):
+        app.test_client().get('/n-plus-one')
+
+
+def test_over_budget_streamed_page_raises(app):
+    add_leave_requests(app, 'employee', 5)
+    client = login(app, 'manager')
+    app.config['QUERY_BUDGETS'] = {'manager.dashboard': 2}
+    with pytest.raises(QueryBudgetExceeded, match='manager.dashboard'):
+        client.get('/manager/dashboard').get_data()
@@ -0,0 +1,32 @@
+"""
+Listing/count result cache (see query_cache.py)
+"""
+
+import os
+
+from query_cache import FileBackend, _MISSING
+
+
+def entry_files(directory):
+    return [name for name in os.listdir(directory) if name.endswith('.pickle')]
+
+
+def test_file_backend_stays_within_maxsize(tmp_path):
+    backend = FileBackend(str(tmp_path), maxsize=16)
+    generation = backend.generation('audit_log')
+    for i in range(200):
+        backend.set('audit_log', f'count:q=search {i}', (i, True), 300, generation)
+    assert len(entry_files(tmp_path)) <= 16 + 16 // 8
+    # The newest entries survive the sweeps
+    assert backend.get('audit_log', 'count:q=search 199') == (199, True)
+
+
+def test_file_backend_sweeps_expired_entries(tmp_path):
+    backend = FileBackend(str(tmp_path), maxsize=64)  # no automatic sweep within 8 writes
+    generation = backend.generation('audit_log')
+    for i in range(5):
+        backend.set('audit_log', f'count:q=old {i}', (i, True), -1, generation)
+    backend.set('audit_log', 'count:q=fresh', (1, True), 300, generation)
+    assert backend.get('audit_log', 'count:q=old 0') is _MISSING
+    assert backend.sweep() == 5
+    assert entry_files(tmp_path) == [os.path.basename(backend._path('audit_log', 'count:q=fresh', generation))]
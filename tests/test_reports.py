@@ -0,0 +1,36 @@
+"""
+Report exports (see elms/reports.py)
+"""
+
+import csv
+from io import StringIO
+
+from sqlalchemy import update
+
+from elms.extensions import db
+from elms.models import LeaveRequest
+
+from conftest import add_leave_requests, login
+
+
+def test_csv_export_writes_undated_rows(app):
+    add_leave_requests(app, 'employee', 3)
+    with app.app_context():
+        first_id = db.session.query(db.func.min(LeaveRequest.id)).scalar()
+        db.session.execute(update(LeaveRequest).where(LeaveRequest.id == first_id).values(applied_on=None))
+        db.session.commit()
+    response = login(app, 'admin').get('/reports/export-csv')
+    rows = list(csv.reader(StringIO(response.get_data(as_text=True))))
+    assert response.status_code == 200
+    assert len(rows) == 4
+    assert rows[1][0] == str(first_id) and rows[1][-1] == ''
+
+
+def test_malformed_export_month_redirects(app):
+    client = login(app, 'admin')
+    for month in ('2024-13', 'abc', '2024'):
+        for url in (f'/reports/export-csv?month={month}', f'/reports/export-pdf?month={month}'):
+            response = client.get(url)
+            assert response.status_code == 302, url
+            assert response.headers['Location'].endswith('/admin/dashboard'), url
+    assert client.get('/reports/export-csv?month=2024-12').status_code == 200
@@ -0,0 +1,38 @@
+"""
+Authenticated user cache (see user_cache.py)
+"""
+
+from elms.extensions import db
+from elms.models import User, load_user
+
+
+def test_deactivation_is_seen_after_commit(app):
+    with app.app_context():
+        user_id = User.query.filter_by(username='employee').one().id
+        assert load_user(user_id).is_active
+
+        user = db.session.get(User, user_id)
+        user.is_active = False
+        db.session.commit()
+        assert load_user(user_id) is None
+
+
+def test_row_reloaded_before_commit_is_not_served(app):
+    with app.app_context():
+        cache = app.extensions['user_cache']
+        user_id = User.query.filter_by(username='employee').one().id
+        active = load_user(user_id)
+
+        user = db.session.get(User, user_id)
+        user.is_active = False
+        db.session.flush()
+        # A concurrent request reads the still-committed active row between flush and commit
+        load = cache._load
+        cache._load = lambda _: active
+        try:
+            assert cache.get(user_id).is_active
+        finally:
+            cache._load = load
+        db.session.commit()
+
+        assert load_user(user_id) is None
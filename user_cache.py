@@ -0,0 +1,162 @@
+"""
+Employee Leave Management System (ELMS)
+TTL + LRU cache of authenticated users shared by the web app and the API
+
+Flask-Login's user loader and the API's verify_token() used to query the user
+table on every authenticated request. UserCache keeps a small, detached
+snapshot of each recently seen user (id, username, email, role, team,
+is_active), so steady-state requests run no user queries at all.
+
+Configuration:
+    USER_CACHE_SIZE  maximum number of cached users (0 disables the cache)
+    USER_CACHE_TTL   seconds a snapshot may be served before it is reloaded
+
+Any ORM update or delete of a User (deactivation, role or team change)
+invalidates that user's entry in this process when its transaction commits;
+evicting at flush would let a concurrent request cache the still-committed
+old row again before the commit. A snapshot loaded while an invalidation
+happens is not stored. Other worker processes keep their copy until it
+expires, so USER_CACHE_TTL bounds how long a change can take to be seen
+everywhere.
+
+UserCache.init_app() stores the cache in app.extensions['user_cache']; the
+session and mapper listeners are registered once per process and act on the
+cache of the app in context.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+
+class UserSnapshot:
+    """Detached, read-only copy of the user columns needed to authorize a request"""
+
+    columns = ('id', 'username', 'email', 'role', 'team', 'is_active')
+
+    # Flask-Login user interface; snapshots only ever represent logged-in users
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    def get_id(self):
+        return str(self.id)
+
+    def __eq__(self, other):
+        return isinstance(other, UserSnapshot) and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.username}>'
+
+
+class UserCache:
+    """Map user id -> snapshot, evicting the least recently used and expired entries"""
+
+    def __init__(self, db, model, snapshot_class=UserSnapshot, app=None):
+        self.db = db
+        self.model = model
+        self.snapshot_class = snapshot_class
+        self.maxsize = 1024
+        self.ttl = 30.0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        with _listen_lock:
+            if model not in _listened_models:
+                event.listen(model, 'after_update', _on_change)
+                event.listen(model, 'after_delete', _on_change)
+                _listened_models.add(model)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('USER_CACHE_SIZE', 1024)
+        app.config.setdefault('USER_CACHE_TTL', 30.0)
+        self.maxsize = app.config['USER_CACHE_SIZE']
+        self.ttl = app.config['USER_CACHE_TTL']
+        app.extensions['user_cache'] = self
+
+    def get(self, user_id):
+        """Return the snapshot for ``user_id``, loading it on a miss; None if there is no such user"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        user = self._load(user_id)
+        if user is None or self.maxsize <= 0 or self.ttl <= 0:
+            return user
+
+        with self._lock:
+            if self._generation != generation:
+                # Invalidated while loading: the row read may predate the commit
+                return user
+            self._entries[user_id] = (now + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id):
+        """Drop one user's snapshot so the next request reloads it"""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def _load(self, user_id):
+        columns = [getattr(self.model, name) for name in self.snapshot_class.columns]
+        row = self.db.session.query(*columns).filter(self.model.id == user_id).first()
+        return self.snapshot_class(**row._asdict()) if row is not None else None
+
+
+# Registered once per process (and per model), not per UserCache; see the module docstring
+_INFO_KEY = 'user_cache_dirty'
+_listened_models = set()
+_listen_lock = threading.Lock()
+
+
+def _current_cache():
+    return current_app.extensions.get('user_cache') if has_app_context() else None
+
+
+def _on_change(mapper, connection, target):
+    # Remember the id; the entry is dropped once the change is committed
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_INFO_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_commit(session):
+    user_ids = session.info.pop(_INFO_KEY, ())
+    cache = _current_cache()
+    if cache is not None:
+        for user_id in user_ids:
+            cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_rollback(session):
+    session.info.pop(_INFO_KEY, None)